@@ -3,21 +3,31 @@ FastAPI application for the Tech API.
 """
 
 import os
+import time
+import asyncio
+import queue
 import logging
+import logging.handlers
 from datetime import datetime
 from pathlib import Path
 from contextlib import asynccontextmanager
 
+import orjson
+
 # Load environment variables early
 from dotenv import load_dotenv
 load_dotenv()
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 
+from sqlalchemy import text
+
+from database import Base, engine, async_engine, async_test_connection
+from codebase.core.pg_vector_store import CODEBASE_VERSION_COLUMN_SQL
 from routers import codebase_router
 from routers import code_plan_router
 from models.codebase_models import HealthResponse, ErrorResponse
@@ -29,83 +39,133 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Log records queued by the root logger while the app runs
+log_queue = queue.Queue(-1)
+
+
+def _start_log_queue():
+    """
+    Route all root log records through a queue so handler I/O happens off the
+    event loop.
+
+    Returns:
+        (listener writing to the original handlers, the original handlers)
+    """
+    root_logger = logging.getLogger()
+    handlers = root_logger.handlers[:]
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    root_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    return listener, handlers
+
+
+# Server version, database, user and pgvector version in a single round-trip
+_DB_INFO_SQL = (
+    "SELECT version(), current_database(), current_user, "
+    "(SELECT extversion FROM pg_extension WHERE extname='vector')"
+)
+
+
+async def _ensure_pgvector():
+    """Create the pgvector extension if it is missing."""
+    logger.info("🧩 Setting up pgvector extension...")
+    try:
+        async with async_engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            logger.info("pgvector extension enabled")
+    except Exception as e:
+        logger.warning("Could not setup pgvector: %s", e)
+
+
+async def _create_tables():
+    """Create database tables if they don't exist."""
+    logger.info("📋 Creating database tables...")
+    try:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text(CODEBASE_VERSION_COLUMN_SQL))
+        logger.info("Database tables created successfully")
+    except Exception as e:
+        logger.warning("Could not create tables: %s", e)
+
+
+async def _setup_schema():
+    """Set up pgvector and tables (tables depend on the vector type)."""
+    await _ensure_pgvector()
+    await _create_tables()
+
+
+async def _fetch_db_info():
+    """Fetch server version, database and user, or None if unavailable."""
+    logger.info("📊 Getting database information...")
+    try:
+        async with async_engine.connect() as conn:
+            return (await conn.execute(text(_DB_INFO_SQL))).one()
+    except Exception as e:
+        logger.warning("Could not get database info: %s", e)
+        return None
+
 
 async def initialize_database():
     """Initialize and test database connection."""
     logger.info("🔄 Initializing database connection...")
 
     try:
-        from database import test_connection, engine
-        from sqlalchemy import text
-
         # Test basic connection
         logger.info("🔌 Testing database connection...")
-        if not test_connection():
+        if not await async_test_connection():
             raise Exception("Database connection test failed")
 
-        # Setup pgvector extension
-        logger.info("🧩 Setting up pgvector extension...")
-        try:
-            with engine.connect() as conn:
-                conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-                conn.commit()
-                logger.info("pgvector extension enabled")
-        except Exception as e:
-            logger.warning(f"Could not setup pgvector: {e}")
-
-        # Create tables if they don't exist
-        logger.info("📋 Creating database tables...")
-        try:
-            from database import Base
-            Base.metadata.create_all(bind=engine)
-            logger.info("Database tables created successfully")
-        except Exception as e:
-            logger.warning(f"Could not create tables: {e}")
-
-        # Get database information
-        logger.info("📊 Getting database information...")
-        try:
-            with engine.connect() as conn:
-                version = conn.execute(text("SELECT version()")).scalar()
-                db_name = conn.execute(text("SELECT current_database()")).scalar()
-                user = conn.execute(text("SELECT current_user")).scalar()
-
-                logger.info(f"✅ Database initialized successfully!")
-                logger.info(f"   - PostgreSQL version: {version.split(',')[0] if version else 'unknown'}")
-                logger.info(f"   - Database: {db_name}")
-                logger.info(f"   - User: {user}")
-                logger.info(f"   - Connection: {os.getenv('DATABASE_URL', 'Not set')[:50]}...")
-
-        except Exception as e:
-            logger.warning(f"Could not get database info: {e}")
+        # Schema setup and info lookup use separate connections and run concurrently
+        _, info = await asyncio.gather(_setup_schema(), _fetch_db_info())
+
+        if info:
+            version, db_name, user, _ = info
+            logger.info("✅ Database initialized successfully!")
+            logger.info("   - PostgreSQL version: %s", version.split(',')[0] if version else 'unknown')
+            logger.info("   - Database: %s", db_name)
+            logger.info("   - User: %s", user)
+            logger.info("   - Connection: %s...", os.getenv('DATABASE_URL', 'Not set')[:50])
+        else:
             logger.info("✅ Database connection established (info unavailable)")
 
     except Exception as e:
-        logger.error(f"❌ Database initialization failed: {e}")
+        logger.error("❌ Database initialization failed: %s", e)
         logger.error("💡 Please check your DATABASE_URL configuration:")
-        logger.error(f"   - DATABASE_URL: {os.getenv('DATABASE_URL', 'Not set')[:50]}...")
+        logger.error("   - DATABASE_URL: %s...", os.getenv('DATABASE_URL', 'Not set')[:50])
         logger.error("   - Make sure PostgreSQL server is running")
         logger.error("   - Check your .env file configuration")
         raise
 
 
+# Working directories created at startup
+_RUNTIME_DIRS = ("temp_uploads", "codebase_db", ".embedding_cache")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
+    log_listener, log_handlers = _start_log_queue()
     logger.info("Starting Tech API server...")
     
-    # Create necessary directories
-    directories = ["temp_uploads", "codebase_db", ".embedding_cache"]
-    for directory in directories:
-        Path(directory).mkdir(exist_ok=True)
-    
+    # Create necessary directories (a single stat each when they already exist)
+    for directory in _RUNTIME_DIRS:
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+
     # Initialize and test PostgreSQL database connection
     await initialize_database()
+
+    # Prime the sync connection pool used by the ORM code paths
+    try:
+        engine.connect().close()
+    except Exception as e:
+        logger.warning("Could not prime connection pool: %s", e)
     
     # Log configuration
-    logger.info(f"Database path: {os.getenv('CODEBASE_DB_PATH', './codebase_db')}")
-    logger.info(f"Embedding model: {os.getenv('EMBEDDING_MODEL', 'gemini')}")
+    logger.info("Database path: %s", os.getenv('CODEBASE_DB_PATH', './codebase_db'))
+    logger.info("Embedding model: %s", os.getenv('EMBEDDING_MODEL', 'gemini'))
     
     yield
     
@@ -114,11 +174,17 @@ async def lifespan(app: FastAPI):
     
     # Cleanup
     try:
-        from routers.codebase_router import indexer
-        indexer.cleanup()
+        codebase_router.indexer.cleanup()
         logger.info("Cleanup completed")
     except Exception as e:
-        logger.error(f"Cleanup error: {e}")
+        logger.error("Cleanup error: %s", e)
+
+    engine.dispose()
+    await async_engine.dispose()
+
+    # Log directly again, then flush whatever is still queued
+    logging.getLogger().handlers = log_handlers
+    log_listener.stop()
 
 
 # Create FastAPI app
@@ -128,39 +194,69 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 # CORS middleware
+# Explicit lists let Starlette pre-build preflight headers; wildcard origins
+# are also invalid together with allow_credentials=True
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    allow_origins=os.getenv("CORS_ORIGINS", "http://localhost:3000").split(","),
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=("GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"),
+    allow_headers=("Authorization", "Content-Type", "X-Request-ID"),
+    max_age=600,
 )
 
 
 # Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all requests."""
-    start_time = datetime.now()
-    
-    # Log request
-    logger.info(f"{request.method} {request.url.path} - Client: {request.client.host}")
-    
-    response = await call_next(request)
-    
-    # Log response
-    process_time = datetime.now() - start_time
-    logger.info(
-        f"{request.method} {request.url.path} - "
-        f"Status: {response.status_code} - "
-        f"Time: {process_time.total_seconds():.3f}s"
-    )
-    
-    return response
+# Probe/docs/static paths are passed through without access logging
+_LOG_SKIP_PATHS = frozenset({"/", "/health", "/openapi.json"})
+_LOG_SKIP_PREFIXES = ("/static", "/docs", "/redoc")
+
+
+class TimingLogMiddleware:
+    """Pure ASGI middleware that logs method, path, status and timing per request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path in _LOG_SKIP_PATHS or path.startswith(_LOG_SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter_ns()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            client = scope.get("client")
+            logger.info(
+                "%s %s client=%s status=%s time=%.3fms",
+                scope["method"],
+                path,
+                client[0] if client else "-",
+                status_code,
+                (time.perf_counter_ns() - start) / 1_000_000,
+            )
+
+
+app.add_middleware(TimingLogMiddleware)
 
 
 # Include routers
@@ -177,53 +273,71 @@ app.include_router(
 
 
 # Root endpoints
+# The root payload never changes, so it is serialized once at import time
+_ROOT_BYTES = orjson.dumps({
+    "name": "Tech API",
+    "version": "1.0.0",
+    "description": "API for codebase indexing and semantic search with AI-powered code modification planning",
+    "docs": "/docs",
+    "redoc": "/redoc",
+    "health": "/health",
+    "endpoints": {
+        "codebase": "/api/codebase",
+        "code_plan": "/api/code-plan"
+    }
+})
+
+
 @app.get("/", summary="Root Endpoint")
 async def root():
     """Root endpoint with API information."""
-    return {
-        "name": "Tech API",
-        "version": "1.0.0",
-        "description": "API for codebase indexing and semantic search with AI-powered code modification planning",
-        "docs": "/docs",
-        "redoc": "/redoc",
-        "health": "/health",
-        "endpoints": {
-            "codebase": "/api/codebase",
-            "code_plan": "/api/code-plan"
-        }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
+
+
+# Health check caches: the full payload is reused for a short window, while
+# server version/database/user/pgvector rarely change and are kept longer
+_HEALTH_TTL = 5.0
+_DB_STATIC_INFO_TTL = 300.0
+_health_cache = {"ts": 0.0, "payload": None}
+_db_static_info = {"ts": 0.0, "info": None}
+
+
+async def _get_db_static_info() -> dict:
+    """Return cached PostgreSQL server information, refreshing it when stale."""
+    now = time.monotonic()
+    if _db_static_info["info"] and now - _db_static_info["ts"] < _DB_STATIC_INFO_TTL:
+        return _db_static_info["info"]
+
+    async with async_engine.connect() as conn:
+        row = (await conn.execute(text(_DB_INFO_SQL))).one()
+    version, db_name, user, pgvector_version = row
+
+    info = {
+        "postgresql_version": version.split(',')[0] if version else 'unknown',
+        "database": db_name,
+        "user": user,
+        "pgvector": f"v{pgvector_version}" if pgvector_version else "not installed"
     }
+    _db_static_info["info"] = info
+    _db_static_info["ts"] = now
+    return info
 
 
 @app.get("/health", response_model=HealthResponse, summary="Health Check")
 async def health_check():
     """Health check endpoint with PostgreSQL database status."""
-    try:
-        from database import test_connection, engine
-        from sqlalchemy import text
+    if _health_cache["payload"] and time.monotonic() - _health_cache["ts"] < _HEALTH_TTL:
+        return _health_cache["payload"]
 
+    try:
         # Test database connection
-        db_healthy = test_connection()
+        db_healthy = await async_test_connection()
 
         # Get database info if connection is healthy
         db_info = {}
         if db_healthy:
             try:
-                with engine.connect() as conn:
-                    version = conn.execute(text("SELECT version()")).scalar()
-                    db_name = conn.execute(text("SELECT current_database()")).scalar()
-                    user = conn.execute(text("SELECT current_user")).scalar()
-
-                    # Check pgvector extension
-                    pgvector_version = conn.execute(
-                        text("SELECT extversion FROM pg_extension WHERE extname='vector'")
-                    ).scalar()
-
-                    db_info = {
-                        "postgresql_version": version.split(',')[0] if version else 'unknown',
-                        "database": db_name,
-                        "user": user,
-                        "pgvector": f"v{pgvector_version}" if pgvector_version else "not installed"
-                    }
+                db_info = await _get_db_static_info()
             except Exception as e:
                 db_info = {"info_error": str(e)}
 
@@ -231,7 +345,7 @@ async def health_check():
         status = "healthy" if db_healthy else "degraded"
         message = "All systems operational" if db_healthy else "Database connection failed"
 
-        return HealthResponse(
+        payload = HealthResponse(
             status=status,
             message=message,
             timestamp=datetime.now().isoformat(),
@@ -248,9 +362,12 @@ async def health_check():
                 }
             }
         )
+        _health_cache["payload"] = payload
+        _health_cache["ts"] = time.monotonic()
+        return payload
 
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        logger.error("Health check failed: %s", e)
         return HealthResponse(
             status="unhealthy",
             message=f"Health check failed: {str(e)}",
@@ -264,8 +381,8 @@ async def health_check():
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors."""
-    logger.warning(f"Validation error for {request.url.path}: {exc.errors()}")
-    return JSONResponse(
+    logger.warning("Validation error for %s: %s", request.url.path, exc.errors())
+    return ORJSONResponse(
         status_code=422,
         content={
             "error": "Validation error",
@@ -275,31 +392,28 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+# Static parts of the 404/500 bodies; only the path/request_id are spliced in
+_NOT_FOUND_PREFIX = b'{"error":"Not found","detail":"The endpoint '
+_NOT_FOUND_SUFFIX = b' was not found","suggestion":"Check the API documentation at /docs"}'
+_SERVER_ERROR_PREFIX = (
+    b'{"error":"Internal server error","detail":"An unexpected error occurred","request_id":'
+)
+
+
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc):
     """Handle 404 errors."""
-    return JSONResponse(
-        status_code=404,
-        content={
-            "error": "Not found",
-            "detail": f"The endpoint {request.url.path} was not found",
-            "suggestion": "Check the API documentation at /docs"
-        }
-    )
+    # orjson.dumps gives a quoted, escaped JSON string; strip the quotes to splice it in
+    body = _NOT_FOUND_PREFIX + orjson.dumps(request.url.path)[1:-1] + _NOT_FOUND_SUFFIX
+    return Response(content=body, status_code=404, media_type="application/json")
 
 
 @app.exception_handler(500)
 async def internal_server_error_handler(request: Request, exc):
     """Handle internal server errors."""
-    logger.error(f"Internal server error: {exc}")
-    return JSONResponse(
-        status_code=500,
-        content={
-            "error": "Internal server error",
-            "detail": "An unexpected error occurred",
-            "request_id": str(datetime.now().timestamp())
-        }
-    )
+    logger.error("Internal server error: %s", exc)
+    body = _SERVER_ERROR_PREFIX + orjson.dumps(str(datetime.now().timestamp())) + b"}"
+    return Response(content=body, status_code=500, media_type="application/json")
 
 
 # Optional: Serve static files for a simple frontend
@@ -310,16 +424,19 @@ if Path("static").exists():
 # Development server configuration
 if __name__ == "__main__":
     import uvicorn
-    
-    # Load environment variables
-    from dotenv import load_dotenv
-    load_dotenv()
-    
-    # Run development server
+
+    # Run server on uvloop + httptools (both ship with uvicorn[standard]).
+    # Access logs are off because TimingLogMiddleware already logs requests.
+    # Set UVICORN_RELOAD=false to run multiple workers in production.
+    reload = os.getenv("UVICORN_RELOAD", "true").lower() == "true"
     uvicorn.run(
         "app:app",
         host="127.0.0.1",
         port=8000,
-        reload=True,
-        log_level="info"
+        reload=reload,
+        workers=None if reload else int(os.getenv("WEB_CONCURRENCY", "4")),
+        log_level="info",
+        loop="uvloop",
+        http="httptools",
+        access_log=False
     )
\ No newline at end of file
@@ -8,16 +8,21 @@ from .tools import (
     analyze_impact,
     find_similar_patterns
 )
-from .agent import code_plan_agent
-
-# Google ADK requires root_agent
-root_agent = code_plan_agent
+from .agent import get_agent
 
 __all__ = [
     "code_plan_agent",
     "root_agent",
+    "get_agent",
     "search_related_code",
     "analyze_dependencies",
     "analyze_impact",
     "find_similar_patterns"
 ]
+
+
+def __getattr__(name):
+    # Agents are built lazily; Google ADK requires root_agent
+    if name in ("code_plan_agent", "root_agent"):
+        return get_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,22 +2,38 @@
 Tools for the code plan agent.
 """
 
+import re
 import logging
-from typing import Dict, Any, List, Optional
-from codebase import CodebaseIndexer
-from codebase.core import RelationshipStore
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from codebase.core.relationship_store import RelationshipStore
+from codebase.core.query_cache import QueryCache, make_query_key
+
+if TYPE_CHECKING:
+    from codebase import CodebaseIndexer
 
 logger = logging.getLogger(__name__)
 
+# Identifiers (optionally dotted) or quoted phrases: looked up literally, without HyDE
+_LITERAL_QUERY_RE = re.compile(r'[A-Za-z_][\w.]*|"[^"]+"|\'[^\']+\'|`[^`]+`')
+
+# Successful search_related_code results, keyed by normalized query
+_search_cache = QueryCache(maxsize=1024, ttl=900)
+
+# Maximum concurrent relationship queries per tool call
+MAX_RELATIONSHIP_WORKERS = 8
+
 # Global indexer instance
 _indexer = None
 _relationship_store = None
 
 
-def get_indexer() -> CodebaseIndexer:
+def get_indexer() -> "CodebaseIndexer":
     """Get or create global indexer instance."""
     global _indexer
     if _indexer is None:
+        # Imported here so relationship-only tools don't load the indexer stack
+        from codebase import CodebaseIndexer
         _indexer = CodebaseIndexer()
     return _indexer
 
@@ -30,6 +46,11 @@ def get_relationship_store() -> RelationshipStore:
     return _relationship_store
 
 
+def _copy_search_response(response: dict) -> dict:
+    """Copy a cached search response, so callers can't mutate the cached entry."""
+    return {**response, "results": [dict(result) for result in response["results"]]}
+
+
 def search_related_code(
     requirement: str,
     codebase_name: str,
@@ -50,13 +71,28 @@ def search_related_code(
         logger.info(f"Searching for code related to: {requirement}")
 
         indexer = get_indexer()
+
+        # Key on the collection version stored in the database, so re-indexing
+        # through any worker invalidates entries in all of them
+        collection_version = indexer.vector_store.get_collection_version(codebase_name)
+        cache_key = make_query_key(requirement, codebase_name, top_k, collection_version)
+        cached = _search_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Returning cached results for: {requirement}")
+            return _copy_search_response(cached)
+
+        # Literal symbol lookups don't benefit from HyDE or heuristic reranking
+        is_literal = _LITERAL_QUERY_RE.fullmatch(requirement.strip()) is not None
+        if is_literal:
+            logger.info("Literal query, using keyword search without HyDE")
+
         results = indexer.search(
             query=requirement,
             codebase_name=codebase_name,
             top_k=top_k,
-            search_type="hybrid",
-            use_hyde=True,
-            use_reranking=True,
+            search_type="keyword" if is_literal else "hybrid",
+            use_hyde=not is_literal,
+            use_reranking=not is_literal,
             include_context=False
         )
 
@@ -70,11 +106,15 @@ def search_related_code(
 
         logger.info(f"Found {len(results.get('results', []))} related code chunks")
 
-        return {
+        response = {
             "status": "success",
             "results": results.get('results', []),
             "total": results.get('total_results', 0)
         }
+        # Without a version (codebase missing or lookup failed) nothing could invalidate the entry
+        if collection_version is not None:
+            _search_cache.set(cache_key, _copy_search_response(response))
+        return response
 
     except Exception as e:
         logger.error(f"Error searching related code: {e}")
@@ -154,16 +194,14 @@ def analyze_dependencies(
         logger.info(f"Analyzing dependencies for: {target_components}")
 
         relationship_store = get_relationship_store()
-        all_dependencies = {}
+        all_dependencies = relationship_store.find_dependencies_batch(target_components, codebase_name)
 
-        for component_name in target_components:
-            deps = relationship_store.find_dependencies(component_name, codebase_name)
-            all_dependencies[component_name] = deps
-
-        # Summarize dependencies
-        total_imports = sum(len(d.get('imports', [])) for d in all_dependencies.values())
-        total_calls = sum(len(d.get('calls', [])) for d in all_dependencies.values())
-        total_inherits = sum(len(d.get('inherits', [])) for d in all_dependencies.values())
+        # Summarize dependencies in a single pass
+        total_imports = total_calls = total_inherits = 0
+        for deps in all_dependencies.values():
+            total_imports += len(deps.get('imports', ()))
+            total_calls += len(deps.get('calls', ()))
+            total_inherits += len(deps.get('inherits', ()))
 
         logger.info(f"Found {total_imports} imports, {total_calls} calls, {total_inherits} inheritance")
 
@@ -209,17 +247,22 @@ def analyze_impact(
         all_affected_files = set()
         total_affected_components = 0
 
-        for component in target_components:
-            chunk_id = component.get('id')
-            if not chunk_id:
-                continue
-
-            impact = relationship_store.find_impact_scope(
-                chunk_id=chunk_id,
-                codebase_name=codebase_name,
-                max_depth=2
-            )
-
+        chunk_ids = [component.get('id') for component in target_components if component.get('id')]
+
+        # Each impact lookup is an independent round-trip, so run them concurrently
+        impacts = []
+        if chunk_ids:
+            with ThreadPoolExecutor(max_workers=min(MAX_RELATIONSHIP_WORKERS, len(chunk_ids))) as executor:
+                impacts = list(executor.map(
+                    lambda chunk_id: relationship_store.find_impact_scope(
+                        chunk_id=chunk_id,
+                        codebase_name=codebase_name,
+                        max_depth=2
+                    ),
+                    chunk_ids
+                ))
+
+        for impact in impacts:
             if impact:
                 all_impacts.append(impact)
                 all_affected_files.update(impact.get('affected_files', []))
@@ -5,8 +5,15 @@ This module provides functionality to index codebases from various sources
 (GitHub, ZIP files, local directories) and perform semantic search on them.
 """
 
-from .indexer import CodebaseIndexer
 from .config import CodebaseConfig
 
 __version__ = "1.0.0"
-__all__ = ["CodebaseIndexer", "CodebaseConfig"]
\ No newline at end of file
+__all__ = ["CodebaseIndexer", "CodebaseConfig"]
+
+
+def __getattr__(name):
+    # The indexer pulls in the parser, vector store and AI SDKs; load on first use
+    if name == "CodebaseIndexer":
+        from .indexer import CodebaseIndexer
+        return CodebaseIndexer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,7 +8,7 @@ from typing import List, Dict
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class CodebaseConfig:
     """Configuration class for codebase indexing."""
     
@@ -30,6 +30,8 @@ class CodebaseConfig:
     # Embedding settings
     embedding_model: str = "gemini"  # or "openai"
     embedding_dimensions: int = 768  # Default for Gemini, will be auto-detected
+    embedding_quantization: str = "halfvec"  # ANN index precision: "fp32" or "halfvec" (pgvector >= 0.7)
+    embedding_cache_quantization: str = None  # Cached vector format: None (float32), "bf16" or "int8"
     chunk_size: int = 1000
     chunk_overlap: int = 100
     
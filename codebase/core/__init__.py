@@ -3,23 +3,24 @@ Core functionality for codebase processing.
 
 This module contains the core components for parsing, preprocessing,
 embedding generation, vector storage, and relationship extraction.
-"""
 
-from .parser import CodeParser
-from .preprocessor import FilePreprocessor
-from .embeddings import EmbeddingGenerator
-from .relationship_extractor import CodeRelationshipExtractor
-from .relationship_store import RelationshipStore
+Components are imported on first access so that, for example, using
+RelationshipStore does not load tree-sitter or the embedding SDKs.
+"""
 
-# Import PostgreSQL vector store as the default
-from .pg_vector_store import PostgreSQLVectorStore as VectorStore, VectorRecord
+import importlib
 
-# Keep old LanceDB version available for backward compatibility (if available)
-try:
-    from .vector_store import VectorStore as LanceDBVectorStore
-except ImportError:
-    # LanceDB not available, skip import
-    LanceDBVectorStore = None
+# Public name -> (submodule, attribute)
+_LAZY_IMPORTS = {
+    "CodeParser": (".parser", "CodeParser"),
+    "FilePreprocessor": (".preprocessor", "FilePreprocessor"),
+    "EmbeddingGenerator": (".embeddings", "EmbeddingGenerator"),
+    "CodeRelationshipExtractor": (".relationship_extractor", "CodeRelationshipExtractor"),
+    "RelationshipStore": (".relationship_store", "RelationshipStore"),
+    # PostgreSQL vector store is the default
+    "VectorStore": (".pg_vector_store", "PostgreSQLVectorStore"),
+    "VectorRecord": (".pg_vector_store", "VectorRecord"),
+}
 
 __all__ = [
     "CodeParser",
@@ -30,4 +31,22 @@ __all__ = [
     "LanceDBVectorStore",
     "CodeRelationshipExtractor",
     "RelationshipStore"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name == "LanceDBVectorStore":
+        # Keep old LanceDB version available for backward compatibility (if available)
+        try:
+            from .vector_store import VectorStore as value
+        except ImportError:
+            # LanceDB not available
+            value = None
+    elif name in _LAZY_IMPORTS:
+        module_name, attr = _LAZY_IMPORTS[name]
+        value = getattr(importlib.import_module(module_name, __name__), attr)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
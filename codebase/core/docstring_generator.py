@@ -3,14 +3,36 @@ AI-powered docstring generation for code chunks without docstrings.
 """
 
 import os
+import re
+import time
+import queue
+import atexit
+import sqlite3
 import hashlib
-import json
 import logging
-from typing import Optional, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
 from pathlib import Path
 
+try:
+    import xxhash
+except ImportError:
+    # Fall back to hashlib if xxhash is not installed
+    xxhash = None
+
 logger = logging.getLogger(__name__)
 
+# Maximum concurrent generation requests in generate_docstrings_batch
+MAX_CONCURRENT_REQUESTS = 16
+
+# Background cache writer: flush after this many entries or this many seconds
+CACHE_WRITE_BATCH_SIZE = 50
+CACHE_WRITE_INTERVAL = 0.1
+
+# Leading ```lang fence or inline backticks, and trailing fence/backticks
+_FENCE_RE = re.compile(r'\A\s*```[\w+-]*[ \t]*\n|\A\s*`{1,3}|`{1,3}\s*\Z')
+
 
 class DocstringGenerator:
     """Generates docstrings for code using AI models."""
@@ -26,6 +48,7 @@ class DocstringGenerator:
         self.model = model
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        self._init_cache_db()
 
         # Initialize model-specific components
         if model == "gemini":
@@ -35,6 +58,56 @@ class DocstringGenerator:
         else:
             raise ValueError(f"Unsupported model: {model}")
 
+    def _init_cache_db(self):
+        """Open (or create) the SQLite docstring cache."""
+        self.cache_db_path = self.cache_dir / "docstrings.sqlite"
+        self._cache_lock = threading.Lock()
+        self._cache_db = sqlite3.connect(str(self.cache_db_path), check_same_thread=False)
+        self._cache_db.execute("PRAGMA journal_mode=WAL")
+        self._cache_db.execute("PRAGMA synchronous=NORMAL")
+        self._cache_db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, docstring TEXT NOT NULL, generated_at REAL)"
+        )
+        self._cache_db.commit()
+
+        # Cache writes are queued and flushed by a single background thread
+        self._write_q: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._cache_writer,
+            name="docstring-cache-writer",
+            daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _cache_writer(self):
+        """Drain the write queue, committing entries in small batches."""
+        while True:
+            entry = self._write_q.get()
+            if entry is None:
+                return
+
+            batch = [entry]
+            stop = False
+            deadline = time.monotonic() + CACHE_WRITE_INTERVAL
+            while len(batch) < CACHE_WRITE_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = self._write_q.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+
+            self._save_many_to_cache(batch)
+            if stop:
+                return
+
     def _init_gemini(self):
         """Initialize Gemini for text generation."""
         try:
@@ -48,6 +121,14 @@ class DocstringGenerator:
 
             genai.configure(api_key=api_key)
             self.client = genai
+            # Built once and reused for every docstring
+            self._gen_model = genai.GenerativeModel(
+                "models/gemini-2.0-flash-exp",
+                generation_config={
+                    'temperature': 0.3,
+                    'max_output_tokens': 150,
+                }
+            )
             logger.info("Initialized Gemini for docstring generation")
         except ImportError:
             logger.error("google-generativeai not installed. AI docstring generation disabled.")
@@ -105,7 +186,7 @@ class DocstringGenerator:
             return None
 
         # Generate cache key
-        cache_key = self._generate_cache_key(code, chunk_type, name)
+        cache_key = self._generate_cache_key(code, chunk_type, name, language)
 
         # Check cache first
         cached_docstring = self._load_from_cache(cache_key)
@@ -135,6 +216,75 @@ class DocstringGenerator:
             logger.warning(f"Error generating docstring for {name}: {e}")
             return None
 
+    def generate_docstrings_batch(self, items: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Generate docstrings for many code chunks concurrently.
+
+        Cached entries are returned directly; the rest are generated with up to
+        MAX_CONCURRENT_REQUESTS requests in flight and cached in one write.
+
+        Args:
+            items: Dictionaries with keys 'code' and optionally 'chunk_type',
+                   'name' and 'language' (same meaning as generate_docstring)
+
+        Returns:
+            List of generated docstrings aligned with items (None where failed)
+        """
+        results: List[Optional[str]] = [None] * len(items)
+        if self.client is None:
+            logger.debug("AI client not available for docstring generation")
+            return results
+
+        # Serve cache hits, collect misses as (index, cache_key, item)
+        pending = []
+        for i, item in enumerate(items):
+            code = item.get('code', '')
+            if not code.strip():
+                continue
+            chunk_type = item.get('chunk_type', 'function')
+            name = item.get('name', 'unknown')
+            language = item.get('language', 'python')
+            cache_key = self._generate_cache_key(code, chunk_type, name, language)
+            cached_docstring = self._load_from_cache(cache_key)
+            if cached_docstring:
+                results[i] = cached_docstring
+            else:
+                pending.append((i, cache_key, item))
+
+        if not pending:
+            return results
+
+        def generate(entry):
+            _, _, item = entry
+            name = item.get('name', 'unknown')
+            try:
+                args = (
+                    item['code'],
+                    item.get('chunk_type', 'function'),
+                    name,
+                    item.get('language', 'python')
+                )
+                if self.model == "gemini":
+                    return self._generate_with_gemini(*args)
+                return self._generate_with_openai(*args)
+            except Exception as e:
+                logger.warning(f"Error generating docstring for {name}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_REQUESTS, len(pending))) as executor:
+            docstrings = list(executor.map(generate, pending))
+
+        new_entries = []
+        for (i, cache_key, _), docstring in zip(pending, docstrings):
+            if docstring:
+                results[i] = docstring
+                new_entries.append((cache_key, docstring))
+
+        for entry in new_entries:
+            self._write_q.put_nowait(entry)
+        logger.info(f"Generated {len(new_entries)}/{len(pending)} docstrings ({len(items) - len(pending)} cached)")
+        return results
+
     def _generate_with_gemini(
         self,
         code: str,
@@ -146,30 +296,10 @@ class DocstringGenerator:
         try:
             prompt = self._create_prompt(code, chunk_type, name, language)
 
-            # Create a GenerativeModel instance and use it
-            model = self.client.GenerativeModel("models/gemini-2.0-flash-exp")
-            response = model.generate_content(
-                prompt,
-                generation_config={
-                    'temperature': 0.3,
-                    'max_output_tokens': 150,
-                }
-            )
+            response = self._gen_model.generate_content(prompt)
 
             if response and response.text:
-                # Clean up the response
-                docstring = response.text.strip()
-                # Remove markdown code blocks if present
-                if docstring.startswith('```') or docstring.startswith('`'):
-                    lines = docstring.split('\n')
-                    # Remove first and last line if they're markdown markers
-                    if lines[0].startswith('```') or lines[0].startswith('`'):
-                        lines = lines[1:]
-                    if lines and (lines[-1].startswith('```') or lines[-1].startswith('`')):
-                        lines = lines[:-1]
-                    docstring = '\n'.join(lines).strip()
-
-                return docstring
+                return self._strip_fences(response.text)
 
             return None
 
@@ -199,17 +329,7 @@ class DocstringGenerator:
             )
 
             if response.choices and response.choices[0].message.content:
-                docstring = response.choices[0].message.content.strip()
-                # Clean up markdown if present
-                if docstring.startswith('```') or docstring.startswith('`'):
-                    lines = docstring.split('\n')
-                    if lines[0].startswith('```') or lines[0].startswith('`'):
-                        lines = lines[1:]
-                    if lines and (lines[-1].startswith('```') or lines[-1].startswith('`')):
-                        lines = lines[:-1]
-                    docstring = '\n'.join(lines).strip()
-
-                return docstring
+                return self._strip_fences(response.choices[0].message.content)
 
             return None
 
@@ -217,6 +337,10 @@ class DocstringGenerator:
             logger.warning(f"OpenAI generation error: {e}")
             return None
 
+    def _strip_fences(self, text: str) -> str:
+        """Remove markdown code fences or inline backticks wrapping a response."""
+        return _FENCE_RE.sub('', text.strip()).strip()
+
     def _create_prompt(self, code: str, chunk_type: str, name: str, language: str) -> str:
         """Create a prompt for docstring generation."""
         # Limit code length to avoid token limits
@@ -258,57 +382,76 @@ Code:
 
 Respond with ONLY the description text, without quotes or markdown. Keep it brief and clear."""
 
-    def _generate_cache_key(self, code: str, chunk_type: str, name: str) -> str:
-        """Generate a cache key for a code chunk."""
-        content = f"{chunk_type}:{name}:{code}"
+    def _generate_cache_key(self, code: str, chunk_type: str, name: str, language: str = "python") -> str:
+        """Generate a cache key for a code chunk and everything that shapes its prompt."""
+        content = f"{self.model}:{language}:{chunk_type}:{name}:{code}"
+        # Lookup key only, so a fast non-cryptographic hash is enough
+        if xxhash is not None:
+            return xxhash.xxh3_64_hexdigest(content)
         return hashlib.md5(content.encode('utf-8')).hexdigest()
 
     def _load_from_cache(self, cache_key: str) -> Optional[str]:
         """Load docstring from cache."""
-        cache_file = self.cache_dir / f"{cache_key}.json"
-
-        if not cache_file.exists():
-            return None
-
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return data.get('docstring')
+            with self._cache_lock:
+                row = self._cache_db.execute(
+                    "SELECT docstring FROM cache WHERE key = ?", (cache_key,)
+                ).fetchone()
+            return row[0] if row else None
         except Exception as e:
-            logger.warning(f"Error loading cache file {cache_file}: {e}")
+            logger.warning(f"Error loading docstring cache entry {cache_key}: {e}")
             return None
 
     def _save_to_cache(self, cache_key: str, docstring: str):
-        """Save docstring to cache."""
-        cache_file = self.cache_dir / f"{cache_key}.json"
+        """Queue a docstring for the background cache writer."""
+        self._write_q.put_nowait((cache_key, docstring))
 
-        try:
-            data = {
-                'docstring': docstring,
-                'generated_at': str(Path(__file__).stat().st_mtime)
-            }
+    def _save_many_to_cache(self, entries: List[tuple]):
+        """Save (cache_key, docstring) pairs to cache in a single transaction."""
+        if not entries:
+            return
 
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+        try:
+            now = time.time()
+            with self._cache_lock:
+                self._cache_db.executemany(
+                    "INSERT OR REPLACE INTO cache (key, docstring, generated_at) VALUES (?, ?, ?)",
+                    [(cache_key, docstring, now) for cache_key, docstring in entries]
+                )
+                self._cache_db.commit()
         except Exception as e:
             logger.warning(f"Error saving to cache: {e}")
 
     def clear_cache(self):
         """Clear docstring cache."""
         try:
-            for cache_file in self.cache_dir.glob("*.json"):
-                cache_file.unlink()
+            with self._cache_lock:
+                self._cache_db.execute("DELETE FROM cache")
+                self._cache_db.commit()
             logger.info("Docstring cache cleared")
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        cache_files = list(self.cache_dir.glob("*.json"))
-        total_size = sum(f.stat().st_size for f in cache_files)
+        with self._cache_lock:
+            count = self._cache_db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        total_size = sum(
+            path.stat().st_size
+            for path in self.cache_dir.glob(f"{self.cache_db_path.name}*")
+        )
 
         return {
             'cache_dir': str(self.cache_dir),
-            'num_cached_docstrings': len(cache_files),
+            'num_cached_docstrings': count,
             'total_cache_size_kb': total_size / 1024
         }
+
+    def close(self):
+        """Flush pending cache writes and close the cache database."""
+        if self._writer.is_alive():
+            self._write_q.put(None)
+            self._writer.join()
+        with self._cache_lock:
+            self._cache_db.close()
+        atexit.unregister(self.close)
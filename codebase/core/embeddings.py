@@ -3,39 +3,195 @@ Embedding generation for code chunks.
 """
 
 import os
+import time
+import random
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Optional, Any
 import hashlib
-import json
 import logging
+import orjson
+import numpy as np
 from dataclasses import dataclass
 from pathlib import Path
 
+try:
+    import blake3
+except ImportError:
+    # Fall back to hashlib's BLAKE2b if blake3 is not installed
+    blake3 = None
+
 logger = logging.getLogger(__name__)
 
+# Bump when the way vectors are produced changes, to invalidate cached entries
+EMBEDDING_CACHE_VERSION = "v1"
+
+# Number of embeddings kept in the in-process cache in front of SQLite
+HOT_CACHE_SIZE = 4096
+
+# Maximum cache keys per SELECT ... IN (...) lookup (SQLite's default variable limit is 999)
+CACHE_LOOKUP_CHUNK_SIZE = 500
+
+# Provider request budget and retry policy for rate-limited requests
+EMBEDDING_RPS = 50
+EMBEDDING_BURST = 10
+MAX_RATE_LIMIT_RETRIES = 3
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by all provider requests.
+
+    Provider calls run synchronously (the async path offloads them to worker
+    threads), so the bucket blocks the calling thread rather than awaiting.
+    """
+
+    def __init__(self, rps: float = EMBEDDING_RPS, burst: int = EMBEDDING_BURST):
+        """
+        Initialize the bucket.
+
+        Args:
+            rps: Sustained requests per second
+            burst: Maximum number of requests allowed back to back
+        """
+        self.rps = rps
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rps)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rps)
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold back all requests for ``seconds`` (e.g. after a Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Check whether a provider exception is a 429/quota error."""
+    if type(error).__name__ in ("RateLimitError", "ResourceExhausted", "TooManyRequests"):
+        return True
+    return getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Read the Retry-After header from a provider exception, if it carries one."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+# Storage formats for cached embedding blobs
+CACHE_QUANTIZATIONS = (None, "bf16", "int8")
+
+
+def _quantize(embedding: np.ndarray, quantization: Optional[str]) -> tuple:
+    """
+    Encode a float32 embedding for the cache.
+
+    Args:
+        embedding: float32 embedding vector
+        quantization: None (float32), "bf16" or "int8"
+
+    Returns:
+        Tuple of (blob, dtype tag, scale or None)
+    """
+    vec = np.asarray(embedding, dtype=np.float32)
+    if quantization == "bf16":
+        # Round to nearest even on the upper 16 bits of the float32 pattern
+        bits = vec.view(np.uint32)
+        rounded = (bits + 0x7FFF + ((bits >> 16) & 1)) >> 16
+        return rounded.astype(np.uint16).tobytes(), "bf16", None
+    if quantization == "int8":
+        max_abs = float(np.max(np.abs(vec))) if vec.size else 0.0
+        scale = max_abs / 127 if max_abs else 1.0
+        return np.round(vec / scale).astype(np.int8).tobytes(), "int8", scale
+    return vec.tobytes(), "f32", None
+
+
+def _dequantize(blob: bytes, dtype: str, scale: Optional[float]) -> np.ndarray:
+    """
+    Decode a cached embedding blob back to float32.
+
+    Args:
+        blob: Stored embedding bytes
+        dtype: Tag written by _quantize ("f32", "bf16" or "int8")
+        scale: int8 scale factor
+
+    Returns:
+        float32 embedding vector
+    """
+    if dtype == "bf16":
+        return (np.frombuffer(blob, dtype=np.uint16).astype(np.uint32) << 16).view(np.float32)
+    if dtype == "int8":
+        return np.frombuffer(blob, dtype=np.int8).astype(np.float32) * np.float32(scale)
+    return np.frombuffer(blob, dtype=np.float32)
+
 
 @dataclass
 class EmbeddingResult:
     """Result of embedding generation."""
     text: str
-    embedding: List[float]
+    embedding: np.ndarray  # float32, shape (dimensions,)
     metadata: Dict[str, Any]
     hash: str
+    # "<provider>|<model id>|<task type>|<cache version>" the vector was produced under
+    fingerprint: str = ""
 
 
 class EmbeddingGenerator:
     """Generates embeddings for code chunks."""
     
-    def __init__(self, model: str = "gemini", cache_dir: str = ".embedding_cache"):
+    def __init__(
+        self,
+        model: str = "gemini",
+        cache_dir: str = ".embedding_cache",
+        quantization: Optional[str] = None
+    ):
         """
         Initialize embedding generator.
         
         Args:
             model: Model to use ("gemini" or "openai")
             cache_dir: Directory to cache embeddings
+            quantization: Storage format for cached vectors: None (float32),
+                "bf16" (half the size) or "int8" (a quarter, with a per-vector scale)
         """
+        if quantization not in CACHE_QUANTIZATIONS:
+            raise ValueError(f"Unsupported quantization: {quantization}")
+
         self.model = model
+        self.quantization = quantization
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        self._init_cache_db()
+        self._hot: "OrderedDict[str, EmbeddingResult]" = OrderedDict()
+        self._hot_lock = threading.Lock()
+        self._hot_hits = 0
+        self._hot_misses = 0
+        self._limiter = RateLimiter()
         self.dimensions = None  # Will be detected from first embedding
         
         # Initialize model-specific components
@@ -46,8 +202,32 @@ class EmbeddingGenerator:
         else:
             raise ValueError(f"Unsupported model: {model}")
     
+    def _init_cache_db(self):
+        """Open (or create) the SQLite embedding cache."""
+        self.cache_db_path = self.cache_dir / "embeddings.sqlite"
+        self._cache_lock = threading.Lock()
+        self._cache_db = sqlite3.connect(str(self.cache_db_path), check_same_thread=False)
+        self._cache_db.execute("PRAGMA journal_mode=WAL")
+        self._cache_db.execute("PRAGMA synchronous=NORMAL")
+        # embedding is a blob in the format named by dtype (see _quantize), metadata is JSON
+        self._cache_db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "hash TEXT PRIMARY KEY, text TEXT NOT NULL, embedding BLOB NOT NULL, metadata BLOB, "
+            "dtype TEXT NOT NULL DEFAULT 'f32', scale REAL, fingerprint TEXT)"
+        )
+        # Bring caches created by older versions up to the current schema
+        columns = {row[1] for row in self._cache_db.execute("PRAGMA table_info(embeddings)")}
+        if "dtype" not in columns:
+            # Rows written before quantization support are all float32
+            self._cache_db.execute("ALTER TABLE embeddings ADD COLUMN dtype TEXT NOT NULL DEFAULT 'f32'")
+            self._cache_db.execute("ALTER TABLE embeddings ADD COLUMN scale REAL")
+        if "fingerprint" not in columns:
+            self._cache_db.execute("ALTER TABLE embeddings ADD COLUMN fingerprint TEXT")
+        self._cache_db.commit()
+
     def _init_gemini(self):
         """Initialize Gemini embeddings."""
+        self.embedding_model = "models/text-embedding-004"
         try:
             import google.generativeai as genai
             
@@ -69,7 +249,9 @@ class EmbeddingGenerator:
     
     def _init_openai(self):
         """Initialize OpenAI embeddings."""
+        self.embedding_model = "text-embedding-3-small"
         try:
+            import httpx
             from openai import OpenAI
             
             api_key = os.getenv("OPENAI_API_KEY")
@@ -78,8 +260,16 @@ class EmbeddingGenerator:
                 self.client = None
                 return
             
-            self.client = OpenAI(api_key=api_key)
-            self.embedding_model = "text-embedding-3-small"
+            # Keep connections warm between ingest batches (httpx expires idle ones after 5s by default)
+            self._http = httpx.Client(
+                limits=httpx.Limits(
+                    max_keepalive_connections=20,
+                    max_connections=100,
+                    keepalive_expiry=30.0
+                ),
+                timeout=60.0
+            )
+            self.client = OpenAI(api_key=api_key, http_client=self._http)
             logger.info("Initialized OpenAI embeddings")
         except ImportError:
             logger.error("openai not installed. Install with: pip install openai")
@@ -109,8 +299,7 @@ class EmbeddingGenerator:
             return None
 
         # Generate hash for caching (include query flag in hash)
-        cache_key = f"{text}_{for_query}"
-        text_hash = hashlib.md5(cache_key.encode('utf-8')).hexdigest()
+        text_hash = self._hash_key(text, for_query)
 
         # Check cache first
         cached_result = self._load_from_cache(text_hash)
@@ -138,9 +327,10 @@ class EmbeddingGenerator:
 
             result = EmbeddingResult(
                 text=text,
-                embedding=embedding,
+                embedding=np.asarray(embedding, dtype=np.float32),
                 metadata=metadata or {},
-                hash=text_hash
+                hash=text_hash,
+                fingerprint=self._fingerprint(for_query)
             )
 
             # Cache the result
@@ -160,42 +350,327 @@ class EmbeddingGenerator:
     ) -> List[EmbeddingResult]:
         """
         Generate embeddings for multiple texts.
+
+        Cache hits are split off first; the misses are sent to the provider
+        in one request per batch of ``batch_size`` texts.
         
         Args:
             texts: List of texts to embed
             metadata_list: List of metadata dictionaries
-            batch_size: Number of texts to process at once
+            batch_size: Number of texts to send per provider request
             
         Returns:
-            List of EmbeddingResult objects
+            List of EmbeddingResult objects (failed texts are omitted)
+        """
+        results = self.embed_batch(texts, metadata_list, batch_size=batch_size)
+        return [result for result in results if result]
+    
+    def embed_batch(
+        self,
+        texts: List[str],
+        metadata_list: List[Dict[str, Any]] = None,
+        for_query: bool = False,
+        batch_size: int = 64
+    ) -> List[Optional[EmbeddingResult]]:
+        """
+        Generate embeddings for many texts using the provider's batch endpoint.
+
+        Cached texts are served from the cache; the rest are sent in batches of
+        ``batch_size`` texts per request.
+
+        Args:
+            texts: Texts to embed
+            metadata_list: Metadata dictionaries, one per text
+            for_query: If True, optimize for query (uses retrieval_query task type for Gemini)
+            batch_size: Maximum number of texts per provider request
+
+        Returns:
+            List aligned with ``texts``; entries are None for empty texts or failures
         """
+        results: List[Optional[EmbeddingResult]] = [None] * len(texts)
         if not texts:
-            return []
-        
+            return results
+
+        if self.client is None:
+            logger.warning("No embedding client available. Please configure API keys.")
+            return results
+
         if metadata_list is None:
             metadata_list = [{}] * len(texts)
-        
-        results = []
-        
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i + batch_size]
-            batch_metadata = metadata_list[i:i + batch_size]
-            
-            logger.info(f"Processing batch {i//batch_size + 1}/{(len(texts) + batch_size - 1)//batch_size}")
-            
-            for text, metadata in zip(batch_texts, batch_metadata):
-                result = self.generate_embedding(text, metadata)
-                if result:
-                    results.append(result)
-        
+
+        pending, duplicates = self._split_cached(texts, for_query, results)
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            logger.debug(f"Embedding batch {start // batch_size + 1}/{(len(pending) + batch_size - 1) // batch_size}")
+            embeddings = self._generate_embeddings_batch([texts[i] for i, _ in batch], for_query)
+            self._store_batch(batch, embeddings, texts, metadata_list, results, for_query)
+
+        self._fill_duplicates(duplicates, texts, metadata_list, results)
         return results
-    
+
+    async def agenerate_batch_embeddings(
+        self,
+        texts: List[str],
+        metadata_list: List[Dict[str, Any]] = None,
+        for_query: bool = False,
+        batch_size: int = 64,
+        max_in_flight: int = 5
+    ) -> List[Optional[EmbeddingResult]]:
+        """
+        Async variant of embed_batch that submits batches concurrently.
+
+        Batches run in worker threads with at most ``max_in_flight`` provider
+        requests outstanding, so throughput is no longer bounded by one
+        round-trip at a time.
+
+        Args:
+            texts: Texts to embed
+            metadata_list: Metadata dictionaries, one per text
+            for_query: If True, optimize for query (uses retrieval_query task type for Gemini)
+            batch_size: Maximum number of texts per provider request
+            max_in_flight: Maximum concurrent provider requests
+
+        Returns:
+            List aligned with ``texts``; entries are None for empty texts or failures
+        """
+        results: List[Optional[EmbeddingResult]] = [None] * len(texts)
+        if not texts:
+            return results
+
+        if self.client is None:
+            logger.warning("No embedding client available. Please configure API keys.")
+            return results
+
+        if metadata_list is None:
+            metadata_list = [{}] * len(texts)
+
+        pending, duplicates = self._split_cached(texts, for_query, results)
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        async def run_batch(batch):
+            async with semaphore:
+                embeddings = await asyncio.to_thread(
+                    self._generate_embeddings_batch, [texts[i] for i, _ in batch], for_query
+                )
+            # Results are written at absolute indices, so completion order doesn't matter
+            self._store_batch(batch, embeddings, texts, metadata_list, results, for_query)
+
+        await asyncio.gather(*[
+            run_batch(pending[start:start + batch_size])
+            for start in range(0, len(pending), batch_size)
+        ])
+
+        self._fill_duplicates(duplicates, texts, metadata_list, results)
+        return results
+
+    def _split_cached(
+        self,
+        texts: List[str],
+        for_query: bool,
+        results: List[Optional[EmbeddingResult]]
+    ) -> tuple:
+        """
+        Fill ``results`` with cache hits and collect the texts that still need embedding.
+
+        Repeated texts (shared boilerplate, identical docstrings) are only
+        sent to the provider once.
+
+        Returns:
+            Tuple of (pending, duplicates): the first occurrence of each missed
+            text as (index, hash) pairs, and the later occurrences as
+            (index, index of first occurrence) pairs
+        """
+        duplicates = []
+        first_seen: Dict[str, int] = {}
+        for i, text in enumerate(texts):
+            if not text.strip():
+                continue
+            text_hash = self._hash_key(text, for_query)
+            if text_hash in first_seen:
+                duplicates.append((i, first_seen[text_hash]))
+            else:
+                first_seen[text_hash] = i
+
+        # Each key is hashed once above, then hits and misses are split in bulk
+        cached = self._load_many_from_cache(list(first_seen))
+        pending = []
+        for text_hash, i in first_seen.items():
+            cached_result = cached.get(text_hash)
+            if cached_result:
+                results[i] = cached_result
+            else:
+                pending.append((i, text_hash))
+        return pending, duplicates
+
+    def _fill_duplicates(
+        self,
+        duplicates: List[tuple],
+        texts: List[str],
+        metadata_list: List[Dict[str, Any]],
+        results: List[Optional[EmbeddingResult]]
+    ):
+        """Copy each first occurrence's embedding to its repeats, keeping their own metadata."""
+        for i, first in duplicates:
+            source = results[first]
+            if source is None:
+                continue
+            results[i] = EmbeddingResult(
+                text=texts[i],
+                embedding=source.embedding,
+                metadata=metadata_list[i] or {},
+                hash=source.hash,
+                fingerprint=source.fingerprint
+            )
+
+    def _store_batch(
+        self,
+        batch: List[tuple],
+        embeddings: List[Optional[List[float]]],
+        texts: List[str],
+        metadata_list: List[Dict[str, Any]],
+        results: List[Optional[EmbeddingResult]],
+        for_query: bool = False
+    ):
+        """Wrap a batch of provider embeddings in results and cache them together."""
+        fingerprint = self._fingerprint(for_query)
+        new_results = []
+        for (i, text_hash), embedding in zip(batch, embeddings):
+            if not embedding:
+                continue
+
+            # Auto-detect dimensions from first embedding
+            if self.dimensions is None:
+                self.dimensions = len(embedding)
+                logger.info(f"Auto-detected embedding dimensions: {self.dimensions}")
+
+            result = EmbeddingResult(
+                text=texts[i],
+                embedding=np.asarray(embedding, dtype=np.float32),
+                metadata=metadata_list[i] or {},
+                hash=text_hash,
+                fingerprint=fingerprint
+            )
+            new_results.append(result)
+            results[i] = result
+
+        self._save_many_to_cache(new_results)
+
+    def _fingerprint(self, for_query: bool) -> str:
+        """Identify the model and task a vector is produced under, so switching either never hits stale entries."""
+        if self.model == "gemini":
+            task_type = "retrieval_query" if for_query else "retrieval_document"
+        else:
+            task_type = "query" if for_query else "document"
+        return f"{self.model}|{self.embedding_model}|{task_type}|{EMBEDDING_CACHE_VERSION}"
+
+    def _hash_key(self, text: str, for_query: bool) -> str:
+        """Hash a text and its fingerprint into a 128-bit cache key."""
+        data = f"{self._fingerprint(for_query)}\x00{text}".encode('utf-8')
+        if blake3 is not None:
+            return blake3.blake3(data).hexdigest(length=16)
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def _generate_embeddings_batch(self, texts: List[str], for_query: bool = False) -> List[Optional[List[float]]]:
+        """
+        Generate embeddings for a batch of texts, one provider request when possible.
+
+        A failed request is split in half and each half retried, so a text the
+        provider rejects (e.g. over its per-input token limit) only loses
+        itself rather than the whole batch.
+
+        Returns:
+            Embeddings aligned with ``texts``; None for texts that couldn't be embedded
+        """
+        if self.model not in ("gemini", "openai"):
+            logger.error(f"Unknown model: {self.model}")
+            return [None] * len(texts)
+
+        embeddings = self._bisect_embeddings_batch(texts, for_query)
+        dropped = sum(1 for embedding in embeddings if embedding is None)
+        if dropped:
+            logger.warning(f"Dropped {dropped} of {len(texts)} texts the embedding provider could not embed")
+        return embeddings
+
+    def _bisect_embeddings_batch(self, texts: List[str], for_query: bool) -> List[Optional[List[float]]]:
+        """Request embeddings for texts, halving the batch on failure until single texts remain."""
+        embeddings = self._request_embeddings_batch(texts, for_query)
+        if embeddings is not None and len(embeddings) == len(texts):
+            return embeddings
+        if len(texts) == 1:
+            return [None]
+
+        middle = len(texts) // 2
+        return (
+            self._bisect_embeddings_batch(texts[:middle], for_query)
+            + self._bisect_embeddings_batch(texts[middle:], for_query)
+        )
+
+    def _request_embeddings_batch(self, texts: List[str], for_query: bool) -> Optional[List[List[float]]]:
+        """Send one batch request to the configured provider, returning None if it fails."""
+        if self.model == "gemini":
+            task_type = "retrieval_query" if for_query else "retrieval_document"
+            return self._generate_gemini_embeddings_batch(texts, task_type=task_type)
+        return self._generate_openai_embeddings_batch(texts)
+
+    def _call_provider(self, request, **kwargs):
+        """
+        Send a provider request through the rate limiter, retrying 429s.
+
+        Rate-limited requests back off exponentially with jitter (or for the
+        server's Retry-After, when given) and pause the shared bucket so
+        concurrent batches don't keep hammering the endpoint.
+        """
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self._limiter.acquire()
+            try:
+                return request(**kwargs)
+            except Exception as e:
+                if attempt == MAX_RATE_LIMIT_RETRIES or not _is_rate_limit_error(e):
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) + random.uniform(0, BACKOFF_BASE)
+                logger.warning(f"Embedding request rate limited, retrying in {delay:.1f}s ({attempt + 1}/{MAX_RATE_LIMIT_RETRIES})")
+                self._limiter.pause(delay)
+
+    def _generate_gemini_embeddings_batch(
+        self,
+        texts: List[str],
+        task_type: str = "retrieval_document"
+    ) -> Optional[List[List[float]]]:
+        """Generate embeddings for several texts using one Gemini request."""
+        try:
+            result = self._call_provider(
+                self.client.embed_content,
+                model=self.embedding_model,
+                content=texts,
+                task_type=task_type
+            )
+            return result['embedding']
+        except Exception as e:
+            logger.error(f"Gemini batch embedding error: {e}")
+            return None
+
+    def _generate_openai_embeddings_batch(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """Generate embeddings for several texts using one OpenAI request."""
+        try:
+            response = self._call_provider(
+                self.client.embeddings.create,
+                model=self.embedding_model,
+                input=texts
+            )
+            return [item.embedding for item in response.data]
+        except Exception as e:
+            logger.error(f"OpenAI batch embedding error: {e}")
+            return None
+
     def _generate_gemini_embedding(self, text: str, task_type: str = "retrieval_document") -> Optional[List[float]]:
         """Generate embedding using Gemini."""
         try:
-            # Use embed_content method
-            result = self.client.embed_content(
-                model="models/text-embedding-004",  # Latest embedding model
+            result = self._call_provider(
+                self.client.embed_content,
+                model=self.embedding_model,
                 content=text,
                 task_type=task_type
             )
@@ -207,7 +682,8 @@ class EmbeddingGenerator:
     def _generate_openai_embedding(self, text: str) -> Optional[List[float]]:
         """Generate embedding using OpenAI."""
         try:
-            response = self.client.embeddings.create(
+            response = self._call_provider(
+                self.client.embeddings.create,
                 model=self.embedding_model,
                 input=text
             )
@@ -216,61 +692,161 @@ class EmbeddingGenerator:
             logger.error(f"OpenAI embedding error: {e}")
             return None
     
+    def _remember(self, results: List[EmbeddingResult]):
+        """Add results to the in-process hot cache, evicting the least recently used."""
+        with self._hot_lock:
+            for result in results:
+                self._hot[result.hash] = result
+                self._hot.move_to_end(result.hash)
+            while len(self._hot) > HOT_CACHE_SIZE:
+                self._hot.popitem(last=False)
+
     def _load_from_cache(self, text_hash: str) -> Optional[EmbeddingResult]:
-        """Load embedding from cache."""
-        cache_file = self.cache_dir / f"{text_hash}.json"
-        
-        if not cache_file.exists():
-            return None
-        
-        try:
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
-            
-            return EmbeddingResult(
-                text=data['text'],
-                embedding=data['embedding'],
-                metadata=data['metadata'],
-                hash=data['hash']
-            )
-        except Exception as e:
-            logger.warning(f"Error loading cache file {cache_file}: {e}")
-            return None
+        """Load embedding from the hot cache, falling back to SQLite."""
+        return self._load_many_from_cache([text_hash]).get(text_hash)
+
+    def _load_many_from_cache(self, text_hashes: List[str]) -> Dict[str, EmbeddingResult]:
+        """
+        Load several embeddings, checking the hot cache first.
+
+        Keys missing from the hot cache are fetched from SQLite with one
+        ``IN (...)`` query per CACHE_LOOKUP_CHUNK_SIZE keys.
+
+        Returns:
+            Mapping of hash to result for the keys that were cached
+        """
+        found: Dict[str, EmbeddingResult] = {}
+        missing = []
+        with self._hot_lock:
+            for text_hash in text_hashes:
+                result = self._hot.get(text_hash)
+                if result is not None:
+                    self._hot.move_to_end(text_hash)
+                    found[text_hash] = result
+                else:
+                    missing.append(text_hash)
+            self._hot_hits += len(found)
+            self._hot_misses += len(missing)
+
+        loaded = []
+        for start in range(0, len(missing), CACHE_LOOKUP_CHUNK_SIZE):
+            keys = missing[start:start + CACHE_LOOKUP_CHUNK_SIZE]
+            try:
+                with self._cache_lock:
+                    rows = self._cache_db.execute(
+                        "SELECT hash, text, embedding, metadata, dtype, scale, fingerprint FROM embeddings "
+                        f"WHERE hash IN ({','.join('?' * len(keys))})",
+                        keys
+                    ).fetchall()
+            except Exception as e:
+                logger.warning(f"Error loading embedding cache entries: {e}")
+                continue
+
+            for text_hash, text, embedding_blob, metadata_blob, dtype, scale, fingerprint in rows:
+                try:
+                    result = EmbeddingResult(
+                        text=text,
+                        embedding=_dequantize(embedding_blob, dtype, scale),
+                        metadata=orjson.loads(metadata_blob) if metadata_blob else {},
+                        hash=text_hash,
+                        fingerprint=fingerprint or ""
+                    )
+                except Exception as e:
+                    logger.warning(f"Error loading embedding cache entry {text_hash}: {e}")
+                    continue
+                found[text_hash] = result
+                loaded.append(result)
+
+        self._remember(loaded)
+        return found
     
     def _save_to_cache(self, result: EmbeddingResult):
         """Save embedding to cache."""
-        cache_file = self.cache_dir / f"{result.hash}.json"
-        
+        self._save_many_to_cache([result])
+
+    def _save_many_to_cache(self, results: List[EmbeddingResult]):
+        """Save embeddings to cache in a single transaction."""
+        if not results:
+            return
+
+        rows = []
+        for result in results:
+            blob, dtype, scale = _quantize(result.embedding, self.quantization)
+            if dtype != "f32":
+                # Hand out what the disk tier will return, so a text embeds the
+                # same whether it's fresh, a hot hit or a disk hit after a restart
+                result.embedding = _dequantize(blob, dtype, scale)
+            rows.append((
+                result.hash, result.text, blob, orjson.dumps(result.metadata),
+                dtype, scale, result.fingerprint
+            ))
+
+        self._remember(results)
         try:
-            data = {
-                'text': result.text,
-                'embedding': result.embedding,
-                'metadata': result.metadata,
-                'hash': result.hash
-            }
-            
-            with open(cache_file, 'w') as f:
-                json.dump(data, f)
+            with self._cache_lock:
+                self._cache_db.executemany(
+                    "INSERT OR REPLACE INTO embeddings "
+                    "(hash, text, embedding, metadata, dtype, scale, fingerprint) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._cache_db.commit()
         except Exception as e:
             logger.warning(f"Error saving to cache: {e}")
     
     def clear_cache(self):
         """Clear embedding cache."""
         try:
-            for cache_file in self.cache_dir.glob("*.json"):
-                cache_file.unlink()
+            with self._cache_lock:
+                self._cache_db.execute("DELETE FROM embeddings")
+                self._cache_db.commit()
+            with self._hot_lock:
+                self._hot.clear()
             logger.info("Embedding cache cleared")
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
     
+    def purge_stale_cache(self) -> int:
+        """
+        Delete cache entries produced under a different model or cache version.
+
+        Returns:
+            Number of entries removed
+        """
+        current = (self._fingerprint(False), self._fingerprint(True))
+        try:
+            with self._cache_lock:
+                cursor = self._cache_db.execute(
+                    "DELETE FROM embeddings WHERE fingerprint IS NULL OR fingerprint NOT IN (?, ?)",
+                    current
+                )
+                self._cache_db.commit()
+            with self._hot_lock:
+                self._hot = OrderedDict(
+                    (key, result) for key, result in self._hot.items() if result.fingerprint in current
+                )
+            if cursor.rowcount:
+                logger.info(f"Purged {cursor.rowcount} stale embedding cache entries")
+            return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Error purging stale cache entries: {e}")
+            return 0
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        cache_files = list(self.cache_dir.glob("*.json"))
-        
-        total_size = sum(f.stat().st_size for f in cache_files)
+        with self._cache_lock:
+            count = self._cache_db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        total_size = sum(
+            path.stat().st_size
+            for path in self.cache_dir.glob(f"{self.cache_db_path.name}*")
+        )
         
         return {
             'cache_dir': str(self.cache_dir),
-            'num_cached_embeddings': len(cache_files),
-            'total_cache_size_mb': total_size / (1024 * 1024)
-        }
\ No newline at end of file
+            'num_cached_embeddings': count,
+            'total_cache_size_mb': total_size / (1024 * 1024),
+            'hot_cache_size': len(self._hot),
+            'hot_cache_hits': self._hot_hits,
+            'hot_cache_misses': self._hot_misses
+        }
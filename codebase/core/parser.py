@@ -3,17 +3,123 @@ Tree-sitter based code parser for extracting code structures.
 """
 
 from typing import List, Dict, Optional, Tuple, Any
+import os
+import re
+import sqlite3
+import multiprocessing
+import hashlib
+import threading
 import tree_sitter
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
 import logging
 
+try:
+    import blake3
+except ImportError:
+    # Fall back to hashlib's BLAKE2b if blake3 is not installed
+    blake3 = None
+
 logger = logging.getLogger(__name__)
 
+# Bump when chunking logic changes, to invalidate cached parse results
+PARSE_CACHE_VERSION = "v4"
+
+# parse_files only starts worker processes for at least this many uncached files
+PARALLEL_PARSE_MIN_FILES = 8
+
+# Previous trees kept per thread for incremental reparsing of edited files
+INCREMENTAL_TREE_CACHE_SIZE = 128
+
+# Per-process parser used by parse_files workers
+_worker_parser = None
+
+# Grammar packages for the supported languages
+LANGUAGE_MODULES = {
+    'python': 'tree_sitter_python',
+    'javascript': 'tree_sitter_javascript',
+    'java': 'tree_sitter_java',
+    'go': 'tree_sitter_go',
+    'rust': 'tree_sitter_rust'
+}
+
+# Languages and compiled queries are loaded once and shared by every CodeParser
+_LANGUAGES: Dict[str, Any] = {}
+_QUERIES: Dict[str, Any] = {}
+_languages_lock = threading.Lock()
+_languages_loaded = False
+
 # Optional: AI docstring generator (lazily imported)
 _docstring_generator = None
 
-
-@dataclass
+# Tree-sitter queries capturing the definitions each language is chunked by.
+# Matching runs inside the C core, so only definition nodes cross into Python.
+DEFINITION_QUERIES = {
+    'python': """
+        (function_definition name: (identifier) @name) @function
+        (class_definition name: (identifier) @name) @class
+    """,
+    'javascript': """
+        (function_declaration name: (identifier) @name) @function
+        (method_definition name: (_) @name) @function
+        (arrow_function) @function
+        (class_declaration name: (identifier) @name) @class
+    """,
+    'java': """
+        (class_declaration name: (identifier) @name) @class
+        (interface_declaration name: (identifier) @name) @class
+        (enum_declaration name: (identifier) @name) @class
+        (record_declaration name: (identifier) @name) @class
+        (method_declaration name: (identifier) @name) @function
+        (constructor_declaration name: (identifier) @name) @function
+    """,
+    # Go methods are declared at top level; their receiver type stands in for the class
+    'go': """
+        (function_declaration name: (identifier) @name) @function
+        (method_declaration
+            receiver: (parameter_list (parameter_declaration type: [
+                (type_identifier) @receiver
+                (generic_type type: (type_identifier) @receiver)
+                (pointer_type (type_identifier) @receiver)
+                (pointer_type (generic_type type: (type_identifier) @receiver))
+            ]))
+            name: (field_identifier) @name) @function
+        (type_spec name: (type_identifier) @name type: [(struct_type) (interface_type)]) @class
+    """,
+    # impl blocks are not chunked themselves, but name the type their functions belong to
+    'rust': """
+        (function_item name: (identifier) @name) @function
+        (struct_item name: (type_identifier) @name) @class
+        (enum_item name: (type_identifier) @name) @class
+        (trait_item name: (type_identifier) @name) @class
+        (impl_item type: [
+            (type_identifier) @name
+            (generic_type type: (type_identifier) @name)
+        ]) @scope
+    """,
+}
+
+# Keywords at least one of which every definition a language's query matches
+# must spell out; files containing none of them have nothing to chunk
+DEFINITION_KEYWORDS = {
+    'python': ('def', 'class'),
+    'java': ('class', 'interface', 'enum', 'record'),
+    'go': ('func', 'struct', 'interface'),
+    'rust': ('fn', 'struct', 'enum', 'trait'),
+}
+
+
+def _may_define(content: str, language: str) -> bool:
+    """Cheap substring pre-scan; False only when the file cannot contain a definition."""
+    keywords = DEFINITION_KEYWORDS.get(language)
+    return keywords is None or any(keyword in content for keyword in keywords)
+
+
+# slots: no per-instance __dict__, which adds up over a whole repository's chunks
+@dataclass(slots=True)
 class CodeChunk:
     """Represents a chunk of code with metadata."""
     content: str
@@ -27,123 +133,400 @@ class CodeChunk:
     description: Optional[str] = None
 
 
+def _load_languages():
+    """Load the tree-sitter grammars and compile their queries, once per process."""
+    global _languages_loaded
+    with _languages_lock:
+        if _languages_loaded:
+            return
+
+        # Outcomes are collected and logged once rather than per language
+        missing_modules = []
+        for lang_name, module_name in LANGUAGE_MODULES.items():
+            try:
+                # Import the language module
+                lang_module = __import__(module_name)
+
+                language = tree_sitter.Language(lang_module.language())
+                if lang_name in DEFINITION_QUERIES:
+                    _QUERIES[lang_name] = tree_sitter.Query(language, DEFINITION_QUERIES[lang_name])
+
+                _LANGUAGES[lang_name] = language
+            except ImportError:
+                missing_modules.append(module_name)
+            except Exception as e:
+                logger.warning(f"Could not initialize parser for {lang_name}: {e}")
+
+        logger.info(f"Initialized parsers for {', '.join(_LANGUAGES) or 'no languages'}")
+        if missing_modules:
+            logger.warning(f"Could not import {', '.join(missing_modules)}")
+        _languages_loaded = True
+
+
+def _common_prefix_length(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the common prefix of two byte strings, up to limit, by binary search over C-level compares."""
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[low:mid] == b[low:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _byte_point(encoded: bytes, offset: int) -> Tuple[int, int]:
+    """Convert a byte offset into the (row, column) point tree-sitter expects."""
+    row = encoded.count(b'\n', 0, offset)
+    line_start = encoded.rfind(b'\n', 0, offset) + 1
+    return row, offset - line_start
+
+
+def _init_parse_worker(ai_docstring_enabled: bool, ai_model: str, cache_dir: str):
+    """Build the worker process's parser once; tree-sitter parsers can't be pickled."""
+    global _worker_parser
+    _worker_parser = CodeParser(
+        ai_docstring_enabled=ai_docstring_enabled,
+        ai_model=ai_model,
+        cache_dir=cache_dir
+    )
+
+
+def _parse_in_worker(file: Tuple[str, str, str]) -> List[CodeChunk]:
+    """Parse one (file_path, content, language) tuple in a worker process."""
+    return _worker_parser.parse_file(*file)
+
+
 class CodeParser:
     """Tree-sitter based code parser for multiple languages."""
 
-    def __init__(self, ai_docstring_enabled: bool = True, ai_model: str = "gemini"):
+    def __init__(
+        self,
+        ai_docstring_enabled: bool = True,
+        ai_model: str = "gemini",
+        cache_dir: str = ".parse_cache"
+    ):
         """
         Initialize the code parser with supported languages.
 
         Args:
             ai_docstring_enabled: Whether to generate docstrings using AI when not present
             ai_model: AI model to use for docstring generation ("gemini" or "openai")
+            cache_dir: Directory to cache parsed chunks, keyed by file content
         """
-        self.parsers = {}
-        self.languages = {}
         self.ai_docstring_enabled = ai_docstring_enabled
         self.ai_model = ai_model
         self._docstring_generator = None
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(exist_ok=True)
+        self._init_cache_db()
         self._setup_languages()
+        # Worker pool for parse_files, started on first use and reused across calls
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _init_cache_db(self):
+        """Open (or create) the SQLite parse cache."""
+        self.cache_db_path = self.cache_dir / "chunks.sqlite"
+        self._cache_lock = threading.Lock()
+        self._cache_db = sqlite3.connect(str(self.cache_db_path), check_same_thread=False)
+        self._cache_db.execute("PRAGMA journal_mode=WAL")
+        self._cache_db.execute("PRAGMA synchronous=NORMAL")
+        # chunks is a JSON list of CodeChunk fields
+        self._cache_db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (key TEXT PRIMARY KEY, chunks BLOB NOT NULL)"
+        )
+        self._cache_db.commit()
     
     def _setup_languages(self):
-        """Set up tree-sitter parsers for supported languages."""
-        language_modules = {
-            'python': 'tree_sitter_python',
-            'javascript': 'tree_sitter_javascript', 
-            'java': 'tree_sitter_java',
-            'go': 'tree_sitter_go',
-            'rust': 'tree_sitter_rust'
-        }
-        
-        for lang_name, module_name in language_modules.items():
-            try:
-                # Import the language module
-                lang_module = __import__(module_name)
-                
-                # Get language and create parser
-                language = tree_sitter.Language(lang_module.language())
-                parser = tree_sitter.Parser(language)
-                
-                self.languages[lang_name] = language
-                self.parsers[lang_name] = parser
-                logger.info(f"Initialized parser for {lang_name}")
-            except ImportError as e:
-                logger.warning(f"Could not import {module_name}: {e}")
-            except Exception as e:
-                logger.warning(f"Could not initialize parser for {lang_name}: {e}")
+        """Set up tree-sitter languages for supported languages."""
+        _load_languages()
+        self.languages = _LANGUAGES
+        self.queries = _QUERIES
+        # tree_sitter.Parser isn't thread-safe, so each thread gets its own, created on first use
+        self._tls = threading.local()
+
+    def _edited_previous_tree(self, tree_key: Tuple[str, str], encoded: bytes):
+        """
+        Get the last tree parsed for a file, edited to match its new content.
+
+        The change is described as one edit spanning everything between the
+        longest common prefix and suffix of the old and new bytes, which lets
+        tree-sitter reuse every subtree outside it.
+
+        Args:
+            tree_key: (file_path, language) the tree was parsed for
+            encoded: New UTF-8 encoded content
+
+        Returns:
+            Edited old tree, or None if this thread hasn't parsed the file
+        """
+        trees = getattr(self._tls, 'trees', None)
+        previous = trees.pop(tree_key, None) if trees is not None else None
+        if previous is None:
+            return None
+
+        old, tree = previous
+        limit = min(len(old), len(encoded))
+        start = _common_prefix_length(old, encoded, limit)
+        suffix = _common_prefix_length(old[::-1], encoded[::-1], limit - start)
+        old_end = len(old) - suffix
+        new_end = len(encoded) - suffix
+
+        tree.edit(
+            start_byte=start,
+            old_end_byte=old_end,
+            new_end_byte=new_end,
+            start_point=_byte_point(encoded, start),
+            old_end_point=_byte_point(old, old_end),
+            new_end_point=_byte_point(encoded, new_end)
+        )
+        return tree
+
+    def _remember_tree(self, tree_key: Tuple[str, str], encoded: bytes, tree):
+        """Keep a parsed tree for incremental reparsing, evicting the least recently parsed file."""
+        trees = getattr(self._tls, 'trees', None)
+        if trees is None:
+            trees = self._tls.trees = OrderedDict()
+        trees[tree_key] = (encoded, tree)
+        while len(trees) > INCREMENTAL_TREE_CACHE_SIZE:
+            trees.popitem(last=False)
+
+    def _get_parser(self, language: str):
+        """Get this thread's tree-sitter parser for a language."""
+        parsers = getattr(self._tls, 'parsers', None)
+        if parsers is None:
+            parsers = self._tls.parsers = {}
+        parser = parsers.get(language)
+        if parser is None:
+            parser = parsers[language] = tree_sitter.Parser(self.languages[language])
+        return parser
     
     def parse_file(self, file_path: str, content: str, language: str) -> List[CodeChunk]:
-        """Parse a file and extract code chunks."""
-        if language not in self.parsers:
+        """Parse a file and extract code chunks, reusing cached chunks for unchanged content."""
+        if language not in self.languages:
             logger.warning(f"Language {language} not supported, treating as plain text")
             return self._parse_as_plain_text(file_path, content, language)
-        
+
+        # Tiny files such as package __init__ modules skip hashing, the cache and tree-sitter
+        if not _may_define(content, language):
+            return []
+
+        ai_enabled = self.ai_docstring_enabled
+        cache_key = self._cache_key(file_path, content, language)
+        cached_chunks = self._load_from_cache(cache_key)
+        if cached_chunks is not None:
+            return cached_chunks
+
+        chunks = self._parse_tree(file_path, content, language)
+        # Don't cache results from a run where AI generation got disabled midway
+        if chunks is not None and self.ai_docstring_enabled == ai_enabled:
+            self._save_to_cache(cache_key, chunks)
+        return chunks if chunks is not None else self._parse_as_plain_text(file_path, content, language)
+
+    def parse_files(
+        self,
+        files: List[Tuple[str, str, str]],
+        max_workers: Optional[int] = None
+    ) -> List[List[CodeChunk]]:
+        """
+        Parse many files, spreading uncached ones over worker processes.
+
+        Cache hits are served in this process; the remaining files are parsed
+        in a process pool so tree-sitter and chunk extraction use every core
+        instead of one GIL-bound thread.
+
+        Args:
+            files: (file_path, content, language) tuples
+            max_workers: Maximum worker processes (defaults to the CPU count)
+
+        Returns:
+            List of chunk lists aligned with ``files``
+        """
+        results: List[Optional[List[CodeChunk]]] = [None] * len(files)
+        pending = []
+        for i, (file_path, content, language) in enumerate(files):
+            if language in self.languages:
+                if not _may_define(content, language):
+                    results[i] = []
+                    continue
+                cache_key = self._cache_key(file_path, content, language)
+                cached_chunks = self._load_from_cache(cache_key)
+                if cached_chunks is not None:
+                    results[i] = cached_chunks
+                    continue
+            pending.append(i)
+
+        max_workers = min(max_workers or os.cpu_count() or 1, len(pending))
+        if len(pending) >= PARALLEL_PARSE_MIN_FILES and max_workers > 1:
+            try:
+                executor = self._get_executor(max_workers)
+                chunk_lists = executor.map(
+                    _parse_in_worker,
+                    [files[i] for i in pending],
+                    chunksize=max(1, len(pending) // (max_workers * 4))
+                )
+                for i, chunks in zip(pending, chunk_lists):
+                    results[i] = chunks
+            except Exception as e:
+                logger.warning(f"Parallel parsing failed, falling back to serial parsing: {e}")
+                # A broken pool can't run more work; the next call starts a fresh one
+                self.close()
+
+        # Small batches, and anything a failed pool didn't finish, are parsed here
+        for i in pending:
+            if results[i] is None:
+                results[i] = self.parse_file(*files[i])
+
+        return results
+
+    def _get_executor(self, max_workers: int) -> ProcessPoolExecutor:
+        """
+        Get the worker pool, starting it on first use.
+
+        Spawned workers each load every grammar, so one pool is kept for the
+        parser's lifetime instead of being started for each parse_files call.
+
+        Args:
+            max_workers: Worker processes to start if no pool is running yet
+
+        Returns:
+            Running ProcessPoolExecutor
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                # spawn rather than fork: the parent may hold SQLite connections and client threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_parse_worker,
+                    initargs=(self.ai_docstring_enabled, self.ai_model, str(self.cache_dir))
+                )
+            return self._executor
+
+    def close(self):
+        """Shut down the parse_files worker pool, if one was started."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _parse_tree(self, file_path: str, content: str, language: str) -> Optional[List[CodeChunk]]:
+        """Parse a file with tree-sitter, returning None if parsing fails."""
         try:
-            parser = self.parsers[language]
-            tree = parser.parse(bytes(content, 'utf8'))
+            parser = self._get_parser(language)
+            # Tree-sitter offsets index into these bytes, so nodes are sliced from them directly
+            encoded = content.encode('utf-8')
+            tree_key = (file_path, language)
+            old_tree = self._edited_previous_tree(tree_key, encoded)
+            tree = parser.parse(encoded, old_tree) if old_tree is not None else parser.parse(encoded)
+            self._remember_tree(tree_key, encoded, tree)
+            # Slicing a memoryview doesn't copy, so each node is decoded straight from the buffer
+            source_bytes = memoryview(encoded)
             
             chunks = []
             if language == 'python':
-                chunks.extend(self._parse_python(tree.root_node, content, file_path))
-            elif language in ['javascript', 'typescript']:
-                chunks.extend(self._parse_javascript(tree.root_node, content, file_path, language))
-            elif language == 'java':
-                chunks.extend(self._parse_java(tree.root_node, content, file_path))
-            elif language == 'go':
-                chunks.extend(self._parse_go(tree.root_node, content, file_path))
-            elif language == 'rust':
-                chunks.extend(self._parse_rust(tree.root_node, content, file_path))
+                chunks.extend(self._parse_python(tree.root_node, source_bytes, file_path))
+            elif language in self.queries:
+                chunks.extend(self._parse_definitions(tree.root_node, source_bytes, file_path, language))
             
             return chunks
             
         except Exception as e:
             logger.error(f"Error parsing {file_path}: {e}")
-            return self._parse_as_plain_text(file_path, content, language)
+            return None
+
+    def _cache_key(self, file_path: str, content: str, language: str) -> str:
+        """Hash a file's path, language and content into a 128-bit cache key."""
+        # Descriptions depend on whether AI generation is on and which model writes them
+        ai_model = self.ai_model if self.ai_docstring_enabled else None
+        header = f"{PARSE_CACHE_VERSION}\x00{file_path}\x00{language}\x00{ai_model}\x00"
+        data = (header + content).encode('utf-8')
+        if blake3 is not None:
+            return blake3.blake3(data).hexdigest(length=16)
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def _load_from_cache(self, cache_key: str) -> Optional[List[CodeChunk]]:
+        """Load cached chunks for a file."""
+        try:
+            with self._cache_lock:
+                row = self._cache_db.execute(
+                    "SELECT chunks FROM chunks WHERE key = ?", (cache_key,)
+                ).fetchone()
+            if row is None:
+                return None
+            return [CodeChunk(**fields) for fields in orjson.loads(row[0])]
+        except Exception as e:
+            logger.warning(f"Error loading parse cache entry {cache_key}: {e}")
+            return None
+
+    def _save_to_cache(self, cache_key: str, chunks: List[CodeChunk]):
+        """Save the chunks parsed from a file to the cache."""
+        try:
+            with self._cache_lock:
+                self._cache_db.execute(
+                    "INSERT OR REPLACE INTO chunks (key, chunks) VALUES (?, ?)",
+                    (cache_key, orjson.dumps(chunks))
+                )
+                self._cache_db.commit()
+        except Exception as e:
+            logger.warning(f"Error saving parse cache entry {cache_key}: {e}")
+
+    def clear_cache(self):
+        """Clear the parse cache."""
+        try:
+            with self._cache_lock:
+                self._cache_db.execute("DELETE FROM chunks")
+                self._cache_db.commit()
+            logger.info("Parse cache cleared")
+        except Exception as e:
+            logger.error(f"Error clearing parse cache: {e}")
     
     def _parse_as_plain_text(self, file_path: str, content: str, language: str) -> List[CodeChunk]:
         """Fallback method to parse as plain text."""
-        lines = content.split('\n')
+        # Chunks are sliced between newline offsets instead of splitting into lines and re-joining
+        newlines = [match.start() for match in re.finditer('\n', content)]
+        total_lines = len(newlines) + 1
         chunks = []
         
         # Split into chunks of ~50 lines
         chunk_size = 50
-        for i in range(0, len(lines), chunk_size):
-            chunk_lines = lines[i:i+chunk_size]
-            chunk_content = '\n'.join(chunk_lines)
+        for i in range(0, total_lines, chunk_size):
+            start = newlines[i - 1] + 1 if i else 0
+            end = newlines[i + chunk_size - 1] if i + chunk_size <= len(newlines) else len(content)
             
             chunk = CodeChunk(
-                content=chunk_content,
+                content=content[start:end],
                 language=language,
                 chunk_type='text',
                 name=f"chunk_{i//chunk_size}",
                 file_path=file_path,
                 line_start=i + 1,
-                line_end=min(i + chunk_size, len(lines))
+                line_end=min(i + chunk_size, total_lines)
             )
             chunks.append(chunk)
         
         return chunks
     
-    def _get_node_text(self, node, source_code: str) -> str:
+    def _get_node_text(self, node, source_bytes: memoryview) -> str:
         """
         Extract text from a tree-sitter node.
 
         Args:
             node: Tree-sitter node with byte offsets
-            source_code: Source code as string
+            source_bytes: View over the UTF-8 encoded source the tree was parsed from
 
         Returns:
             Extracted text from the node
 
         Note:
-            Tree-sitter uses byte offsets, but Python strings use character indices.
-            We need to convert to bytes, slice, then decode back to handle multi-byte
-            UTF-8 characters correctly.
+            Tree-sitter uses byte offsets, not character indices, so the node is
+            sliced from the encoded source and only that slice is decoded. This
+            keeps multi-byte UTF-8 characters correct without re-encoding the
+            whole file for every node, and without copying the node's bytes
+            before decoding them.
         """
-        # Convert to bytes, extract using byte offsets, then decode back
-        source_bytes = source_code.encode('utf-8')
-        node_bytes = source_bytes[node.start_byte:node.end_byte]
-        return node_bytes.decode('utf-8')
+        return str(source_bytes[node.start_byte:node.end_byte], 'utf-8')
 
     def _extract_docstring(self, docstring_text: str) -> str:
         """
@@ -160,80 +543,56 @@ class CodeParser:
 
         text = docstring_text.strip()
 
-        # Try to remove quotes in order of specificity
-        for quote in ['"""', "'''", '"', "'"]:
-            if text.startswith(quote) and text.endswith(quote) and len(text) >= 2 * len(quote):
-                return text[len(quote):-len(quote)].strip()
+        # Triple quotes first, then single; the opening quote is read off the text directly
+        quote = text[:3]
+        if quote in ('"""', "'''") and len(text) >= 6 and text.endswith(quote):
+            return text[3:-3].strip()
+        quote = text[:1]
+        if quote in ('"', "'") and len(text) >= 2 and text.endswith(quote):
+            return text[1:-1].strip()
 
         # If no quotes found, return as-is
         return text
 
-    def _get_or_generate_description(
-        self,
-        node,
-        content: str,
-        chunk_type: str,
-        name: str,
-        language: str = "python"
-    ) -> Optional[str]:
+    def _get_description(self, node, source_bytes: memoryview) -> Optional[str]:
         """
-        Extract description from node or generate using AI if not present.
+        Extract the docstring written in a definition's body.
 
         Args:
-            node: Tree-sitter node
-            content: Source code content
-            chunk_type: Type of code chunk ('function', 'class', etc.)
-            name: Name of the function/class
-            language: Programming language
+            node: Tree-sitter function/class node
+            source_bytes: View over the UTF-8 encoded source the tree was parsed from
 
         Returns:
-            Description text or None
+            Docstring text, or None if the definition has none
         """
-        # First, try to extract description from the code
-        description = None
-
-        if len(node.children) > 0:
-            body = node.children[-1]  # function/class body
-            if body.type == 'block':
-                for stmt in body.children:
-                    if stmt.type == 'expression_statement':
-                        expr = stmt.children[0] if stmt.children else None
-                        if expr and expr.type == 'string':
-                            description_raw = self._get_node_text(expr, content)
-                            description = self._extract_docstring(description_raw)
-                            break
-
-        # If description exists, return it
-        if description:
-            return description
-
-        # If no description and AI is enabled, generate one
-        if self.ai_docstring_enabled:
-            return self._generate_ai_description(node, content, chunk_type, name, language)
-
-        return None
-
-    def _generate_ai_description(
-        self,
-        node,
-        content: str,
-        chunk_type: str,
-        name: str,
-        language: str
-    ) -> Optional[str]:
+        body = node.child_by_field_name('body')  # function/class body
+        if body is None or body.type != 'block':
+            return None
+
+        # Only the first statement can be a docstring; comments before it don't count
+        stmt = body.named_child(0)
+        while stmt is not None and stmt.type == 'comment':
+            stmt = stmt.next_named_sibling
+        if stmt is None or stmt.type != 'expression_statement':
+            return None
+
+        expr = stmt.named_child(0)
+        if expr is None or expr.type != 'string':
+            return None
+        return self._extract_docstring(self._get_node_text(expr, source_bytes)) or None
+
+    def _generate_ai_descriptions(self, chunks: List[CodeChunk], pending: List[Tuple[int, Dict[str, Any]]]):
         """
-        Generate description using AI.
+        Generate descriptions for the chunks of one file in a single batch.
 
         Args:
-            node: Tree-sitter node
-            content: Source code content
-            chunk_type: Type of code chunk
-            name: Name of the function/class
-            language: Programming language
-
-        Returns:
-            Generated description or None
+            chunks: Chunks parsed from the file
+            pending: (chunk index, docstring request) pairs for chunks without
+                a docstring; requests are the items generate_docstrings_batch takes
         """
+        if not pending:
+            return
+
         # Lazy import and initialization
         if self._docstring_generator is None:
             try:
@@ -244,218 +603,147 @@ class CodeParser:
                 logger.warning(f"Failed to initialize AI docstring generator: {e}")
                 # Disable AI generation if initialization fails
                 self.ai_docstring_enabled = False
-                return None
+                return
 
-        # Generate description
         try:
-            code = self._get_node_text(node, content)
-            description = self._docstring_generator.generate_docstring(
-                code=code,
-                chunk_type=chunk_type,
-                name=name,
-                language=language
-            )
-            return description
+            descriptions = self._docstring_generator.generate_docstrings_batch([item for _, item in pending])
         except Exception as e:
-            logger.warning(f"Error generating AI description for {name}: {e}")
-            return None
+            logger.warning(f"Error generating AI descriptions for {chunks[0].file_path}: {e}")
+            return
+
+        for (i, _), description in zip(pending, descriptions):
+            chunks[i].description = description
     
-    def _parse_python(self, root_node, content: str, file_path: str) -> List[CodeChunk]:
+    def _match_definitions(self, language: str, root_node, source_bytes: memoryview) -> List[Tuple[Any, str, Optional[str], Optional[str]]]:
+        """
+        Run the language's definition query over a tree.
+
+        Args:
+            language: Language whose query to run
+            root_node: Root node of the parsed tree
+            source_bytes: View over the UTF-8 encoded source the tree was parsed from
+
+        Returns:
+            List of (node, kind, name, receiver) tuples in source order, where
+            kind is 'function', 'class' or 'scope' (a container that names its
+            members but is not chunked), name is None when the query captures
+            none and receiver is the owning type named outside the definition
+        """
+        definitions = []
+        for _, captures in tree_sitter.QueryCursor(self.queries[language]).matches(root_node):
+            kind = next(k for k in ('class', 'scope', 'function') if k in captures)
+            name_nodes = captures.get('name')
+            name = self._get_node_text(name_nodes[0], source_bytes) if name_nodes else None
+            receiver_nodes = captures.get('receiver')
+            receiver = self._get_node_text(receiver_nodes[0], source_bytes) if receiver_nodes else None
+            definitions.append((captures[kind][0], kind, name, receiver))
+
+        # Outer definitions before the ones nested in them, as a pre-order walk would yield
+        definitions.sort(key=lambda item: (item[0].start_byte, -item[0].end_byte))
+        return definitions
+
+    def _parse_python(self, root_node, source_bytes: memoryview, file_path: str) -> List[CodeChunk]:
         """Parse Python code using tree-sitter."""
         chunks = []
-
-        def traverse_node(node, parent_name: str = None):
-            # Handle decorated definitions (functions/classes with decorators)
-            if node.type == 'decorated_definition':
-                # Find the actual function or class definition inside
-                for child in node.children:
-                    if child.type in ['function_definition', 'class_definition']:
-                        # Process the inner definition but use the decorated_definition node
-                        # for extracting content (to include decorators)
-                        if child.type == 'function_definition':
-                            func_name = None
-                            # Find function name
-                            for subchild in child.children:
-                                if subchild.type == 'identifier':
-                                    func_name = self._get_node_text(subchild, content)
-                                    break
-
-                            # Determine chunk type (function or method)
-                            chunk_type = 'method' if parent_name else 'function'
-
-                            # Extract or generate description from the function definition
-                            description = self._get_or_generate_description(
-                                node=child,
-                                content=content,
-                                chunk_type=chunk_type,
-                                name=func_name or 'unknown_function',
-                                language='python'
-                            )
-
-                            # Use decorated_definition node for content to include decorators
-                            chunk = CodeChunk(
-                                content=self._get_node_text(node, content),
-                                language='python',
-                                chunk_type=chunk_type,
-                                name=func_name or 'unknown_function',
-                                file_path=file_path,
-                                line_start=node.start_point[0] + 1,
-                                line_end=node.end_point[0] + 1,
-                                parent_name=parent_name,
-                                description=description
-                            )
-                            chunks.append(chunk)
-                        elif child.type == 'class_definition':
-                            # Handle decorated class similarly
-                            traverse_node(child, parent_name)
-                return  # Don't traverse children again
-
-            if node.type == 'function_definition':
-                func_name = None
-
-                # Find function name
-                for child in node.children:
-                    if child.type == 'identifier':
-                        func_name = self._get_node_text(child, content)
-                        break
-
-                # Determine chunk type (function or method)
+        # Chunks without a docstring, described together once the file is walked
+        needs_description = []
+        definitions = self._match_definitions('python', root_node, source_bytes)
+        class_names = {node.id: name for node, kind, name, _ in definitions if kind == 'class'}
+        # Ancestors are compared by grammar symbol id, which avoids building a type string per node
+        language = self.languages['python']
+        decorated_kind = language.id_for_node_kind('decorated_definition', True)
+        class_kind = language.id_for_node_kind('class_definition', True)
+
+        for node, kind, name, _ in definitions:
+            # Walk up to find the enclosing class; the bodies of decorated
+            # functions are not chunked, but decorated classes are
+            parent_name = None
+            found_class = False
+            skip = False
+            child, ancestor = node, node.parent
+            while ancestor is not None:
+                ancestor_kind = ancestor.kind_id
+                if ancestor_kind == decorated_kind and child != node and child.kind_id != class_kind:
+                    skip = True
+                    break
+                if ancestor_kind == class_kind and not found_class:
+                    parent_name = class_names.get(ancestor.id)
+                    found_class = True
+                child, ancestor = ancestor, ancestor.parent
+            if skip:
+                continue
+
+            if kind == 'function':
+                # Use the decorated_definition node for content to include decorators
+                decorated = node.parent if node.parent is not None and node.parent.kind_id == decorated_kind else None
+                content_node = decorated or node
                 chunk_type = 'method' if parent_name else 'function'
+                name = name or 'unknown_function'
+            else:
+                content_node = node
+                chunk_type = 'class'
+                name = name or 'unknown_class'
+
+            # Extract description from the definition itself
+            description = self._get_description(node, source_bytes)
+            if description is None and self.ai_docstring_enabled:
+                needs_description.append((len(chunks), {
+                    'code': self._get_node_text(node, source_bytes),
+                    'chunk_type': chunk_type,
+                    'name': name,
+                    'language': 'python'
+                }))
 
-                # Extract or generate description
-                description = self._get_or_generate_description(
-                    node=node,
-                    content=content,
-                    chunk_type=chunk_type,
-                    name=func_name or 'unknown_function',
-                    language='python'
-                )
-
-                chunk = CodeChunk(
-                    content=self._get_node_text(node, content),
-                    language='python',
-                    chunk_type=chunk_type,
-                    name=func_name or 'unknown_function',
-                    file_path=file_path,
-                    line_start=node.start_point[0] + 1,
-                    line_end=node.end_point[0] + 1,
-                    parent_name=parent_name,
-                    description=description
-                )
-                chunks.append(chunk)
-
-            elif node.type == 'class_definition':
-                class_name = None
-
-                # Find class name
-                for child in node.children:
-                    if child.type == 'identifier':
-                        class_name = self._get_node_text(child, content)
-                        break
-
-                # Extract or generate description for class
-                description = self._get_or_generate_description(
-                    node=node,
-                    content=content,
-                    chunk_type='class',
-                    name=class_name or 'unknown_class',
-                    language='python'
-                )
-
-                chunk = CodeChunk(
-                    content=self._get_node_text(node, content),
-                    language='python',
-                    chunk_type='class',
-                    name=class_name or 'unknown_class',
-                    file_path=file_path,
-                    line_start=node.start_point[0] + 1,
-                    line_end=node.end_point[0] + 1,
-                    parent_name=parent_name,
-                    description=description
-                )
-                chunks.append(chunk)
-
-                # Parse methods inside class
-                for child in node.children:
-                    traverse_node(child, class_name)
-                return  # Don't traverse children again
-
-            # Traverse children
-            for child in node.children:
-                traverse_node(child, parent_name)
+            chunk = CodeChunk(
+                content=self._get_node_text(content_node, source_bytes),
+                language='python',
+                chunk_type=chunk_type,
+                name=name,
+                file_path=file_path,
+                line_start=content_node.start_point[0] + 1,
+                line_end=content_node.end_point[0] + 1,
+                parent_name=parent_name,
+                description=description
+            )
+            chunks.append(chunk)
 
-        traverse_node(root_node)
+        self._generate_ai_descriptions(chunks, needs_description)
         return chunks
     
-    def _parse_javascript(self, root_node, content: str, file_path: str, language: str) -> List[CodeChunk]:
-        """Parse JavaScript/TypeScript code."""
+    def _parse_definitions(self, root_node, source_bytes: memoryview, file_path: str, language: str) -> List[CodeChunk]:
+        """Parse JavaScript, Java, Go or Rust code using the language's definition query."""
         chunks = []
-        
-        def traverse_node(node, parent_name: str = None):
-            if node.type in ['function_declaration', 'method_definition', 'arrow_function']:
-                func_name = 'anonymous_function'
-                
-                # Find function name
-                for child in node.children:
-                    if child.type == 'identifier':
-                        func_name = self._get_node_text(child, content)
-                        break
-                
-                chunk = CodeChunk(
-                    content=self._get_node_text(node, content),
-                    language=language,
-                    chunk_type='function',
-                    name=func_name,
-                    file_path=file_path,
-                    line_start=node.start_point[0] + 1,
-                    line_end=node.end_point[0] + 1,
-                    parent_name=parent_name
-                )
-                chunks.append(chunk)
-            
-            elif node.type == 'class_declaration':
-                class_name = 'unknown_class'
-                
-                for child in node.children:
-                    if child.type == 'identifier':
-                        class_name = self._get_node_text(child, content)
-                        break
-                
-                chunk = CodeChunk(
-                    content=self._get_node_text(node, content),
-                    language=language,
-                    chunk_type='class',
-                    name=class_name,
-                    file_path=file_path,
-                    line_start=node.start_point[0] + 1,
-                    line_end=node.end_point[0] + 1,
-                    parent_name=parent_name
-                )
-                chunks.append(chunk)
-                
-                # Parse methods inside class
-                for child in node.children:
-                    traverse_node(child, class_name)
-                return
-            
-            # Traverse children
-            for child in node.children:
-                traverse_node(child, parent_name)
-        
-        traverse_node(root_node)
+        definitions = self._match_definitions(language, root_node, source_bytes)
+        scope_names = {node.id: name for node, kind, name, _ in definitions if kind != 'function'}
+
+        for node, kind, name, receiver in definitions:
+            if kind == 'scope':
+                continue
+
+            # Definitions belong to their receiver type, else the nearest enclosing class
+            parent_name = receiver
+            ancestor = node.parent
+            while parent_name is None and ancestor is not None:
+                if ancestor.id in scope_names:
+                    parent_name = scope_names[ancestor.id]
+                    break
+                ancestor = ancestor.parent
+
+            if kind == 'function':
+                name = name or 'anonymous_function'
+            else:
+                name = name or 'unknown_class'
+
+            chunk = CodeChunk(
+                content=self._get_node_text(node, source_bytes),
+                language=language,
+                chunk_type=kind,
+                name=name,
+                file_path=file_path,
+                line_start=node.start_point[0] + 1,
+                line_end=node.end_point[0] + 1,
+                parent_name=parent_name
+            )
+            chunks.append(chunk)
+
         return chunks
-    
-    def _parse_java(self, root_node, content: str, file_path: str) -> List[CodeChunk]:
-        """Parse Java code."""
-        # Simplified Java parsing - similar structure to Python
-        return self._parse_python(root_node, content, file_path)
-    
-    def _parse_go(self, root_node, content: str, file_path: str) -> List[CodeChunk]:
-        """Parse Go code."""
-        # Simplified Go parsing
-        return self._parse_python(root_node, content, file_path)
-    
-    def _parse_rust(self, root_node, content: str, file_path: str) -> List[CodeChunk]:
-        """Parse Rust code."""
-        # Simplified Rust parsing
-        return self._parse_python(root_node, content, file_path)
\ No newline at end of file
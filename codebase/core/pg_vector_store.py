@@ -2,25 +2,193 @@
 PostgreSQL vector store with pgvector for code embeddings.
 """
 
+import io
+import json
+import uuid
 import logging
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass
-from sqlalchemy import text, func, desc
+import numpy as np
+from sqlalchemy import text, func, desc, cast, insert, select, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
+from pgvector.sqlalchemy import Vector, HALFVEC
 
 from ..models import Codebase, CodeChunk, IndexingHistory
+from .query_cache import SemanticCache
 from database import SessionLocal, engine
 
 logger = logging.getLogger(__name__)
 
+# Search results keyed by query embedding, shared by all store instances;
+# scopes include the collection version, so writes make old entries unreachable
+_semantic_cache = SemanticCache(maxsize=1024, threshold=0.97)
 
-@dataclass
+
+# Adds codebases.version to tables created before it existed (create_all only creates tables)
+CODEBASE_VERSION_COLUMN_SQL = (
+    "ALTER TABLE codebases ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0"
+)
+
+# Bulk inserts at least this large drop the codebase's ANN indexes first and rebuild them after
+REINDEX_THRESHOLD = 10000
+
+# Session settings for ANN index builds, so the graph is built in memory and in parallel
+INDEX_BUILD_MAINTENANCE_WORK_MEM = "2GB"
+INDEX_BUILD_PARALLEL_WORKERS = 4
+
+# HNSW parameter tiers by indexed vector count: (upper bound, m, ef_construction, ef_search)
+HNSW_TIERS = (
+    (100_000, 16, 64, 40),
+    (1_000_000, 24, 128, 100),
+    (None, 32, 256, 200),
+)
+
+# code_chunks columns written by COPY, in the order each TSV row lists them
+COPY_COLUMNS = (
+    "id", "codebase_id", "text", "embedding", "chunk_type", "name", "file_path",
+    "language", "line_start", "line_end", "parent_name", "description",
+    "description_embedding", "meta_info", "created_at"
+)
+
+# Characters that must be backslash-escaped in COPY's text format
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _copy_field(value) -> str:
+    """Encode one value as a COPY text-format field (NULL is \\N)."""
+    if value is None:
+        return '\\N'
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _vector_literals(vectors: Sequence[Optional[Sequence[float]]]) -> List[Optional[str]]:
+    """
+    Unit-normalize a batch of vectors and format them in pgvector's text form.
+
+    The batch is normalized as one float32 matrix and each row is rendered
+    by a single %-format call, so no Python code runs per element.
+
+    Args:
+        vectors: Vectors of equal dimensionality; None entries stay None
+
+    Returns:
+        '[x,y,...]' literals aligned with ``vectors``
+    """
+    literals: List[Optional[str]] = [None] * len(vectors)
+    present = [i for i, vector in enumerate(vectors) if vector is not None]
+    if not present:
+        return literals
+
+    matrix = np.asarray([vectors[i] for i in present], dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+    # 9 significant digits round-trip float32 exactly
+    row_format = '[' + ','.join(['%.9g'] * matrix.shape[1]) + ']'
+    for i, row in zip(present, matrix.tolist()):
+        literals[i] = row_format % tuple(row)
+    return literals
+
+
+def configure_hnsw_params(vector_count: int) -> Dict[str, int]:
+    """
+    Pick HNSW build and search parameters for a dataset size.
+
+    Larger graphs need more links per node and wider candidate lists, both
+    while building and while searching, to keep recall steady.
+
+    Args:
+        vector_count: Number of vectors the index covers
+
+    Returns:
+        Dictionary with m, ef_construction and ef_search
+    """
+    for limit, m, ef_construction, ef_search in HNSW_TIERS:
+        if limit is None or vector_count < limit:
+            return {'m': m, 'ef_construction': ef_construction, 'ef_search': ef_search}
+
+
+def configure_ivfflat_params(vector_count: int) -> Dict[str, int]:
+    """
+    Pick IVFFlat build and search parameters for a dataset size.
+
+    Args:
+        vector_count: Number of vectors the index covers
+
+    Returns:
+        Dictionary with lists (about sqrt(N)) and probes (a tenth of the
+        lists, at least 10, since the server default of 1 loses recall)
+    """
+    lists = max(10, min(int(vector_count ** 0.5), 1000))
+    return {'lists': lists, 'probes': min(lists, max(10, int(lists * 0.1)))}
+
+
+def _dims_filter(column, query_vector: List[float]):
+    """Restrict a vector column to rows with the query's dimensionality."""
+    return func.vector_dims(column) == len(query_vector)
+
+
+def _normalize(vector: Optional[Sequence[float]]) -> Optional[np.ndarray]:
+    """Scale a vector to unit length, so inner product equals cosine similarity."""
+    if vector is None:
+        return None
+    array = np.asarray(vector, dtype=np.float32)
+    return array / (np.linalg.norm(array) + 1e-12)
+
+
+def _ip_distance(column, query_vector: Sequence[float], precision: str = "vector"):
+    """
+    Negative inner product expression that matches the per-dimension ANN indexes.
+
+    Stored and query vectors are unit-normalized, so this ranks exactly like
+    cosine distance (which is 1 plus this value) without the per-row norms.
+    The embedding columns are declared without a dimension, so indexes are
+    built on ``column::vector(n)`` (or ``halfvec(n)``); queries must use the
+    same cast to hit them.
+    """
+    vector_type = HALFVEC if precision == "halfvec" else Vector
+    return cast(column, vector_type(len(query_vector))).max_inner_product(query_vector)
+
+
+# Columns search results are built from; selecting them (rather than CodeChunk)
+# returns plain rows, skipping ORM instance hydration and the identity map
+SEARCH_COLUMNS = (
+    CodeChunk.id,
+    CodeChunk.text,
+    CodeChunk.chunk_type,
+    CodeChunk.name,
+    CodeChunk.file_path,
+    CodeChunk.language,
+    CodeChunk.line_start,
+    CodeChunk.line_end,
+    CodeChunk.parent_name,
+    CodeChunk.description,
+)
+
+
+def _search_result(row) -> Dict[str, Any]:
+    """Build a search result dictionary from a SEARCH_COLUMNS row with its distance."""
+    return {
+        'id': str(row.id),
+        'text': row.text,
+        'chunk_type': row.chunk_type,
+        'name': row.name,
+        'file_path': row.file_path,
+        'language': row.language,
+        'line_start': row.line_start,
+        'line_end': row.line_end,
+        'parent_name': row.parent_name,
+        'description': row.description,
+        'score': 1.0 + float(row.distance)  # Cosine distance
+    }
+
+
+@dataclass(slots=True)
 class VectorRecord:
     """Record in the vector database - keeping same interface as LanceDB version."""
     id: str
     text: str
-    vector: List[float]
+    vector: Sequence[float]  # list or float32 ndarray
     chunk_type: str
     name: str
     file_path: str
@@ -29,21 +197,26 @@ class VectorRecord:
     line_end: int
     parent_name: Optional[str] = None
     description: Optional[str] = None
-    description_embedding: Optional[List[float]] = None
+    description_embedding: Optional[Sequence[float]] = None
     metadata: Optional[Dict[str, Any]] = None
 
 
 class PostgreSQLVectorStore:
     """PostgreSQL-based vector store for code embeddings using pgvector."""
     
-    def __init__(self, database_url: str = None):
+    def __init__(self, database_url: str = None, quantization: str = "fp32"):
         """
         Initialize PostgreSQL vector store.
 
         Args:
             database_url: PostgreSQL connection URL (ignored - uses DATABASE_URL from env)
+            quantization: ANN index precision, "fp32" or "halfvec" (pgvector >= 0.7)
         """
         self._initialized = False
+        self.quantization = quantization
+        self._pgvector_version = None
+        # codebase id -> (version, chunk count) that search widths are sized from
+        self._search_sizes: Dict[int, Tuple[int, int]] = {}
         logger.info("PostgreSQL vector store initialized")
     
     def initialize(self):
@@ -67,6 +240,10 @@ class PostgreSQLVectorStore:
             # Create tables
             Base.metadata.create_all(bind=engine)
 
+            with engine.connect() as conn:
+                conn.execute(text(CODEBASE_VERSION_COLUMN_SQL))
+                conn.commit()
+
             # Create indexes for better performance
             self._create_indexes()
 
@@ -82,43 +259,203 @@ class PostgreSQLVectorStore:
         try:
             session = SessionLocal()
             try:
-                # Check if we have enough data for IVFFlat index
-                row_count = session.execute(text("SELECT COUNT(*) FROM code_chunks")).scalar()
-                
-                if row_count >= 1000:  # Only create IVFFlat if we have enough data
-                    # Calculate appropriate number of lists (roughly sqrt of rows, capped between 10 and 1000)
-                    lists = max(10, min(int(row_count ** 0.5), 1000))
-                    
-                    index_sql = f"""
-                    CREATE INDEX IF NOT EXISTS idx_code_chunks_embedding_cosine 
-                    ON code_chunks USING ivfflat (embedding vector_cosine_ops) 
-                    WITH (lists = {lists})
-                    """
-                    session.execute(text(index_sql))
-                    session.commit()
-                    logger.info(f"Created IVFFlat index with {lists} lists for {row_count} rows")
-                else:
-                    logger.info(f"Skipping IVFFlat index creation - only {row_count} rows (need at least 1000)")
-
-                # Additional indexes for common queries
+                # Indexes for common filter columns
                 indexes = [
                     "CREATE INDEX IF NOT EXISTS idx_code_chunks_language ON code_chunks(language)",
                     "CREATE INDEX IF NOT EXISTS idx_code_chunks_chunk_type ON code_chunks(chunk_type)",
                     "CREATE INDEX IF NOT EXISTS idx_code_chunks_name ON code_chunks(name)",
                     "CREATE INDEX IF NOT EXISTS idx_code_chunks_parent_name ON code_chunks(parent_name)",
+                    # Serves get_codebase_stats' largest-chunk lookup as a top-1 index scan
+                    "CREATE INDEX IF NOT EXISTS idx_code_chunks_textlen ON code_chunks(codebase_id, length(text) DESC)",
                 ]
 
                 for index_sql in indexes:
                     session.execute(text(index_sql))
 
                 session.commit()
-                logger.info("Created vector and query indexes")
+                logger.info("Created query indexes")
             finally:
                 session.close()
                 
         except Exception as e:
             logger.warning(f"Error creating indexes: {e}")
     
+    def _get_pgvector_version(self, session: Session) -> tuple:
+        """Get the installed pgvector version as a (major, minor) tuple."""
+        if self._pgvector_version is None:
+            version = session.execute(
+                text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            ).scalar() or "0.0"
+            self._pgvector_version = tuple(int(part) for part in version.split(".")[:2])
+        return self._pgvector_version
+
+    def _index_precision(self, session: Session) -> str:
+        """Get the vector type used by the ANN indexes ("vector" or "halfvec")."""
+        if self.quantization == "halfvec" and self._get_pgvector_version(session) >= (0, 7):
+            return "halfvec"
+        return "vector"
+
+    def _apply_search_settings(self, session: Session, collection_state: Tuple[int, int], top_k: int):
+        """
+        Set the ANN search width (hnsw.ef_search or ivfflat.probes) for the
+        session's current transaction, sized to the codebase's own index.
+
+        The codebase's chunk count is counted once per collection version,
+        since each codebase is searched through its own partial index.
+
+        Args:
+            session: Session the search query will run on
+            collection_state: (codebase id, version) being searched
+            top_k: Number of results requested; HNSW returns at most ef_search rows
+        """
+        codebase_id, version = collection_state
+        size = self._search_sizes.get(codebase_id)
+        if size is None or size[0] != version:
+            vector_count = session.execute(
+                select(func.count()).select_from(CodeChunk).where(CodeChunk.codebase_id == codebase_id)
+            ).scalar() or 0
+            size = self._search_sizes[codebase_id] = (version, vector_count)
+        vector_count = size[1]
+
+        if self._get_pgvector_version(session) < (0, 5):
+            probes = configure_ivfflat_params(vector_count)['probes']
+            session.execute(text(f"SET LOCAL ivfflat.probes = {int(probes)}"))
+            return
+
+        ef_search = max(configure_hnsw_params(vector_count)['ef_search'], top_k)
+        session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+
+    def _codebase_id(self, session: Session, codebase_name: str) -> Optional[int]:
+        """
+        Resolve a codebase name to its id.
+
+        Args:
+            session: Session to look the codebase up with
+            codebase_name: Name of the codebase
+
+        Returns:
+            Codebase id, or None if no such codebase exists
+        """
+        return session.execute(
+            select(Codebase.id).where(Codebase.name == codebase_name)
+        ).scalar_one_or_none()
+
+    def _collection_state(self, session: Session, codebase_name: str) -> Optional[Tuple[int, int]]:
+        """
+        Look up a codebase's id and version in one query.
+
+        Args:
+            session: Session to look the codebase up with
+            codebase_name: Name of the codebase
+
+        Returns:
+            (codebase id, version), or None if no such codebase exists
+        """
+        row = session.execute(
+            select(Codebase.id, Codebase.version).where(Codebase.name == codebase_name)
+        ).first()
+        return tuple(row) if row is not None else None
+
+    def _search_cache_scope(
+        self,
+        kind: str,
+        collection_state: Tuple[int, int],
+        top_k: int,
+        filters: Optional[Dict[str, Any]]
+    ) -> tuple:
+        """Build the semantic cache scope for a search: everything but the query vector."""
+        filters_key = tuple(sorted(filters.items())) if filters else None
+        return (kind, collection_state, self.quantization, top_k, filters_key)
+
+    def create_index(
+        self,
+        dimensions: int,
+        codebase_id: int,
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None
+    ):
+        """
+        Build approximate nearest neighbour indexes on a codebase's embedding columns.
+
+        Uses HNSW when pgvector >= 0.5 is installed, otherwise IVFFlat with
+        roughly sqrt(N) lists. Indexes are partial on the codebase and the
+        vector dimension, so the codebase's searches (which always filter on
+        codebase_id) traverse a graph of only its own vectors. With
+        ``quantization="halfvec"`` the index stores half-precision vectors,
+        halving its size; the table keeps full precision.
+
+        Args:
+            dimensions: Embedding dimensionality to index
+            codebase_id: Codebase to build the indexes for
+            m: HNSW max connections per layer (sized by row count if None)
+            ef_construction: HNSW candidate list size during build (sized by row count if None)
+        """
+        try:
+            session = SessionLocal()
+            try:
+                precision = self._index_precision(session)
+                session.execute(text(f"SET LOCAL maintenance_work_mem = '{INDEX_BUILD_MAINTENANCE_WORK_MEM}'"))
+                session.execute(text(f"SET LOCAL max_parallel_maintenance_workers = {INDEX_BUILD_PARALLEL_WORKERS}"))
+
+                scope = f"codebase_id = {int(codebase_id)} AND vector_dims(embedding) = {dimensions}"
+                row_count = session.execute(text(f"SELECT COUNT(*) FROM code_chunks WHERE {scope}")).scalar() or 0
+
+                if self._get_pgvector_version(session) >= (0, 5):
+                    params = configure_hnsw_params(row_count)
+                    if m is not None:
+                        params['m'] = m
+                    if ef_construction is not None:
+                        params['ef_construction'] = ef_construction
+                    method = "hnsw"
+                    options = f"m = {params['m']}, ef_construction = {params['ef_construction']}"
+                else:
+                    method = "ivfflat"
+                    options = f"lists = {configure_ivfflat_params(row_count)['lists']}"
+
+                for column in ("embedding", "description_embedding"):
+                    # Short prefix: identifiers are capped at 63 characters
+                    index_name = f"idx_cb{int(codebase_id)}_{column}_{method}_ip_{precision}_{dimensions}"
+                    condition = f"codebase_id = {int(codebase_id)} AND vector_dims({column}) = {dimensions}"
+
+                    index_sql = f"""
+                    CREATE INDEX IF NOT EXISTS {index_name}
+                    ON code_chunks USING {method} (({column}::{precision}({dimensions})) {precision}_ip_ops)
+                    WITH ({options})
+                    WHERE {condition}
+                    """
+                    session.execute(text(index_sql))
+
+                session.commit()
+                logger.info(
+                    f"Created {method} indexes for {dimensions}-dim {precision} embeddings "
+                    f"of codebase {codebase_id} ({options})"
+                )
+            finally:
+                session.close()
+
+        except Exception as e:
+            logger.warning(f"Error creating vector indexes: {e}")
+
+    def _drop_codebase_indexes(self, session: Session, codebase_id: int) -> List[str]:
+        """
+        Drop the per-codebase ANN indexes built for a codebase.
+
+        Args:
+            session: Session to run the drops on (committed by the caller)
+            codebase_id: ID of the codebase whose indexes to drop
+
+        Returns:
+            Names of the dropped indexes
+        """
+        index_names = session.execute(
+            text("SELECT indexname FROM pg_indexes WHERE tablename = 'code_chunks' AND indexname LIKE :prefix"),
+            {"prefix": f"idx\\_cb{int(codebase_id)}\\_%"}
+        ).scalars().all()
+
+        for index_name in index_names:
+            session.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+        return index_names
+
     def create_codebase_table(self, codebase_name: str) -> str:
         """
         Create a codebase entry (equivalent to table in LanceDB).
@@ -141,6 +478,8 @@ class PostgreSQLVectorStore:
                 if existing:
                     # Delete existing codebase and all chunks
                     logger.info(f"Deleting existing codebase: {codebase_name}")
+                    self._drop_codebase_indexes(session, existing.id)
+                    self._search_sizes.pop(existing.id, None)
                     session.delete(existing)
                     session.commit()
 
@@ -158,7 +497,81 @@ class PostgreSQLVectorStore:
             logger.error(f"Error creating codebase {codebase_name}: {e}")
             raise
     
-    def insert_records(self, codebase_name: str, records: List[VectorRecord], batch_size: int = 1000) -> bool:
+    def _copy_records(self, session: Session, codebase_id: int, batch: List[VectorRecord]):
+        """
+        Bulk-load records into code_chunks with a single COPY FROM STDIN.
+
+        Args:
+            session: Session whose connection (and transaction) the COPY runs on
+            codebase_id: ID of the owning codebase
+            batch: Records to load
+        """
+        created_at = datetime.utcnow().isoformat()
+        embeddings = _vector_literals([record.vector for record in batch])
+        description_embeddings = _vector_literals([record.description_embedding for record in batch])
+        buffer = io.StringIO()
+        for record, embedding, description_embedding in zip(batch, embeddings, description_embeddings):
+            row = (
+                record.id,
+                codebase_id,
+                record.text,
+                embedding,
+                record.chunk_type,
+                record.name,
+                record.file_path,
+                record.language,
+                record.line_start,
+                record.line_end,
+                record.parent_name,
+                record.description,
+                description_embedding,
+                json.dumps(record.metadata) if record.metadata is not None else None,
+                created_at,
+            )
+            buffer.write('\t'.join(_copy_field(value) for value in row))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        # The raw psycopg2 connection is the one the session's transaction is open on
+        raw_connection = session.connection().connection
+        with raw_connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY code_chunks ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT text)",
+                buffer
+            )
+
+    def _record_mappings(self, codebase_id: int, batch: List[VectorRecord]) -> List[Dict[str, Any]]:
+        """
+        Convert records into code_chunks column mappings for Core INSERTs.
+
+        Args:
+            codebase_id: ID of the owning codebase
+            batch: Records to convert
+
+        Returns:
+            One dictionary per record, keyed by CodeChunk attribute
+        """
+        return [
+            {
+                'id': uuid.UUID(record.id),
+                'codebase_id': codebase_id,
+                'text': record.text,
+                'embedding': _normalize(record.vector),
+                'chunk_type': record.chunk_type,
+                'name': record.name,
+                'file_path': record.file_path,
+                'language': record.language,
+                'line_start': record.line_start,
+                'line_end': record.line_end,
+                'parent_name': record.parent_name,
+                'description': record.description,
+                'description_embedding': _normalize(record.description_embedding),
+                'meta_info': record.metadata
+            }
+            for record in batch
+        ]
+
+    def insert_records(self, codebase_name: str, records: List[VectorRecord], batch_size: int = 5000) -> bool:
         """
         Insert records into the codebase in batches.
         
@@ -178,45 +591,35 @@ class PostgreSQLVectorStore:
             self.initialize()
         
         total_inserted = 0
+        dimensions = len(records[0].vector)
+        codebase_id = None
+        dropped_indexes = []
         
         try:
             session = SessionLocal()
             try:
                 # Get codebase
-                codebase = session.query(Codebase).filter(Codebase.name == codebase_name).first()
-                if not codebase:
+                codebase_id = self._codebase_id(session, codebase_name)
+                if codebase_id is None:
                     # Create codebase if it doesn't exist
                     codebase = Codebase(name=codebase_name)
                     session.add(codebase)
                     session.flush()  # Get the ID
+                    codebase_id = codebase.id
+                elif len(records) >= REINDEX_THRESHOLD:
+                    # Large loads skip per-row index maintenance; indexes are rebuilt once below
+                    dropped_indexes = self._drop_codebase_indexes(session, codebase_id)
+                    session.commit()
+                    if dropped_indexes:
+                        logger.info(f"Dropped {len(dropped_indexes)} vector indexes before bulk insert")
                 
                 # Process records in batches
                 for i in range(0, len(records), batch_size):
                     batch = records[i:i + batch_size]
                     
                     try:
-                        # Convert VectorRecord objects to CodeChunk models
-                        chunks = []
-                        for record in batch:
-                            chunk = CodeChunk(
-                                codebase_id=codebase.id,
-                                text=record.text,
-                                embedding=record.vector,
-                                chunk_type=record.chunk_type,
-                                name=record.name,
-                                file_path=record.file_path,
-                                language=record.language,
-                                line_start=record.line_start,
-                                line_end=record.line_end,
-                                parent_name=record.parent_name,
-                                description=record.description,
-                                description_embedding=record.description_embedding,
-                                meta_info=record.metadata
-                            )
-                            chunks.append(chunk)
-                        
-                        # Insert batch
-                        session.add_all(chunks)
+                        # One COPY per batch instead of an INSERT per row
+                        self._copy_records(session, codebase_id, batch)
                         session.commit()
                         
                         total_inserted += len(batch)
@@ -226,25 +629,21 @@ class PostgreSQLVectorStore:
                         logger.error(f"Error inserting batch {i//batch_size + 1}: {batch_error}")
                         session.rollback()
                         
-                        # Try inserting records one by one if batch fails
+                        # Retry as one multi-row INSERT, then record by record to skip
+                        # bad rows; converting a bad record can fail too, so each
+                        # conversion happens inside the attempt it belongs to
+                        try:
+                            session.execute(insert(CodeChunk), self._record_mappings(codebase_id, batch))
+                            session.commit()
+                            total_inserted += len(batch)
+                            continue
+                        except Exception as bulk_error:
+                            logger.warning(f"Bulk insert of batch {i//batch_size + 1} failed: {bulk_error}")
+                            session.rollback()
+
                         for record in batch:
                             try:
-                                chunk = CodeChunk(
-                                    codebase_id=codebase.id,
-                                    text=record.text,
-                                    embedding=record.vector,
-                                    chunk_type=record.chunk_type,
-                                    name=record.name,
-                                    file_path=record.file_path,
-                                    language=record.language,
-                                    line_start=record.line_start,
-                                    line_end=record.line_end,
-                                    parent_name=record.parent_name,
-                                    description=record.description,
-                                    description_embedding=record.description_embedding,
-                                    meta_info=record.metadata
-                                )
-                                session.add(chunk)
+                                session.execute(insert(CodeChunk), self._record_mappings(codebase_id, [record]))
                                 session.commit()
                                 total_inserted += 1
                                 
@@ -254,11 +653,18 @@ class PostgreSQLVectorStore:
                                 continue
                 
                 logger.info(f"Inserted {total_inserted}/{len(records)} records into {codebase_name}")
+                session.execute(
+                    update(Codebase)
+                    .where(Codebase.id == codebase_id)
+                    .values(version=Codebase.version + 1)
+                )
+                session.commit()
 
-                # Update indexes after bulk insert if we have enough data
-                if total_inserted >= 1000:
+                # Restore indexes dropped for the load, and give codebases large
+                # enough to benefit an ANN index of their own
+                if dropped_indexes or total_inserted >= 1000:
                     logger.info("Updating vector indexes after bulk insert...")
-                    self._create_indexes()
+                    self.create_index(dimensions, codebase_id)
 
                 return total_inserted > 0
             finally:
@@ -266,6 +672,8 @@ class PostgreSQLVectorStore:
 
         except Exception as e:
             logger.error(f"Error inserting records: {e}")
+            if dropped_indexes:
+                self.create_index(dimensions, codebase_id)
             return False
     
     def search(
@@ -288,18 +696,32 @@ class PostgreSQLVectorStore:
             List of search results
         """
         # Note: No initialization needed for search - tables should already exist
+
+        # Stored vectors are unit length; the query must be too for inner product ranking
+        query_vector = _normalize(query_vector)
         
         try:
             session = SessionLocal()
             try:
-                # Get codebase
-                codebase = session.query(Codebase).filter(Codebase.name == codebase_name).first()
-                if not codebase:
+                # One lookup gives both the id to search and the version to scope the cache to
+                collection_state = self._collection_state(session, codebase_name)
+                if collection_state is None:
                     logger.warning(f"Codebase {codebase_name} not found")
                     return []
+                codebase_id = collection_state[0]
+
+                cache_scope = self._search_cache_scope('code', collection_state, top_k, filters)
+                cached = _semantic_cache.get(cache_scope, query_vector)
+                if cached is not None:
+                    return [dict(result) for result in cached]
                 
-                # Build query
-                query = session.query(CodeChunk).filter(CodeChunk.codebase_id == codebase.id)
+                self._apply_search_settings(session, collection_state, top_k)
+
+                # Build query - vectors are never returned, so only result columns are selected
+                query = session.query(*SEARCH_COLUMNS).filter(
+                    CodeChunk.codebase_id == codebase_id,
+                    _dims_filter(CodeChunk.embedding, query_vector)
+                )
                 
                 # Apply filters
                 if filters:
@@ -310,31 +732,18 @@ class PostgreSQLVectorStore:
                     if 'parent_name' in filters:
                         query = query.filter(CodeChunk.parent_name == filters['parent_name'])
                 
-                # Add vector similarity search with distance
-                query = query.add_columns(
-                    CodeChunk.embedding.cosine_distance(query_vector).label('distance')
-                ).order_by(CodeChunk.embedding.cosine_distance(query_vector)).limit(top_k)
+                # Rank in the database: one distance expression, ordered by its label
+                distance = _ip_distance(
+                    CodeChunk.embedding, query_vector, self._index_precision(session)
+                ).label('distance')
+                query = query.add_columns(distance).order_by(distance).limit(top_k)
                 
                 results = query.all()
                 
                 # Convert to result format
-                search_results = []
-                for chunk, distance in results:
-                    result = {
-                        'id': str(chunk.id),
-                        'text': chunk.text,
-                        'chunk_type': chunk.chunk_type,
-                        'name': chunk.name,
-                        'file_path': chunk.file_path,
-                        'language': chunk.language,
-                        'line_start': chunk.line_start,
-                        'line_end': chunk.line_end,
-                        'parent_name': chunk.parent_name,
-                        'description': chunk.description,
-                        'score': float(distance)  # Cosine distance
-                    }
-                    search_results.append(result)
+                search_results = [_search_result(row) for row in results]
 
+                _semantic_cache.set(cache_scope, query_vector, [dict(result) for result in search_results])
                 return search_results
             finally:
                 session.close()
@@ -362,19 +771,31 @@ class PostgreSQLVectorStore:
         Returns:
             List of search results
         """
+        # Stored vectors are unit length; the query must be too for inner product ranking
+        query_vector = _normalize(query_vector)
+
         try:
             session = SessionLocal()
             try:
-                # Get codebase
-                codebase = session.query(Codebase).filter(Codebase.name == codebase_name).first()
-                if not codebase:
+                # One lookup gives both the id to search and the version to scope the cache to
+                collection_state = self._collection_state(session, codebase_name)
+                if collection_state is None:
                     logger.warning(f"Codebase {codebase_name} not found")
                     return []
+                codebase_id = collection_state[0]
+
+                cache_scope = self._search_cache_scope('description', collection_state, top_k, filters)
+                cached = _semantic_cache.get(cache_scope, query_vector)
+                if cached is not None:
+                    return [dict(result) for result in cached]
+
+                self._apply_search_settings(session, collection_state, top_k)
 
                 # Build query - only search chunks with description_embedding
-                query = session.query(CodeChunk).filter(
-                    CodeChunk.codebase_id == codebase.id,
-                    CodeChunk.description_embedding.isnot(None)
+                query = session.query(*SEARCH_COLUMNS).filter(
+                    CodeChunk.codebase_id == codebase_id,
+                    CodeChunk.description_embedding.isnot(None),
+                    _dims_filter(CodeChunk.description_embedding, query_vector)
                 )
 
                 # Apply filters
@@ -386,32 +807,19 @@ class PostgreSQLVectorStore:
                     if 'parent_name' in filters:
                         query = query.filter(CodeChunk.parent_name == filters['parent_name'])
 
-                # Add vector similarity search with distance
-                query = query.add_columns(
-                    CodeChunk.description_embedding.cosine_distance(query_vector).label('distance')
-                ).order_by(CodeChunk.description_embedding.cosine_distance(query_vector)).limit(top_k)
+                # Rank in the database: one distance expression, ordered by its label
+                distance = _ip_distance(
+                    CodeChunk.description_embedding, query_vector, self._index_precision(session)
+                ).label('distance')
+                query = query.add_columns(distance).order_by(distance).limit(top_k)
 
                 results = query.all()
 
                 # Convert to result format
-                search_results = []
-                for chunk, distance in results:
-                    result = {
-                        'id': str(chunk.id),
-                        'text': chunk.text,
-                        'chunk_type': chunk.chunk_type,
-                        'name': chunk.name,
-                        'file_path': chunk.file_path,
-                        'language': chunk.language,
-                        'line_start': chunk.line_start,
-                        'line_end': chunk.line_end,
-                        'parent_name': chunk.parent_name,
-                        'description': chunk.description,
-                        'score': float(distance)  # Cosine distance
-                    }
-                    search_results.append(result)
+                search_results = [_search_result(row) for row in results]
 
                 logger.info(f"Description search found {len(search_results)} results in {codebase_name}")
+                _semantic_cache.set(cache_scope, query_vector, [dict(result) for result in search_results])
                 return search_results
             finally:
                 session.close()
@@ -420,6 +828,81 @@ class PostgreSQLVectorStore:
             logger.error(f"Error in description search for {codebase_name}: {e}")
             return []
 
+    def get_collection_version(self, codebase_name: str) -> Optional[Tuple[int, int]]:
+        """
+        Get the current version of a codebase collection from the database.
+
+        Args:
+            codebase_name: Name of the codebase
+
+        Returns:
+            (codebase id, version) - the id changes when a codebase is recreated
+            and the version on every insert - or None if the codebase doesn't exist
+        """
+        try:
+            session = SessionLocal()
+            try:
+                return self._collection_state(session, codebase_name)
+            finally:
+                session.close()
+
+        except Exception as e:
+            logger.error(f"Error getting collection version for {codebase_name}: {e}")
+            return None
+
+    def get_all_chunks(self, codebase_name: str) -> List[Dict[str, Any]]:
+        """
+        Fetch every chunk of a codebase (without embeddings).
+
+        Args:
+            codebase_name: Name of the codebase
+
+        Returns:
+            List of chunk dictionaries in the same shape as search results, minus score
+        """
+        try:
+            session = SessionLocal()
+            try:
+                codebase_id = self._codebase_id(session, codebase_name)
+                if codebase_id is None:
+                    logger.warning(f"Codebase {codebase_name} not found")
+                    return []
+
+                rows = session.query(
+                    CodeChunk.id,
+                    CodeChunk.text,
+                    CodeChunk.chunk_type,
+                    CodeChunk.name,
+                    CodeChunk.file_path,
+                    CodeChunk.language,
+                    CodeChunk.line_start,
+                    CodeChunk.line_end,
+                    CodeChunk.parent_name,
+                    CodeChunk.description
+                ).filter(CodeChunk.codebase_id == codebase_id).yield_per(1000)
+
+                return [
+                    {
+                        'id': str(row.id),
+                        'text': row.text,
+                        'chunk_type': row.chunk_type,
+                        'name': row.name,
+                        'file_path': row.file_path,
+                        'language': row.language,
+                        'line_start': row.line_start,
+                        'line_end': row.line_end,
+                        'parent_name': row.parent_name,
+                        'description': row.description
+                    }
+                    for row in rows
+                ]
+            finally:
+                session.close()
+
+        except Exception as e:
+            logger.error(f"Error fetching chunks for {codebase_name}: {e}")
+            return []
+
     def list_codebases(self) -> List[Dict[str, Any]]:
         """
         List all indexed codebases.
@@ -433,38 +916,41 @@ class PostgreSQLVectorStore:
         try:
             session = SessionLocal()
             try:
-                # Get codebases with statistics
-                codebases = session.query(Codebase).all()
+                # One grouped outer join covers every codebase, including empty ones
+                rows = session.query(
+                    Codebase.id,
+                    Codebase.name,
+                    CodeChunk.language,
+                    CodeChunk.chunk_type,
+                    func.count(CodeChunk.id).label('count')
+                ).outerjoin(
+                    CodeChunk, CodeChunk.codebase_id == Codebase.id
+                ).group_by(
+                    Codebase.id, Codebase.name, CodeChunk.language, CodeChunk.chunk_type
+                ).order_by(Codebase.id).yield_per(1000)
                 
-                results = []
-                for codebase in codebases:
-                    # Get chunk statistics
-                    chunk_stats = session.query(
-                        CodeChunk.language,
-                        CodeChunk.chunk_type,
-                        func.count(CodeChunk.id).label('count')
-                    ).filter(
-                        CodeChunk.codebase_id == codebase.id
-                    ).group_by(CodeChunk.language, CodeChunk.chunk_type).all()
-                    
-                    # Organize stats
-                    languages = {}
-                    chunk_types = {}
-                    total_chunks = 0
+                # Organize stats per codebase
+                codebases = {}
+                for codebase_id, name, lang, chunk_type, count in rows:
+                    codebase_info = codebases.get(codebase_id)
+                    if codebase_info is None:
+                        codebase_info = codebases[codebase_id] = {
+                            'name': name,
+                            'table_name': f"codebase_{name}",
+                            'total_chunks': 0,
+                            'languages': {},
+                            'chunk_types': {}
+                        }
+                    if not count:
+                        continue
                     
-                    for lang, chunk_type, count in chunk_stats:
-                        languages[lang] = languages.get(lang, 0) + count
-                        chunk_types[chunk_type] = chunk_types.get(chunk_type, 0) + count
-                        total_chunks += count
-                    
-                    codebase_info = {
-                        'name': codebase.name,
-                        'table_name': f"codebase_{codebase.name}",
-                        'total_chunks': total_chunks,
-                        'languages': languages,
-                        'chunk_types': chunk_types
-                    }
-                    results.append(codebase_info)
+                    languages = codebase_info['languages']
+                    chunk_types = codebase_info['chunk_types']
+                    languages[lang] = languages.get(lang, 0) + count
+                    chunk_types[chunk_type] = chunk_types.get(chunk_type, 0) + count
+                    codebase_info['total_chunks'] += count
+                
+                results = list(codebases.values())
 
                 return results
             finally:
@@ -492,6 +978,8 @@ class PostgreSQLVectorStore:
             try:
                 codebase = session.query(Codebase).filter(Codebase.name == codebase_name).first()
                 if codebase:
+                    self._drop_codebase_indexes(session, codebase.id)
+                    self._search_sizes.pop(codebase.id, None)
                     session.delete(codebase)  # Cascading delete will remove chunks
                     session.commit()
                     logger.info(f"Deleted codebase: {codebase_name}")
@@ -522,49 +1010,46 @@ class PostgreSQLVectorStore:
         try:
             session = SessionLocal()
             try:
-                codebase = session.query(Codebase).filter(Codebase.name == codebase_name).first()
-                if not codebase:
+                codebase_id = self._codebase_id(session, codebase_name)
+                if codebase_id is None:
                     return {}
                 
-                # Get detailed statistics
-                stats_query = session.query(
-                    func.count(CodeChunk.id).label('total_chunks'),
-                    func.count(func.distinct(CodeChunk.file_path)).label('files'),
-                    func.avg(func.length(CodeChunk.text)).label('avg_chunk_size')
-                ).filter(CodeChunk.codebase_id == codebase.id)
-                
-                stats_result = stats_query.first()
-                
-                # Get language distribution
-                lang_stats = session.query(
-                    CodeChunk.language,
-                    func.count(CodeChunk.id).label('count')
-                ).filter(
-                    CodeChunk.codebase_id == codebase.id
-                ).group_by(CodeChunk.language).all()
-                
-                languages = {lang: count for lang, count in lang_stats}
-                
-                # Get chunk type distribution
-                type_stats = session.query(
-                    CodeChunk.chunk_type,
-                    func.count(CodeChunk.id).label('count')
-                ).filter(
-                    CodeChunk.codebase_id == codebase.id
-                ).group_by(CodeChunk.chunk_type).all()
+                # Totals and both distributions in one pass: the () set is the
+                # whole codebase, the other sets group by language or chunk type
+                stats_rows = session.execute(
+                    text("""
+                    SELECT GROUPING(language) AS all_languages, GROUPING(chunk_type) AS all_types,
+                           language, chunk_type, COUNT(*) AS chunks,
+                           COUNT(DISTINCT file_path) AS files, AVG(LENGTH(text)) AS avg_chunk_size
+                    FROM code_chunks
+                    WHERE codebase_id = :codebase_id
+                    GROUP BY GROUPING SETS ((), (language), (chunk_type))
+                    """),
+                    {"codebase_id": codebase_id},
+                    execution_options={"yield_per": 1000}
+                )
                 
-                chunk_types = {chunk_type: count for chunk_type, count in type_stats}
+                stats_result = None
+                languages = {}
+                chunk_types = {}
+                for row in stats_rows:
+                    if row.all_languages and row.all_types:
+                        stats_result = row
+                    elif row.all_types:
+                        languages[row.language] = row.chunks
+                    else:
+                        chunk_types[row.chunk_type] = row.chunks
                 
-                # Get largest file
+                # Get largest file; ORDER BY length(text) DESC LIMIT 1 walks idx_code_chunks_textlen
                 largest_file_query = session.query(
                     CodeChunk.file_path
                 ).filter(
-                    CodeChunk.codebase_id == codebase.id
+                    CodeChunk.codebase_id == codebase_id
                 ).order_by(desc(func.length(CodeChunk.text))).first()
                 
                 stats = {
                     'name': codebase_name,
-                    'total_chunks': stats_result.total_chunks or 0,
+                    'total_chunks': stats_result.chunks or 0,
                     'languages': languages,
                     'chunk_types': chunk_types,
                     'files': stats_result.files or 0,
@@ -0,0 +1,262 @@
+"""
+In-memory caches for query-level results.
+
+Used to short-circuit repeated searches and HyDE expansions, which otherwise
+cost an LLM call and several database round-trips per query. QueryCache
+matches normalized query text; SemanticCache matches query embeddings.
+"""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query so trivially different spellings share a cache entry.
+
+    Args:
+        query: Raw query string
+
+    Returns:
+        Lowercased query with collapsed whitespace
+    """
+    return " ".join(query.lower().split())
+
+
+def make_query_key(query: str, *parts: Any) -> str:
+    """
+    Build a cache key from a normalized query and extra key parts.
+
+    Args:
+        query: Query string (normalized before hashing)
+        *parts: Additional values that scope the entry (codebase, top_k, ...)
+
+    Returns:
+        sha256 hex digest
+    """
+    raw = "\x1f".join([normalize_query(query)] + [str(part) for part in parts])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class QueryCache:
+    """Thread-safe LRU cache whose entries expire after a fixed TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 900.0):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept
+            ttl: Entry lifetime in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        """
+        Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _ScopeMatrix:
+    """
+    Preallocated float32 matrix holding the cached vectors of one scope.
+
+    Live rows are kept contiguous at the top of the matrix (removal moves the
+    last row into the freed slot), so a lookup is one product over a view.
+    """
+
+    def __init__(self, dimensions: int, capacity: int):
+        self.vectors = np.empty((capacity, dimensions), dtype=np.float32)
+        self.entry_ids: List[int] = []
+        self.rows: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.entry_ids)
+
+    def add(self, entry_id: int, vector: np.ndarray, max_rows: int):
+        """Append a vector, doubling the allocation (up to max_rows) when full."""
+        size = len(self.entry_ids)
+        if size == self.vectors.shape[0]:
+            grown = np.empty((min(max(size * 2, 1), max_rows), self.vectors.shape[1]), dtype=np.float32)
+            grown[:size] = self.vectors[:size]
+            self.vectors = grown
+        self.vectors[size] = vector
+        self.entry_ids.append(entry_id)
+        self.rows[entry_id] = size
+
+    def remove(self, entry_id: int):
+        """Remove a vector by moving the last row into its slot."""
+        row = self.rows.pop(entry_id)
+        last_id = self.entry_ids.pop()
+        if last_id != entry_id:
+            self.vectors[row] = self.vectors[len(self.entry_ids)]
+            self.entry_ids[row] = last_id
+            self.rows[last_id] = row
+
+    def similarities(self, vector: np.ndarray) -> np.ndarray:
+        """Inner products of every live row with a vector."""
+        return self.vectors[:len(self.entry_ids)] @ vector
+
+
+class SemanticCache:
+    """
+    Thread-safe LRU cache keyed by query embedding similarity.
+
+    A lookup hits when a cached unit vector in the same scope has an inner
+    product of at least ``threshold`` with the query, so near-identical
+    queries share an entry. Hits move to the most recently used end, and
+    entries expire after ``ttl`` seconds.
+    """
+
+    # Rows allocated for a scope's first vectors; doubled as the scope fills
+    INITIAL_SCOPE_ROWS = 16
+
+    def __init__(self, maxsize: int = 1024, threshold: float = 0.97, ttl: float = 900.0):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept
+            threshold: Minimum cosine similarity for a hit
+            ttl: Entry lifetime in seconds
+        """
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        # entry id -> (matrix key, expires_at, value), in LRU order
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        # (scope, dimensions) -> vectors of that scope
+        self._matrices: Dict[tuple, _ScopeMatrix] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def get(self, scope: Hashable, vector: np.ndarray) -> Optional[Any]:
+        """
+        Get the value cached for the most similar query in a scope.
+
+        Args:
+            scope: Everything besides the vector that the value depends on
+            vector: Unit-normalized query vector
+
+        Returns:
+            Cached value, or None if no live entry is similar enough
+        """
+        with self._lock:
+            matrix = self._matrices.get((scope, vector.shape[0]))
+            if matrix is None:
+                return None
+
+            similarities = matrix.similarities(vector)
+            now = time.monotonic()
+            expired = []
+            hit = None
+            while True:
+                best = int(np.argmax(similarities))
+                if similarities[best] < self.threshold:
+                    break
+                entry_id = matrix.entry_ids[best]
+                if self._entries[entry_id][1] >= now:
+                    hit = entry_id
+                    break
+                # Mask the expired row so the next most similar one is considered
+                expired.append(entry_id)
+                similarities[best] = -np.inf
+
+            # Removal moves rows around, so it waits until the scan is done
+            for entry_id in expired:
+                self._remove(entry_id)
+            if hit is None:
+                return None
+
+            self._entries.move_to_end(hit)
+            return self._entries[hit][2]
+
+    def set(self, scope: Hashable, vector: np.ndarray, value: Any):
+        """
+        Store a value, evicting the least recently used entries if full.
+
+        Args:
+            scope: Everything besides the vector that the value depends on
+            vector: Unit-normalized query vector
+            value: Value to cache
+        """
+        key = (scope, vector.shape[0])
+        with self._lock:
+            # Evict first so a scope matrix never needs more than maxsize rows
+            while len(self._entries) >= self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+            matrix = self._matrices.get(key)
+            if matrix is None:
+                matrix = _ScopeMatrix(vector.shape[0], min(self.INITIAL_SCOPE_ROWS, self.maxsize))
+                self._matrices[key] = matrix
+
+            entry_id = self._next_id
+            self._next_id += 1
+            matrix.add(entry_id, vector, self.maxsize)
+            self._entries[entry_id] = (key, time.monotonic() + self.ttl, value)
+
+    def _remove(self, entry_id: int):
+        """Drop an entry and its vector; the lock must be held."""
+        key, _, _ = self._entries.pop(entry_id)
+        matrix = self._matrices[key]
+        matrix.remove(entry_id)
+        if not len(matrix):
+            del self._matrices[key]
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -18,6 +18,11 @@ PYTHON_BUILTINS = {
     'property', 'staticmethod', 'classmethod', 'super', 'Exception'
 }
 
+# Node types the extractors look at, collected in a single walk per chunk
+RELATIONSHIP_NODE_TYPES = frozenset({
+    'import_from_statement', 'import_statement', 'call', 'class_definition'
+})
+
 
 class CodeRelationshipExtractor:
     """Extract code relationships using tree-sitter."""
@@ -56,19 +61,19 @@ class CodeRelationshipExtractor:
         """
         try:
             tree = self.parser.parse(bytes(code, "utf8"))
-            root_node = tree.root_node
+            nodes = self._collect_nodes(tree.root_node)
 
             relationships = []
 
             # Extract different types of relationships
             relationships.extend(
-                self._extract_imports(root_node, chunk_id, chunk_name, chunk_type, file_path, codebase_id)
+                self._extract_imports(nodes, chunk_id, chunk_name, chunk_type, file_path, codebase_id)
             )
             relationships.extend(
-                self._extract_function_calls(root_node, chunk_id, chunk_name, chunk_type, file_path, codebase_id)
+                self._extract_function_calls(nodes, chunk_id, chunk_name, chunk_type, file_path, codebase_id)
             )
             relationships.extend(
-                self._extract_inheritance(root_node, chunk_id, chunk_name, chunk_type, file_path, codebase_id)
+                self._extract_inheritance(nodes, chunk_id, chunk_name, chunk_type, file_path, codebase_id)
             )
 
             logger.debug(f"Extracted {len(relationships)} relationships from {chunk_name}")
@@ -80,7 +85,7 @@ class CodeRelationshipExtractor:
 
     def _extract_imports(
         self,
-        root_node: Node,
+        nodes: Dict[str, List[Node]],
         source_chunk_id: str,
         source_name: str,
         source_type: str,
@@ -99,18 +104,18 @@ class CodeRelationshipExtractor:
         """
 
         try:
-            for node in self._find_nodes_by_type(root_node, "import_from_statement"):
+            for node in nodes.get("import_from_statement", []):
                 module_name = None
                 imported_names = []
 
                 # Get module name
-                for child in node.children:
-                    if child.type == "dotted_name" and "module_name" in str(node.child_by_field_name):
-                        module_name = child.text.decode() if hasattr(child.text, 'decode') else str(child.text)
+                module_node = node.child_by_field_name("module_name")
+                if module_node is not None and module_node.type == "dotted_name":
+                    module_name = module_node.text.decode() if hasattr(module_node.text, 'decode') else str(module_node.text)
 
                 # Get imported names
-                for child in node.children:
-                    if child.type == "dotted_name" and child != node.child_by_field_name("module_name"):
+                for child in node.children_by_field_name("name"):
+                    if child.type == "dotted_name":
                         name = child.text.decode() if hasattr(child.text, 'decode') else str(child.text)
                         imported_names.append(name)
                     elif child.type == "aliased_import":
@@ -141,8 +146,8 @@ class CodeRelationshipExtractor:
 
         # import X pattern
         try:
-            for node in self._find_nodes_by_type(root_node, "import_statement"):
-                for child in node.children:
+            for node in nodes.get("import_statement", []):
+                for child in node.children_by_field_name("name"):
                     if child.type == "dotted_name":
                         module = child.text.decode() if hasattr(child.text, 'decode') else str(child.text)
                         relationships.append({
@@ -167,7 +172,7 @@ class CodeRelationshipExtractor:
 
     def _extract_function_calls(
         self,
-        root_node: Node,
+        nodes: Dict[str, List[Node]],
         source_chunk_id: str,
         source_name: str,
         source_type: str,
@@ -179,7 +184,7 @@ class CodeRelationshipExtractor:
 
         # Find all function calls
         try:
-            for node in self._find_nodes_by_type(root_node, "call"):
+            for node in nodes.get("call", []):
                 function_node = node.child_by_field_name("function")
                 if not function_node:
                     continue
@@ -243,7 +248,7 @@ class CodeRelationshipExtractor:
 
     def _extract_inheritance(
         self,
-        root_node: Node,
+        nodes: Dict[str, List[Node]],
         source_chunk_id: str,
         source_name: str,
         source_type: str,
@@ -258,7 +263,7 @@ class CodeRelationshipExtractor:
             return relationships
 
         try:
-            for node in self._find_nodes_by_type(root_node, "class_definition"):
+            for node in nodes.get("class_definition", []):
                 # Check if this is the class we're analyzing
                 name_node = node.child_by_field_name("name")
                 if not name_node:
@@ -294,15 +299,17 @@ class CodeRelationshipExtractor:
 
         return relationships
 
-    def _find_nodes_by_type(self, root: Node, node_type: str) -> List[Node]:
-        """Find all nodes of a specific type in the tree."""
-        nodes = []
-
-        def traverse(node: Node):
-            if node.type == node_type:
-                nodes.append(node)
-            for child in node.children:
-                traverse(child)
-
-        traverse(root)
-        return nodes
+    def _collect_nodes(self, root: Node) -> Dict[str, List[Node]]:
+        """Group the nodes of every type in RELATIONSHIP_NODE_TYPES, in source order."""
+        nodes: Dict[str, List[Node]] = {}
+        # A TreeCursor moves through the tree in C, without building a children list per node
+        cursor = root.walk()
+        while True:
+            node = cursor.node
+            if node.type in RELATIONSHIP_NODE_TYPES:
+                nodes.setdefault(node.type, []).append(node)
+            if cursor.goto_first_child():
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return nodes
@@ -4,13 +4,55 @@ Code relationship storage and query operations.
 
 import logging
 from typing import List, Dict, Any, Optional
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, text
 from sqlalchemy.orm import Session
 from database import SessionLocal
 from codebase.models import CodeRelationship, CodeChunk, Codebase
 
 logger = logging.getLogger(__name__)
 
+# Deepest caller level find_impact_scope will walk
+MAX_IMPACT_DEPTH = 5
+
+# Walks callers of a chunk up to :max_depth hops in one round-trip. reach keeps
+# distinct (chunk, depth) pairs, so cycles and diamonds cannot multiply rows;
+# each caller is then reported once, at its shortest distance, with one of the
+# relationships that put it there. The codebase filter applies at every hop.
+_IMPACT_SCOPE_SQL = text("""
+    WITH RECURSIVE codebase AS (
+        SELECT id FROM codebases WHERE name = :codebase_name
+    ),
+    reach(chunk_id, depth) AS (
+        SELECT r.source_chunk_id, 1
+        FROM code_relationships r
+        JOIN codebase c ON c.id = r.codebase_id
+        WHERE r.target_chunk_id = :chunk_id
+        UNION
+        SELECT r.source_chunk_id, reach.depth + 1
+        FROM reach
+        JOIN code_relationships r ON r.target_chunk_id = reach.chunk_id
+        JOIN codebase c ON c.id = r.codebase_id
+        WHERE reach.depth < :max_depth
+    ),
+    nearest AS (
+        SELECT chunk_id, min(depth) AS depth FROM reach GROUP BY chunk_id
+    )
+    SELECT * FROM (
+        SELECT DISTINCT ON (n.chunk_id)
+               r.source_chunk_id, r.source_name, r.source_type, r.source_file,
+               r.line_number, r.context, r.relationship_type, n.depth
+        FROM nearest n
+        JOIN code_relationships r ON r.source_chunk_id = n.chunk_id
+        JOIN codebase c ON c.id = r.codebase_id
+        LEFT JOIN nearest p ON p.chunk_id = r.target_chunk_id
+        WHERE ((n.depth = 1 AND r.target_chunk_id = :chunk_id) OR p.depth = n.depth - 1)
+          -- the target itself only counts as a (recursive) direct caller
+          AND (n.depth = 1 OR n.chunk_id <> :chunk_id)
+        ORDER BY n.chunk_id, r.line_number
+    ) callers
+    ORDER BY depth, source_file, line_number
+""")
+
 
 class RelationshipStore:
     """Manages code relationship storage and queries."""
@@ -205,28 +247,56 @@ class RelationshipStore:
                 )
             ).all()
 
-            # Group by relationship type
-            dependencies = {
-                'imports': [],
-                'calls': [],
-                'inherits': [],
-                'uses': []
-            }
+            dependencies = self._group_dependencies(relationships)
+
+            logger.info(f"Found dependencies for '{source_name}': {sum(len(v) for v in dependencies.values())} total")
+            return dependencies
+
+        except Exception as e:
+            logger.error(f"Error finding dependencies: {e}")
+            return {}
+        finally:
+            db.close()
 
+    def find_dependencies_batch(
+        self,
+        source_names: List[str],
+        codebase_name: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Find dependencies for several code components in a single query.
+
+        Args:
+            source_names: Names of the source components
+            codebase_name: Name of the codebase
+
+        Returns:
+            Dictionary mapping each source name to its dependencies grouped by type
+        """
+        db = SessionLocal()
+        try:
+            codebase = db.query(Codebase).filter(Codebase.name == codebase_name).first()
+            if not codebase:
+                return {}
+
+            relationships = db.query(CodeRelationship).filter(
+                and_(
+                    CodeRelationship.codebase_id == codebase.id,
+                    CodeRelationship.source_name.in_(source_names)
+                )
+            ).all()
+
+            by_source = {name: [] for name in source_names}
             for rel in relationships:
-                dep_info = {
-                    'target_name': rel.target_name,
-                    'target_type': rel.target_type,
-                    'target_file': rel.target_file,
-                    'line_number': rel.line_number,
-                    'context': rel.context
-                }
+                by_source[rel.source_name].append(rel)
 
-                if rel.relationship_type in dependencies:
-                    dependencies[rel.relationship_type].append(dep_info)
+            results = {
+                name: self._group_dependencies(rels)
+                for name, rels in by_source.items()
+            }
 
-            logger.info(f"Found dependencies for '{source_name}': {sum(len(v) for v in dependencies.values())} total")
-            return dependencies
+            logger.info(f"Found dependencies for {len(source_names)} components: {len(relationships)} total")
+            return results
 
         except Exception as e:
             logger.error(f"Error finding dependencies: {e}")
@@ -234,6 +304,29 @@ class RelationshipStore:
         finally:
             db.close()
 
+    def _group_dependencies(self, relationships: List[CodeRelationship]) -> Dict[str, Any]:
+        """Group relationship rows by relationship type."""
+        dependencies = {
+            'imports': [],
+            'calls': [],
+            'inherits': [],
+            'uses': []
+        }
+
+        for rel in relationships:
+            dep_info = {
+                'target_name': rel.target_name,
+                'target_type': rel.target_type,
+                'target_file': rel.target_file,
+                'line_number': rel.line_number,
+                'context': rel.context
+            }
+
+            if rel.relationship_type in dependencies:
+                dependencies[rel.relationship_type].append(dep_info)
+
+        return dependencies
+
     def find_impact_scope(
         self,
         chunk_id: str,
@@ -246,11 +339,12 @@ class RelationshipStore:
         Args:
             chunk_id: Chunk ID to analyze
             codebase_name: Name of the codebase
-            max_depth: Maximum depth for transitive dependencies
+            max_depth: Maximum depth for transitive dependencies (clamped to 1..MAX_IMPACT_DEPTH)
 
         Returns:
             Dictionary with impact analysis
         """
+        max_depth = max(1, min(max_depth, MAX_IMPACT_DEPTH))
         db = SessionLocal()
         try:
             # Get the chunk info
@@ -258,16 +352,29 @@ class RelationshipStore:
             if not chunk:
                 return {}
 
-            # Find direct callers (depth 1)
-            direct_impact = self.find_callers_by_chunk_id(chunk_id, codebase_name)
+            # Find direct (depth 1) and transitive callers in a single recursive query
+            rows = db.execute(_IMPACT_SCOPE_SQL, {
+                'codebase_name': codebase_name,
+                'chunk_id': chunk_id,
+                'max_depth': max_depth
+            }).mappings().all()
 
-            # Find indirect callers (depth 2) if needed
+            direct_impact = []
             indirect_impact = []
-            if max_depth > 1:
-                for caller in direct_impact:
-                    caller_chunk_id = caller['chunk_id']
-                    indirect = self.find_callers_by_chunk_id(caller_chunk_id, codebase_name)
-                    indirect_impact.extend(indirect)
+            for row in rows:
+                caller = {
+                    'chunk_id': str(row['source_chunk_id']),
+                    'source_name': row['source_name'],
+                    'source_type': row['source_type'],
+                    'source_file': row['source_file'],
+                    'line_number': row['line_number'],
+                    'context': row['context'],
+                    'relationship_type': row['relationship_type']
+                }
+                if row['depth'] == 1:
+                    direct_impact.append(caller)
+                else:
+                    indirect_impact.append(caller)
 
             # Calculate affected files
             affected_files = set()
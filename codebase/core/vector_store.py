@@ -11,6 +11,11 @@ import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Minimum table size before an IVF-PQ index is worth building
+INDEX_MIN_ROWS = 1000
+# Rebuild the index once the table has grown by this factor since the last build
+REINDEX_GROWTH_FACTOR = 2
+
 try:
     import lancedb
     import pyarrow as pa
@@ -57,6 +62,8 @@ class VectorStore:
             raise
         
         self.tables = {}
+        # Row count of each table when its index was last built
+        self.indexed_rows: Dict[str, int] = {}
     
     def create_codebase_table(self, codebase_name: str) -> str:
         """
@@ -116,6 +123,8 @@ class VectorStore:
                 table = self.db.create_table(table_name, df)
                 self.tables[codebase_name] = table
                 logger.info(f"Created new table {table_name} with {len(records)} records")
+
+                self._maybe_create_index(codebase_name, table.count_rows())
                 return True
             else:
                 # Table exists, open it
@@ -127,11 +136,60 @@ class VectorStore:
             df = self._records_to_dataframe(records)
             table.add(df)
             logger.info(f"Inserted {len(records)} records into {table_name}")
+
+            self._maybe_create_index(codebase_name, table.count_rows())
             return True
             
         except Exception as e:
             logger.error(f"Error inserting records: {e}")
             return False
+
+    def _maybe_create_index(self, codebase_name: str, row_count: int):
+        """
+        Build the index only when the table first reaches INDEX_MIN_ROWS or has
+        grown by REINDEX_GROWTH_FACTOR since the last build, so batched ingest
+        does not retrain IVF-PQ after every batch.
+
+        Args:
+            codebase_name: Name of the codebase
+            row_count: Current number of rows in the table
+        """
+        last_indexed = self.indexed_rows.get(codebase_name, 0)
+        if row_count < INDEX_MIN_ROWS:
+            return
+        if last_indexed and row_count < last_indexed * REINDEX_GROWTH_FACTOR:
+            return
+        self.create_index(codebase_name)
+
+    def create_index(self, codebase_name: str, num_partitions: int = 256, num_sub_vectors: int = 96):
+        """
+        Build an IVF-PQ index on a codebase table.
+
+        Args:
+            codebase_name: Name of the codebase
+            num_partitions: Number of IVF partitions (capped at sqrt of row count)
+            num_sub_vectors: Number of PQ sub-vectors (must divide the dimension)
+        """
+        table_name = f"codebase_{codebase_name.replace('-', '_').replace(' ', '_').lower()}"
+
+        try:
+            table = self.db.open_table(table_name)
+            row_count = table.count_rows()
+            if row_count < INDEX_MIN_ROWS:
+                logger.info(f"Skipping IVF-PQ index for {table_name} - only {row_count} rows (need at least {INDEX_MIN_ROWS})")
+                return
+
+            num_partitions = min(num_partitions, int(row_count ** 0.5))
+            table.create_index(
+                metric="cosine",
+                num_partitions=num_partitions,
+                num_sub_vectors=num_sub_vectors
+            )
+            logger.info(f"Created IVF-PQ index on {table_name} with {num_partitions} partitions")
+            self.indexed_rows[codebase_name] = row_count
+
+        except Exception as e:
+            logger.warning(f"Error creating index on {table_name}: {e}")
     
     def search(
         self, 
@@ -257,6 +315,7 @@ class VectorStore:
                 # Remove from cached tables
                 if codebase_name in self.tables:
                     del self.tables[codebase_name]
+                self.indexed_rows.pop(codebase_name, None)
                 
                 logger.info(f"Deleted codebase: {codebase_name}")
                 return True
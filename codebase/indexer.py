@@ -20,6 +20,9 @@ from .retrieval import SemanticSearch, ContextManager
 
 logger = logging.getLogger(__name__)
 
+# Files read and parsed together by _index_directory; bounds how much source is held at once
+INDEX_BATCH_FILES = 256
+
 
 class CodebaseIndexer:
     """Main class for indexing and searching codebases."""
@@ -36,8 +39,11 @@ class CodebaseIndexer:
         # Initialize core components
         self.parser = CodeParser()
         self.preprocessor = FilePreprocessor(self.config)
-        self.embedding_generator = EmbeddingGenerator(self.config.embedding_model)
-        self.vector_store = VectorStore(self.config.database_url)
+        self.embedding_generator = EmbeddingGenerator(
+            self.config.embedding_model,
+            quantization=self.config.embedding_cache_quantization
+        )
+        self.vector_store = VectorStore(self.config.database_url, self.config.embedding_quantization)
 
         # Initialize relationship components
         self.relationship_extractor = CodeRelationshipExtractor()
@@ -46,6 +52,7 @@ class CodebaseIndexer:
         # Initialize retrieval components
         self.search_engine = SemanticSearch(self.vector_store, self.embedding_generator)
         self.context_manager = ContextManager(self.config.max_context_tokens)
+        self._reranker = None  # Created on first reranked search
 
         # Initialize source handlers
         self.github_source = GitHubSource()
@@ -255,16 +262,29 @@ class CodebaseIndexer:
             total_chunks = 0
             processed_files = 0
 
-            for file_info in tqdm(files, desc="Processing files"):
-                try:
-                    records, relationships = self._process_file(file_info, codebase_name, codebase_id)
-                    all_records.extend(records)
-                    all_relationships.extend(relationships)
-                    total_chunks += len(records)
-                    processed_files += 1
-                except Exception as e:
-                    logger.warning(f"Error processing {file_info.path}: {e}")
-                    continue
+            # Read and parse in bounded batches: each batch's tree-sitter work is spread
+            # over the parser's worker pool, and only one batch of sources is held at a time
+            with tqdm(total=len(files), desc="Processing files") as progress:
+                for start in range(0, len(files), INDEX_BATCH_FILES):
+                    batch = files[start:start + INDEX_BATCH_FILES]
+                    sources = [self.preprocessor.read_file_content(file_info.path) for file_info in batch]
+                    parsed_files = self.parser.parse_files([
+                        (file_info.path, content, file_info.language)
+                        for file_info, (content, _) in zip(batch, sources)
+                    ])
+
+                    for file_info, (content, encoding), chunks in zip(batch, sources, parsed_files):
+                        try:
+                            records, relationships = self._process_file(
+                                file_info, codebase_name, codebase_id, content, encoding, chunks
+                            )
+                            all_records.extend(records)
+                            all_relationships.extend(relationships)
+                            total_chunks += len(records)
+                            processed_files += 1
+                        except Exception as e:
+                            logger.warning(f"Error processing {file_info.path}: {e}")
+                        progress.update(1)
 
             # Insert records into vector store
             if all_records:
@@ -318,26 +338,32 @@ class CodebaseIndexer:
                 'name': codebase_name
             }
     
-    def _process_file(self, file_info, codebase_name: str, codebase_id: int) -> tuple:
+    def _process_file(
+        self,
+        file_info,
+        codebase_name: str,
+        codebase_id: int,
+        content: str,
+        encoding: str,
+        chunks: List[Any]
+    ) -> tuple:
         """
-        Process a single file and generate vector records and relationships.
+        Process a single parsed file and generate vector records and relationships.
 
         Args:
             file_info: FileInfo object
             codebase_name: Name of the codebase
             codebase_id: Codebase ID for relationships
+            content: File content
+            encoding: Encoding the file was read with
+            chunks: Code chunks parsed from the file
 
         Returns:
             Tuple of (vector_records, relationships)
         """
-        # Read file content
-        content, encoding = self.preprocessor.read_file_content(file_info.path)
         if not content.strip():
             return [], []
 
-        # Parse file into code chunks
-        chunks = self.parser.parse_file(file_info.path, content, file_info.language)
-
         if not chunks:
             # If no structured chunks found, create text chunks
             text_chunks = self.preprocessor.chunk_content(content)
@@ -359,33 +385,44 @@ class CodebaseIndexer:
         records = []
         all_relationships = []
 
-        for chunk in chunks:
+        # Generate code embeddings for all chunks in batched provider calls
+        embedding_results = self.embedding_generator.embed_batch(
+            [chunk.content for chunk in chunks],
+            metadata_list=[
+                {
+                    'chunk_type': chunk.chunk_type,
+                    'name': chunk.name,
+                    'file_path': chunk.file_path,
+                    'language': chunk.language
+                }
+                for chunk in chunks
+            ]
+        )
+
+        # Generate description embeddings for chunks that have a description
+        described = [i for i, chunk in enumerate(chunks) if chunk.description]
+        description_results = self.embedding_generator.embed_batch(
+            [chunks[i].description for i in described],
+            metadata_list=[
+                {
+                    'chunk_type': 'description',
+                    'name': chunks[i].name,
+                    'file_path': chunks[i].file_path
+                }
+                for i in described
+            ],
+            for_query=True  # Description is natural language
+        )
+        description_embeddings = {
+            i: result.embedding
+            for i, result in zip(described, description_results)
+            if result
+        }
+
+        for i, chunk in enumerate(chunks):
             try:
-                # Generate code embedding
-                embedding_result = self.embedding_generator.generate_embedding(
-                    chunk.content,
-                    metadata={
-                        'chunk_type': chunk.chunk_type,
-                        'name': chunk.name,
-                        'file_path': chunk.file_path,
-                        'language': chunk.language
-                    }
-                )
-
-                # Generate description embedding if description exists
-                description_embedding = None
-                if chunk.description:
-                    description_embedding_result = self.embedding_generator.generate_embedding(
-                        chunk.description,
-                        for_query=True,  # Description is natural language
-                        metadata={
-                            'chunk_type': 'description',
-                            'name': chunk.name,
-                            'file_path': chunk.file_path
-                        }
-                    )
-                    if description_embedding_result:
-                        description_embedding = description_embedding_result.embedding
+                embedding_result = embedding_results[i]
+                description_embedding = description_embeddings.get(i)
 
                 if embedding_result:
                     # Generate unique chunk ID
@@ -478,9 +515,10 @@ class CodebaseIndexer:
             if use_reranking and results:
                 from .retrieval.reranker import CodeReranker, ConfidenceFilter, DiversityFilter
 
-                # Rerank results
-                reranker = CodeReranker()
-                results = reranker.rerank(results, query, top_k=top_k * 2)
+                # Rerank results (the reranker is stateless, so reuse one instance)
+                if self._reranker is None:
+                    self._reranker = CodeReranker()
+                results = self._reranker.rerank(results, query, top_k=top_k * 2)
 
                 # Apply confidence filter
                 confidence_filter = ConfidenceFilter(min_score=0.2)
@@ -571,6 +609,7 @@ class CodebaseIndexer:
         """Clean up resources."""
         try:
             self.vector_store.close()
+            self.parser.close()
             self.github_source.cleanup()
             self.zip_source.cleanup()
             logger.info("CodebaseIndexer cleanup completed")
@@ -26,6 +26,8 @@ class Codebase(Base):
     source_path = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
     meta_info = Column(JSON)
+    # Bumped on every chunk insert so caches in any worker can detect changes
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     chunks = relationship("CodeChunk", back_populates="codebase", cascade="all, delete-orphan")
@@ -9,6 +9,7 @@ from .search import SemanticSearch
 from .context import ContextManager
 from .hyde import HyDEGenerator
 from .reranker import CodeReranker, ConfidenceFilter, DiversityFilter
+from .bm25 import BM25Index, get_or_build_bm25, invalidate_bm25
 
 __all__ = [
     "SemanticSearch",
@@ -16,5 +17,8 @@ __all__ = [
     "HyDEGenerator",
     "CodeReranker",
     "ConfidenceFilter",
-    "DiversityFilter"
+    "DiversityFilter",
+    "BM25Index",
+    "get_or_build_bm25",
+    "invalidate_bm25"
 ]
\ No newline at end of file
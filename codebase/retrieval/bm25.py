@@ -0,0 +1,194 @@
+"""
+BM25 keyword index for code chunks.
+
+Indexes are built once per codebase and cached at module level, so repeated
+keyword/hybrid searches only pay for scoring, not for fetching and tokenizing
+the whole collection again.
+"""
+
+import math
+import re
+import heapq
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Maximum number of codebase indexes kept in memory
+MAX_CACHED_INDEXES = 8
+
+# codebase_name -> (BM25Index, (codebase id, version) it was built from)
+_bm25_cache: "OrderedDict[str, Tuple[BM25Index, Optional[Tuple[int, int]]]]" = OrderedDict()
+_bm25_lock = threading.Lock()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase tokens, breaking snake_case and camelCase apart.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens
+    """
+    if not text:
+        return []
+    # Insert a boundary before inner capitals so camelCase splits
+    text = re.sub(r'(?<=[a-z0-9])(?=[A-Z])', ' ', text)
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Okapi BM25 index over the chunks of a single codebase.
+
+    Postings are stored CSR-style in flat typed arrays (doc ids and term
+    frequencies, with per-term offsets) rather than as lists of tuples, which
+    keeps each posting at 8 bytes instead of a boxed tuple per entry.
+    """
+
+    def __init__(self, docs: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        """
+        Build the index.
+
+        Args:
+            docs: Chunk dictionaries (as returned by the vector store)
+            k1: Term frequency saturation parameter
+            b: Length normalization parameter
+        """
+        self.docs = docs
+        self.k1 = k1
+        self.b = b
+        self.doc_lengths = array('i')
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_idx, doc in enumerate(docs):
+            # Names are weighted by repeating them alongside the text
+            tokens = tokenize(doc.get('text', '')) + tokenize(doc.get('name', '')) * 2
+            self.doc_lengths.append(len(tokens))
+
+            term_counts: Dict[str, int] = {}
+            for token in tokens:
+                term_counts[token] = term_counts.get(token, 0) + 1
+            for term, tf in term_counts.items():
+                postings.setdefault(term, []).append((doc_idx, tf))
+
+        # Flatten postings: term -> (start, end) into post_docs/post_tfs
+        self.term_offsets: Dict[str, Tuple[int, int]] = {}
+        self.post_docs = array('i')
+        self.post_tfs = array('i')
+        for term, plist in postings.items():
+            start = len(self.post_docs)
+            for doc_idx, tf in plist:
+                self.post_docs.append(doc_idx)
+                self.post_tfs.append(tf)
+            self.term_offsets[term] = (start, len(self.post_docs))
+
+        n_docs = len(docs)
+        self.avg_doc_length = (sum(self.doc_lengths) / n_docs) if n_docs else 0.0
+        self.idf = {
+            term: math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in postings.items()
+        }
+
+        # Per-document length normalization, k1 * (1 - b + b * dl / avgdl)
+        avgdl = self.avg_doc_length or 1.0
+        self.doc_norms = array('d', (k1 * (1 - b + b * dl / avgdl) for dl in self.doc_lengths))
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        filters: Dict[str, Any] = None
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Score documents against the query.
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            filters: Optional exact-match filters (chunk_type, language, parent_name)
+
+        Returns:
+            List of (doc, score) tuples ordered by descending score
+        """
+        if not self.docs:
+            return []
+
+        scores: Dict[int, float] = {}
+        k1_plus_1 = self.k1 + 1
+        doc_norms = self.doc_norms
+
+        for term in set(tokenize(query)):
+            offsets = self.term_offsets.get(term)
+            if not offsets:
+                continue
+            start, end = offsets
+            idf = self.idf[term]
+            for doc_idx, tf in zip(self.post_docs[start:end], self.post_tfs[start:end]):
+                score = idf * tf * k1_plus_1 / (tf + doc_norms[doc_idx])
+                scores[doc_idx] = scores.get(doc_idx, 0.0) + score
+
+        if filters:
+            scores = {
+                doc_idx: score for doc_idx, score in scores.items()
+                if all(self.docs[doc_idx].get(key) == value for key, value in filters.items())
+            }
+
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(self.docs[doc_idx], score) for doc_idx, score in best]
+
+
+def get_or_build_bm25(vector_store, codebase_name: str) -> BM25Index:
+    """
+    Get the cached BM25 index for a codebase, rebuilding it if the collection changed.
+
+    The version comes from the database, so writes made through any worker
+    process invalidate the index everywhere.
+
+    Args:
+        vector_store: Vector store providing get_all_chunks/get_collection_version
+        codebase_name: Name of the codebase
+
+    Returns:
+        BM25Index for the codebase
+    """
+    version = vector_store.get_collection_version(codebase_name)
+
+    with _bm25_lock:
+        cached = _bm25_cache.get(codebase_name)
+        if cached and cached[1] == version:
+            _bm25_cache.move_to_end(codebase_name)
+            return cached[0]
+
+    docs = vector_store.get_all_chunks(codebase_name)
+    index = BM25Index(docs)
+    logger.info(f"Built BM25 index for {codebase_name}: {len(docs)} chunks, {len(index.term_offsets)} terms")
+
+    with _bm25_lock:
+        _bm25_cache[codebase_name] = (index, version)
+        _bm25_cache.move_to_end(codebase_name)
+        while len(_bm25_cache) > MAX_CACHED_INDEXES:
+            _bm25_cache.popitem(last=False)
+
+    return index
+
+
+def invalidate_bm25(codebase_name: str = None):
+    """
+    Drop cached BM25 indexes.
+
+    Args:
+        codebase_name: Codebase to drop, or None to clear everything
+    """
+    with _bm25_lock:
+        if codebase_name is None:
+            _bm25_cache.clear()
+        else:
+            _bm25_cache.pop(codebase_name, None)
@@ -9,9 +9,13 @@ import os
 import logging
 from typing import Optional, List, Dict, Any
 from .prompts import HYDE_SYSTEM_PROMPT, HYDE_V2_SYSTEM_PROMPT, HYDE_QUICK_PROMPT
+from ..core.query_cache import QueryCache, make_query_key
 
 logger = logging.getLogger(__name__)
 
+# Generated hypothetical documents, shared by all generator instances
+_hyde_cache = QueryCache(maxsize=1024, ttl=900)
+
 
 class HyDEGenerator:
     """Generates hypothetical code documents for improved semantic search."""
@@ -103,6 +107,12 @@ class HyDEGenerator:
             logger.warning("HyDE is disabled, returning original query")
             return query
 
+        cache_key = make_query_key(query, "v1", self.model)
+        cached = _hyde_cache.get(cache_key)
+        if cached:
+            logger.info("Using cached HyDE query (stage 1)")
+            return cached
+
         try:
             logger.info(f"Generating HyDE query (stage 1) for: {query}")
 
@@ -113,6 +123,7 @@ class HyDEGenerator:
 
             if hyde_query:
                 logger.info(f"Generated HyDE query (stage 1): {hyde_query[:200]}...")
+                _hyde_cache.set(cache_key, hyde_query)
                 return hyde_query
             else:
                 logger.warning("HyDE generation failed, returning original query")
@@ -183,13 +194,22 @@ class HyDEGenerator:
         if not self.enabled or not self.client:
             return query
 
+        cache_key = make_query_key(query, "quick", self.model)
+        cached = _hyde_cache.get(cache_key)
+        if cached:
+            return cached
+
         try:
             prompt = HYDE_QUICK_PROMPT.format(query=query)
 
             if self.model == "gemini":
-                return self._generate_with_gemini("", prompt)
+                hyde_query = self._generate_with_gemini("", prompt)
             else:
-                return self._generate_with_openai("", prompt)
+                hyde_query = self._generate_with_openai("", prompt)
+
+            if hyde_query:
+                _hyde_cache.set(cache_key, hyde_query)
+            return hyde_query
 
         except Exception as e:
             logger.error(f"Error generating quick HyDE: {e}")
@@ -10,8 +10,14 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 import re
 
+from ..core.query_cache import QueryCache, make_query_key
+
 logger = logging.getLogger(__name__)
 
+# Heuristic component scores per (query, chunk). They depend only on the query
+# and the chunk, not on the retrieval score, so they are reusable across searches.
+_component_cache = QueryCache(maxsize=10000, ttl=900)
+
 
 @dataclass
 class RerankScore:
@@ -68,11 +74,12 @@ class CodeReranker:
 
         # Extract query keywords
         query_keywords = self._extract_keywords(query)
+        query_key = make_query_key(query)
 
         # Score each result
         scored_results = []
         for result in results:
-            rerank_score = self._compute_score(result, query, query_keywords)
+            rerank_score = self._compute_score(result, query, query_keywords, query_key)
 
             # Update result score and metadata
             result.score = rerank_score.total_score
@@ -100,7 +107,8 @@ class CodeReranker:
         self,
         result: Any,
         query: str,
-        query_keywords: List[str]
+        query_keywords: List[str],
+        query_key: Optional[str] = None
     ) -> RerankScore:
         """
         Compute comprehensive score for a search result.
@@ -109,6 +117,7 @@ class CodeReranker:
             result: SearchResult object
             query: Original query
             query_keywords: Extracted keywords from query
+            query_key: Optional query cache key; enables the component score cache
 
         Returns:
             RerankScore with detailed breakdown
@@ -116,29 +125,20 @@ class CodeReranker:
         # 1. Vector similarity score (already computed)
         vector_score = result.score
 
-        # 2. Name matching score
-        name_match_score = self._compute_name_match_score(
-            result.name,
-            query_keywords
-        )
-
-        # 3. Description relevance score
-        description_score = self._compute_description_score(
-            result.description,
-            query_keywords
-        )
-
-        # 4. Chunk type preference score
-        chunk_type_score = self._compute_chunk_type_score(
-            result.chunk_type,
-            query
-        )
-
-        # 5. File path relevance score
-        file_path_score = self._compute_file_path_score(
-            result.file_path,
-            query_keywords
-        )
+        # 2-5. Heuristic scores, cached per (query, chunk)
+        cache_key = f"{query_key}:{result.id}" if query_key else None
+        components = _component_cache.get(cache_key) if cache_key else None
+        if components is None:
+            components = (
+                self._compute_name_match_score(result.name, query_keywords),
+                self._compute_description_score(result.description, query_keywords),
+                self._compute_chunk_type_score(result.chunk_type, query),
+                self._compute_file_path_score(result.file_path, query_keywords)
+            )
+            if cache_key:
+                _component_cache.set(cache_key, components)
+
+        name_match_score, description_score, chunk_type_score, file_path_score = components
 
         # Combine scores with weights
         total_score = (
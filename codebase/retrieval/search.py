@@ -7,8 +7,13 @@ import logging
 from dataclasses import dataclass
 import math
 
+from .bm25 import get_or_build_bm25
+
 logger = logging.getLogger(__name__)
 
+# RRF rank constant used to fuse semantic and keyword results in hybrid search
+HYBRID_RRF_K = 60
+
 # Import HyDE generator
 try:
     from .hyde import HyDEGenerator
@@ -195,52 +200,28 @@ class SemanticSearch:
         top_k: int,
         filters: Dict[str, Any] = None
     ) -> List[SearchResult]:
-        """Perform keyword-based search (simulated using text matching)."""
-        # This is a simplified implementation
-        # In a real system, you might use a full-text search engine like Elasticsearch
-        
-        # Get all records from vector store and filter by text content
-        all_results = self.vector_store.search(
-            codebase_name=codebase_name,
-            query_vector=[0.0] * 768,  # Dummy vector
-            top_k=1000,  # Get many results to filter
-            filters=filters
-        )
-        
-        # Score based on keyword matches
-        query_words = query.lower().split()
+        """Perform keyword-based search using a cached BM25 index."""
+        index = get_or_build_bm25(self.vector_store, codebase_name)
+
         scored_results = []
-        
-        for result in all_results:
-            content_lower = result['text'].lower()
-            name_lower = result['name'].lower()
-            
-            # Calculate keyword match score
-            content_score = sum(1 for word in query_words if word in content_lower)
-            name_score = sum(2 for word in query_words if word in name_lower)  # Name matches are worth more
-            
-            total_score = content_score + name_score
-            
-            if total_score > 0:
-                search_result = SearchResult(
-                    id=result['id'],
-                    content=result['text'],
-                    chunk_type=result['chunk_type'],
-                    name=result['name'],
-                    file_path=result['file_path'],
-                    language=result['language'],
-                    line_start=result['line_start'],
-                    line_end=result['line_end'],
-                    parent_name=result['parent_name'],
-                    description=result['description'],
-                    score=total_score,
-                    metadata={'keyword_matches': total_score}
-                )
-                scored_results.append(search_result)
-        
-        # Sort by score and return top_k
-        scored_results.sort(key=lambda x: x.score, reverse=True)
-        return scored_results[:top_k]
+        for result, score in index.search(query, top_k, filters):
+            search_result = SearchResult(
+                id=result['id'],
+                content=result['text'],
+                chunk_type=result['chunk_type'],
+                name=result['name'],
+                file_path=result['file_path'],
+                language=result['language'],
+                line_start=result['line_start'],
+                line_end=result['line_end'],
+                parent_name=result['parent_name'],
+                description=result['description'],
+                score=score,
+                metadata={'bm25_score': score}
+            )
+            scored_results.append(search_result)
+
+        return scored_results
     
     def _hybrid_search(
         self, 
@@ -249,53 +230,31 @@ class SemanticSearch:
         top_k: int,
         filters: Dict[str, Any] = None
     ) -> List[SearchResult]:
-        """Perform hybrid search combining semantic and keyword approaches."""
+        """Perform hybrid search fusing semantic and keyword rankings with RRF."""
         # Get both semantic and keyword results
         semantic_results = self._semantic_search(query, codebase_name, top_k * 2, filters)
         keyword_results = self._keyword_search(query, codebase_name, top_k * 2, filters)
-        
-        # Combine and rerank
-        combined_results = {}
-        
-        # Add semantic results
-        for i, result in enumerate(semantic_results):
-            semantic_score = result.score * (1.0 - i / len(semantic_results))  # Position-based decay
-            combined_results[result.id] = {
-                'result': result,
-                'semantic_score': semantic_score,
-                'keyword_score': 0.0
-            }
-        
-        # Add keyword results
-        for i, result in enumerate(keyword_results):
-            keyword_score = result.score * (1.0 - i / len(keyword_results))  # Position-based decay
-            if result.id in combined_results:
-                combined_results[result.id]['keyword_score'] = keyword_score
-            else:
-                combined_results[result.id] = {
-                    'result': result,
-                    'semantic_score': 0.0,
-                    'keyword_score': keyword_score
-                }
-        
-        # Calculate hybrid scores
-        final_results = []
-        for item in combined_results.values():
-            # Combine scores with weights
-            hybrid_score = 0.7 * item['semantic_score'] + 0.3 * item['keyword_score']
-            
-            result = item['result']
-            result.score = hybrid_score
+
+        semantic_scores = {result.id: result.score for result in semantic_results}
+        keyword_scores = {result.id: result.score for result in keyword_results}
+
+        # Rank-based fusion: immune to the different scales of cosine and BM25 scores
+        result_lists = [semantic_results, keyword_results]
+        fused_results = self._reciprocal_rank_fusion(result_lists, k=HYBRID_RRF_K)
+
+        # RRF only decides the order. Rescale its scores to 0-1 (1.0 = ranked first
+        # by both searches) for the reranker and confidence filter, which expect
+        # similarity-scale scores rather than raw RRF values of at most ~0.033
+        max_rrf_score = len(result_lists) / (HYBRID_RRF_K + 1)
+        for result in fused_results:
+            result.score = result.score / max_rrf_score
             result.metadata.update({
-                'semantic_score': item['semantic_score'],
-                'keyword_score': item['keyword_score'],
+                'semantic_score': semantic_scores.get(result.id, 0.0),
+                'keyword_score': keyword_scores.get(result.id, 0.0),
                 'search_type': 'hybrid'
             })
-            final_results.append(result)
-        
-        # Sort by hybrid score and return top_k
-        final_results.sort(key=lambda x: x.score, reverse=True)
-        return final_results[:top_k]
+
+        return fused_results[:top_k]
     
     def search_by_type(
         self, 
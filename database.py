@@ -3,13 +3,19 @@ Simple PostgreSQL database configuration and connection management.
 """
 
 import os
+import logging
+from typing import Any, Dict, Tuple
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Get DATABASE_URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -20,15 +26,84 @@ if not DATABASE_URL:
 if DATABASE_URL.startswith("postgresql://"):
     DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://")
 
+# Connection pool settings (overridable via environment)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "2"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+
 # Create SQLAlchemy engine
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_POOL_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
     echo=False  # Set to True to see all SQL queries
 )
 
+# libpq connection parameters asyncpg.connect() accepts under the same name
+ASYNCPG_NATIVE_PARAMS = (
+    "host", "port", "ssl", "passfile", "service", "servicefile",
+    "target_session_attrs", "krbsrvname", "gsslib"
+)
+
+
+def async_engine_args(database_url: str) -> Tuple[URL, Dict[str, Any]]:
+    """
+    Build the asyncpg URL and connect_args for a libpq-style DATABASE_URL.
+
+    SQLAlchemy passes URL query parameters straight to asyncpg.connect(),
+    which rejects libpq names it doesn't know. Parameters asyncpg has an
+    equivalent for are translated; the rest (channel_binding, keepalives,
+    ...) have no asyncpg counterpart and are dropped with a warning.
+
+    Args:
+        database_url: Database URL as given for the sync engine
+
+    Returns:
+        (URL with the asyncpg driver and supported query, connect_args)
+    """
+    url = make_url(database_url)
+    query = {}
+    connect_args: Dict[str, Any] = {}
+    dropped = []
+    for name, value in url.query.items():
+        if isinstance(value, tuple):
+            value = value[-1]
+        if name == "sslmode":
+            query["ssl"] = value
+        elif name == "connect_timeout":
+            connect_args["timeout"] = float(value)
+        elif name == "application_name":
+            connect_args.setdefault("server_settings", {})["application_name"] = value
+        elif name in ASYNCPG_NATIVE_PARAMS:
+            query[name] = value
+        else:
+            dropped.append(name)
+
+    if dropped:
+        logger.warning(
+            "Ignoring DATABASE_URL parameters asyncpg does not support: %s", ", ".join(sorted(dropped))
+        )
+    return url.set(drivername="postgresql+asyncpg", query=query), connect_args
+
+
+# Async engine for use inside the event loop (startup checks, health probes)
+ASYNC_DATABASE_URL, ASYNC_CONNECT_ARGS = async_engine_args(DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=ASYNC_CONNECT_ARGS,
+    pool_pre_ping=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_POOL_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    echo=False
+)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -54,3 +129,14 @@ def test_connection():
     except Exception as e:
         print(f"Database connection failed: {e}")
         return False
+
+
+async def async_test_connection():
+    """Test database connection without blocking the event loop."""
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        print(f"Database connection failed: {e}")
+        return False
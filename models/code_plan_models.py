@@ -5,6 +5,8 @@ Pydantic models for code plan API.
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 
+from codebase.core.relationship_store import MAX_IMPACT_DEPTH
+
 
 # Request Models
 
@@ -147,7 +149,9 @@ class ImpactScopeRequest(BaseModel):
     """Request to get impact scope of a component."""
     chunk_id: str
     codebase_name: str
-    max_depth: int = 2
+    max_depth: int = Field(
+        2, ge=1, le=MAX_IMPACT_DEPTH, description=f"Caller levels to walk (at most {MAX_IMPACT_DEPTH})"
+    )
 
 
 class ImpactScopeResponse(BaseModel):
@@ -6,7 +6,7 @@ import uuid
 import logging
 from datetime import datetime
 from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 from fastapi.responses import JSONResponse
 
 from models.code_plan_models import (
@@ -19,8 +19,9 @@ from models.code_plan_models import (
     ImpactScopeRequest,
     ImpactScopeResponse
 )
-from code_plan_agent import code_plan_agent
+from code_plan_agent import get_agent
 from code_plan_agent.tools import get_relationship_store
+from codebase.core.relationship_store import MAX_IMPACT_DEPTH
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -60,7 +61,7 @@ Provide your response in the structured JSON format specified in the instruction
 """
 
         # Run the agent
-        result = await code_plan_agent.run(agent_prompt)
+        result = await get_agent().run(agent_prompt)
 
         # Extract the agent's response
         agent_response = result.content if hasattr(result, 'content') else str(result)
@@ -180,7 +181,11 @@ async def get_dependencies(component_name: str, codebase_name: str):
     summary="Get Impact Scope",
     description="Get the impact scope of modifying a component"
 )
-async def get_impact_scope(chunk_id: str, codebase_name: str, max_depth: int = 2):
+async def get_impact_scope(
+    chunk_id: str,
+    codebase_name: str,
+    max_depth: int = Query(2, ge=1, le=MAX_IMPACT_DEPTH)
+):
     """Get impact scope of modifying a component."""
     try:
         logger.info(f"Getting impact scope for chunk: {chunk_id}")
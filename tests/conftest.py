@@ -0,0 +1,40 @@
+"""
+Shared pytest configuration.
+
+database.py refuses to import without DATABASE_URL, and several modules
+import it at load time. Tests never touch the database configured for the
+app: DATABASE_URL is pointed at TEST_DATABASE_URL when that is set, and at
+an address that is never connected to otherwise. Tests that need a live
+PostgreSQL (with pgvector) use the ``postgres`` fixture and are skipped
+unless TEST_DATABASE_URL names a disposable database.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or "postgresql://localhost/tech_tests_unused"
+
+
+@pytest.fixture(scope="session")
+def postgres():
+    """Engine for TEST_DATABASE_URL with the pgvector extension and all tables created."""
+    if not os.getenv("TEST_DATABASE_URL"):
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    from sqlalchemy import text
+    from database import Base, engine, test_connection
+
+    if not test_connection():
+        pytest.skip("TEST_DATABASE_URL is not reachable")
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.commit()
+    Base.metadata.create_all(bind=engine)
+    return engine
@@ -0,0 +1,120 @@
+"""
+Tests for the BM25 keyword index and its per-codebase cache.
+"""
+
+import math
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from codebase.retrieval.bm25 import BM25Index, tokenize, get_or_build_bm25, invalidate_bm25
+
+
+DOCS = [
+    {'id': '1', 'name': 'parse_config', 'text': 'def parse_config(path): return load(path)', 'chunk_type': 'function'},
+    {'id': '2', 'name': 'ConfigLoader', 'text': 'class ConfigLoader: """Loads config files."""', 'chunk_type': 'class'},
+    {'id': '3', 'name': 'send_email', 'text': 'def send_email(to, body): smtp.send(to, body)', 'chunk_type': 'function'},
+]
+
+
+class FakeVectorStore:
+    """Minimal in-memory stand-in exposing the two calls get_or_build_bm25 makes."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.version = (1, 0)
+        self.fetches = 0
+
+    def get_collection_version(self, codebase_name):
+        return self.version
+
+    def get_all_chunks(self, codebase_name):
+        self.fetches += 1
+        return list(self.docs)
+
+
+def test_tokenize_splits_identifiers():
+    """snake_case and camelCase identifiers are broken into lowercase words."""
+    assert tokenize("parse_config ConfigLoader") == ['parse', 'config', 'config', 'loader']
+    assert tokenize("") == []
+
+
+def test_search_ranks_matching_documents():
+    """Documents sharing more (and rarer) query terms rank first."""
+    index = BM25Index(DOCS)
+
+    results = index.search("config loader", top_k=3)
+    assert [doc['id'] for doc, _ in results] == ['2', '1']
+    assert results[0][1] > results[1][1] > 0
+
+    assert index.search("nonexistent", top_k=3) == []
+
+
+def test_search_score_matches_bm25_formula():
+    """A single-term score equals idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))."""
+    index = BM25Index(DOCS)
+    [(doc, score)] = index.search("email", top_k=1)
+
+    tokens = tokenize(doc['text']) + tokenize(doc['name']) * 2
+    tf = tokens.count('email')
+    avgdl = sum(index.doc_lengths) / len(DOCS)
+    idf = math.log(1 + (len(DOCS) - 1 + 0.5) / (1 + 0.5))
+    expected = idf * tf * (index.k1 + 1) / (tf + index.k1 * (1 - index.b + index.b * len(tokens) / avgdl))
+    assert math.isclose(score, expected)
+
+
+def test_search_applies_filters_and_top_k():
+    """Filters drop non-matching documents before the top_k cut."""
+    index = BM25Index(DOCS)
+
+    results = index.search("config", top_k=3, filters={'chunk_type': 'function'})
+    assert [doc['id'] for doc, _ in results] == ['1']
+    assert len(index.search("config", top_k=1)) == 1
+
+
+def test_empty_index():
+    """An index over no documents returns nothing."""
+    assert BM25Index([]).search("anything", top_k=5) == []
+
+
+def test_cached_index_follows_collection_version():
+    """The cached index is reused until the collection version changes."""
+    store = FakeVectorStore(DOCS)
+    invalidate_bm25('tests')
+    try:
+        first = get_or_build_bm25(store, 'tests')
+        assert get_or_build_bm25(store, 'tests') is first
+        assert store.fetches == 1
+
+        store.version = (1, 1)
+        assert get_or_build_bm25(store, 'tests') is not first
+        assert store.fetches == 2
+    finally:
+        invalidate_bm25('tests')
+
+
+def test_postings_are_flat_csr_arrays():
+    """Each term's (doc, tf) postings are a contiguous slice of post_docs/post_tfs."""
+    index = BM25Index(DOCS)
+
+    assert index.post_docs.typecode == index.post_tfs.typecode == 'i'
+    assert len(index.post_docs) == len(index.post_tfs)
+
+    postings = {
+        term: list(zip(index.post_docs[start:end], index.post_tfs[start:end]))
+        for term, (start, end) in index.term_offsets.items()
+    }
+    # Names count twice: doc 0 has 'config' once in its text and once in its name,
+    # doc 1 twice in its text and once in its name
+    assert postings['config'] == [(0, 3), (1, 4)]
+    assert postings['email'] == [(2, 3)]
+
+    # Slices tile the arrays exactly, one posting per (term, document) pair
+    spans = sorted(index.term_offsets.values())
+    assert spans[0][0] == 0 and spans[-1][1] == len(index.post_docs)
+    assert all(prev[1] == nxt[0] for prev, nxt in zip(spans, spans[1:]))
+    assert len(index.post_docs) == sum(
+        len(set(tokenize(doc['text']) + tokenize(doc['name']))) for doc in DOCS
+    )
@@ -0,0 +1,48 @@
+"""
+Tests for deriving the asyncpg engine settings from DATABASE_URL.
+"""
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("asyncpg")
+
+from database import async_engine_args
+
+
+def test_plain_url_switches_driver():
+    """Host, credentials and database carry over; only the driver changes."""
+    url, connect_args = async_engine_args("postgresql+psycopg2://user:secret@db:5433/app")
+
+    assert url.drivername == "postgresql+asyncpg"
+    assert (url.username, url.password, url.host, url.port, url.database) == ("user", "secret", "db", 5433, "app")
+    assert dict(url.query) == {}
+    assert connect_args == {}
+
+
+def test_libpq_parameters_are_translated():
+    """sslmode, connect_timeout and application_name map to their asyncpg equivalents."""
+    url, connect_args = async_engine_args(
+        "postgresql://u@db/app?sslmode=require&connect_timeout=5&application_name=indexer"
+    )
+
+    assert dict(url.query) == {"ssl": "require"}
+    assert connect_args == {"timeout": 5.0, "server_settings": {"application_name": "indexer"}}
+
+
+def test_unsupported_parameters_are_dropped(caplog):
+    """Parameters asyncpg can't take are left out of the URL and reported."""
+    url, connect_args = async_engine_args(
+        "postgresql://u@db/app?sslmode=require&channel_binding=require&keepalives=1"
+    )
+
+    assert dict(url.query) == {"ssl": "require"}
+    assert connect_args == {}
+    assert "channel_binding, keepalives" in caplog.text
+
+
+def test_native_parameters_pass_through():
+    """Parameters asyncpg accepts under the libpq name, like a socket host, are kept."""
+    url, _ = async_engine_args("postgresql://postgres:@/postgres?host=/tmp/pg&target_session_attrs=read-write")
+
+    assert dict(url.query) == {"host": "/tmp/pg", "target_session_attrs": "read-write"}
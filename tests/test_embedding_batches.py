@@ -0,0 +1,62 @@
+"""
+Tests for batched embedding requests and their failure handling.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from codebase.core.embeddings import EmbeddingGenerator
+
+
+class RejectingProvider:
+    """Stands in for one provider batch call; fails any request containing a rejected text."""
+
+    def __init__(self, rejected=()):
+        self.rejected = set(rejected)
+        self.requests = []
+
+    def __call__(self, texts, for_query):
+        self.requests.append(list(texts))
+        if self.rejected & set(texts):
+            return None
+        return [[float(len(text))] for text in texts]
+
+
+def generator_with(tmp_path, monkeypatch, provider):
+    generator = EmbeddingGenerator(model="openai", cache_dir=str(tmp_path))
+    monkeypatch.setattr(generator, "_request_embeddings_batch", provider)
+    return generator
+
+
+def test_successful_batch_is_one_request(tmp_path, monkeypatch):
+    """A batch the provider accepts is sent once."""
+    provider = RejectingProvider()
+    generator = generator_with(tmp_path, monkeypatch, provider)
+
+    assert generator._generate_embeddings_batch(["a", "bb", "ccc"]) == [[1.0], [2.0], [3.0]]
+    assert len(provider.requests) == 1
+
+
+def test_failed_batch_only_drops_rejected_texts(tmp_path, monkeypatch, caplog):
+    """Failed requests are bisected so the rest of the batch is still embedded."""
+    provider = RejectingProvider(rejected={"huge"})
+    generator = generator_with(tmp_path, monkeypatch, provider)
+    texts = ["a", "bb", "huge", "dddd", "eeeee", "ffffff", "g", "hh"]
+
+    embeddings = generator._generate_embeddings_batch(texts)
+
+    assert embeddings == [[float(len(text))] if text != "huge" else None for text in texts]
+    # One request per level of halving down to the bad text, plus the good halves
+    assert len(provider.requests) <= 2 * 3 + 1
+    assert "Dropped 1 of 8 texts" in caplog.text
+
+
+def test_provider_outage_drops_every_text(tmp_path, monkeypatch):
+    """When every request fails, each text comes back as None."""
+    provider = RejectingProvider(rejected={"a", "b", "c"})
+    generator = generator_with(tmp_path, monkeypatch, provider)
+
+    assert generator._generate_embeddings_batch(["a", "b", "c"]) == [None, None, None]
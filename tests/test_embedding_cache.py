@@ -0,0 +1,137 @@
+"""
+Tests for the SQLite embedding cache and its quantized storage formats.
+"""
+
+import sys
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from codebase.core.embeddings import EmbeddingGenerator, EmbeddingResult, _quantize, _dequantize
+
+
+def random_embedding(seed: int = 0, dimensions: int = 768) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(dimensions).astype(np.float32)
+
+
+def test_f32_round_trip_is_exact():
+    """Unquantized vectors are stored bit for bit."""
+    vec = random_embedding()
+    blob, dtype, scale = _quantize(vec, None)
+
+    assert (dtype, scale) == ("f32", None)
+    assert np.array_equal(_dequantize(blob, dtype, scale), vec)
+
+
+def test_bf16_round_trip():
+    """bf16 halves the blob and keeps 8 significant bits per component."""
+    vec = random_embedding()
+    blob, dtype, scale = _quantize(vec, "bf16")
+    restored = _dequantize(blob, dtype, scale)
+
+    assert dtype == "bf16" and scale is None
+    assert len(blob) == vec.size * 2
+    assert restored.dtype == np.float32
+    assert np.all(np.abs(restored - vec) <= np.abs(vec) * 2.0 ** -8)
+
+
+def test_bf16_rounds_to_nearest_even():
+    """Values halfway between two bf16 numbers round to the one with an even mantissa."""
+    halfway_down = np.float32(1 + 2.0 ** -8)      # between 1 and 1 + 2^-7
+    halfway_up = np.float32(1 + 3 * 2.0 ** -8)    # between 1 + 2^-7 and 1 + 2^-6
+    blob, dtype, scale = _quantize(np.array([halfway_down, halfway_up]), "bf16")
+
+    assert _dequantize(blob, dtype, scale).tolist() == [1.0, 1 + 2.0 ** -6]
+
+
+def test_int8_round_trip():
+    """int8 quarters the blob; each component is within half a quantization step."""
+    vec = random_embedding()
+    blob, dtype, scale = _quantize(vec, "int8")
+    restored = _dequantize(blob, dtype, scale)
+
+    assert dtype == "int8"
+    assert len(blob) == vec.size
+    assert scale == pytest.approx(float(np.max(np.abs(vec))) / 127)
+    assert np.all(np.abs(restored - vec) <= scale / 2 + 1e-6)
+
+
+def test_int8_zero_vector():
+    """An all-zero vector gets a unit scale instead of dividing by zero."""
+    blob, dtype, scale = _quantize(np.zeros(8, dtype=np.float32), "int8")
+
+    assert scale == 1.0
+    assert not _dequantize(blob, dtype, scale).any()
+
+
+@pytest.mark.parametrize("quantization", [None, "bf16", "int8"])
+def test_cache_round_trip(tmp_path, quantization):
+    """Vectors written in each format come back from SQLite close to the originals."""
+    generator = EmbeddingGenerator(cache_dir=str(tmp_path), quantization=quantization)
+    vec = random_embedding(seed=1)
+    generator._save_many_to_cache([
+        EmbeddingResult(text="def f(): pass", embedding=vec, metadata={'k': 1}, hash="h1", fingerprint="fp")
+    ])
+    generator._hot.clear()
+
+    loaded = generator._load_many_from_cache(["h1", "missing"])
+
+    assert set(loaded) == {"h1"}
+    result = loaded["h1"]
+    assert (result.text, result.metadata, result.fingerprint) == ("def f(): pass", {'k': 1}, "fp")
+    assert np.allclose(result.embedding, vec, atol=float(np.max(np.abs(vec))) / 127)
+
+
+@pytest.mark.parametrize("quantization", ["bf16", "int8"])
+def test_hot_and_disk_hits_agree(tmp_path, quantization):
+    """The hot cache keeps the quantized round trip, so both tiers return the same vector."""
+    generator = EmbeddingGenerator(cache_dir=str(tmp_path), quantization=quantization)
+    result = EmbeddingResult(text="x = 1", embedding=random_embedding(seed=3), metadata={}, hash="h", fingerprint="fp")
+    generator._save_many_to_cache([result])
+
+    hot = generator._load_many_from_cache(["h"])["h"].embedding
+    generator._hot.clear()
+    disk = generator._load_many_from_cache(["h"])["h"].embedding
+
+    assert np.array_equal(hot, disk)
+    assert np.array_equal(result.embedding, disk)
+
+
+def test_unsupported_quantization():
+    """Unknown storage formats are rejected up front."""
+    with pytest.raises(ValueError):
+        EmbeddingGenerator(quantization="fp8")
+
+
+def test_legacy_cache_schema_is_migrated(tmp_path):
+    """Caches written before quantization and fingerprints gain the new columns and stay readable."""
+    vec = random_embedding(seed=2, dimensions=16)
+    legacy = sqlite3.connect(str(tmp_path / "embeddings.sqlite"))
+    legacy.execute(
+        "CREATE TABLE embeddings (hash TEXT PRIMARY KEY, text TEXT NOT NULL, embedding BLOB NOT NULL, metadata BLOB)"
+    )
+    legacy.execute(
+        "INSERT INTO embeddings VALUES (?, ?, ?, ?)", ("old", "x = 1", vec.tobytes(), b'{"k": 2}')
+    )
+    legacy.commit()
+    legacy.close()
+
+    generator = EmbeddingGenerator(cache_dir=str(tmp_path))
+    columns = {row[1] for row in generator._cache_db.execute("PRAGMA table_info(embeddings)")}
+    assert {"dtype", "scale", "fingerprint"} <= columns
+
+    # Old rows read back as float32 with no fingerprint...
+    result = generator._load_many_from_cache(["old"])["old"]
+    assert np.array_equal(result.embedding, vec)
+    assert (result.metadata, result.fingerprint) == ({'k': 2}, "")
+
+    # ...which marks them stale for the current model
+    assert generator.purge_stale_cache() == 1
+
+    # Opening an already migrated cache is a no-op
+    EmbeddingGenerator(cache_dir=str(tmp_path))
@@ -0,0 +1,92 @@
+"""
+Tests for incremental reparsing of edited files.
+"""
+
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import codebase.core.parser as parser_module
+from codebase.core.parser import CodeParser
+
+
+ORIGINAL = '''
+def greet(name):
+    """Say hello."""
+    return f"hello {name}"
+
+
+class Greeter:
+    def wave(self):
+        pass
+'''
+
+EDITED = '''
+def greet(name, punctuation="!"):
+    """Say hello – politely."""
+    return f"hello {name}{punctuation}"
+
+
+def farewell(name):
+    return f"bye {name}"
+
+
+class Greeter:
+    def wave(self):
+        pass
+'''
+
+
+def chunk_dicts(chunks):
+    return [asdict(chunk) for chunk in chunks]
+
+
+def test_unseen_file_has_no_previous_tree(tmp_path):
+    """Files this thread hasn't parsed are parsed from scratch."""
+    parser = CodeParser(ai_docstring_enabled=False, cache_dir=str(tmp_path))
+    assert parser._edited_previous_tree(("greet.py", "python"), ORIGINAL.encode('utf-8')) is None
+
+
+def test_previous_tree_is_edited_to_the_changed_span(tmp_path):
+    """The remembered tree is edited over the bytes between the common prefix and suffix."""
+    parser = CodeParser(ai_docstring_enabled=False, cache_dir=str(tmp_path))
+    parser.parse_file("greet.py", ORIGINAL, "python")
+
+    old, new = ORIGINAL.encode('utf-8'), EDITED.encode('utf-8')
+    tree = parser._edited_previous_tree(("greet.py", "python"), new)
+
+    assert tree is not None
+    [changed] = tree.changed_ranges(parser._get_parser("python").parse(new, tree))
+    assert old[:changed.start_byte] == new[:changed.start_byte]
+    # Taken from the cache: a second lookup without reparsing finds nothing
+    assert parser._edited_previous_tree(("greet.py", "python"), new) is None
+
+
+def test_incremental_reparse_matches_fresh_parse(tmp_path):
+    """Chunks from an edited file are the same whether or not the old tree was reused."""
+    parser = CodeParser(ai_docstring_enabled=False, cache_dir=str(tmp_path / "incremental"))
+    parser.parse_file("greet.py", ORIGINAL, "python")
+    incremental = parser.parse_file("greet.py", EDITED, "python")
+
+    fresh = CodeParser(ai_docstring_enabled=False, cache_dir=str(tmp_path / "fresh"))
+    expected = fresh.parse_file("greet.py", EDITED, "python")
+
+    assert [chunk.name for chunk in incremental] == ['greet', 'farewell', 'Greeter', 'wave']
+    assert chunk_dicts(incremental) == chunk_dicts(expected)
+
+    # Editing back to the original reuses the tree again and still agrees
+    reverted = parser.parse_file("greet.py", ORIGINAL + "\n", "python")
+    assert chunk_dicts(reverted) == chunk_dicts(fresh.parse_file("greet.py", ORIGINAL + "\n", "python"))
+
+
+def test_remembered_trees_are_bounded(tmp_path, monkeypatch):
+    """Only the most recently parsed files keep their trees."""
+    monkeypatch.setattr(parser_module, "INCREMENTAL_TREE_CACHE_SIZE", 2)
+    parser = CodeParser(ai_docstring_enabled=False, cache_dir=str(tmp_path))
+    for name in ('a.py', 'b.py', 'c.py'):
+        parser.parse_file(name, ORIGINAL, "python")
+
+    assert list(parser._tls.trees) == [('b.py', 'python'), ('c.py', 'python')]
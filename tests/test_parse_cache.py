@@ -0,0 +1,74 @@
+"""
+Tests for the SQLite parse cache.
+"""
+
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import codebase.core.parser as parser_module
+from codebase.core.parser import CodeParser
+
+
+SOURCE = '''
+def greet(name):
+    """Say hello."""
+    return f"hello {name}"
+
+
+class Greeter:
+    def wave(self):
+        pass
+'''
+
+
+def cached_rows(parser):
+    return parser._cache_db.execute("SELECT key, chunks FROM chunks").fetchall()
+
+
+def test_parse_results_are_cached_by_content(tmp_path):
+    """A parsed file is stored once and later served from the cache unchanged."""
+    parser = CodeParser(ai_docstring_enabled=False, cache_dir=str(tmp_path))
+    chunks = parser.parse_file("greet.py", SOURCE, "python")
+    assert [chunk.name for chunk in chunks] == ['greet', 'Greeter', 'wave']
+    assert len(cached_rows(parser)) == 1
+
+    # A fresh parser over the same directory reads the entry back instead of reparsing
+    reopened = CodeParser(ai_docstring_enabled=False, cache_dir=str(tmp_path))
+    key = reopened._cache_key("greet.py", SOURCE, "python")
+    assert [asdict(chunk) for chunk in reopened._load_from_cache(key)] == [asdict(chunk) for chunk in chunks]
+
+    # Changed content is a different entry
+    parser.parse_file("greet.py", SOURCE + "\n\ndef extra():\n    pass\n", "python")
+    assert len(cached_rows(parser)) == 2
+
+
+def test_cache_version_bump_invalidates_entries(tmp_path, monkeypatch):
+    """Entries written under an older PARSE_CACHE_VERSION are never served."""
+    parser = CodeParser(ai_docstring_enabled=False, cache_dir=str(tmp_path))
+    parser.parse_file("greet.py", SOURCE, "python")
+    old_key = parser._cache_key("greet.py", SOURCE, "python")
+
+    monkeypatch.setattr(parser_module, "PARSE_CACHE_VERSION", parser_module.PARSE_CACHE_VERSION + "-next")
+    new_key = parser._cache_key("greet.py", SOURCE, "python")
+
+    assert new_key != old_key
+    assert parser._load_from_cache(new_key) is None
+
+
+def test_unreadable_entries_are_reparsed(tmp_path):
+    """Rows in a format the current CodeChunk can't load are ignored and overwritten."""
+    parser = CodeParser(ai_docstring_enabled=False, cache_dir=str(tmp_path))
+    key = parser._cache_key("greet.py", SOURCE, "python")
+    parser._cache_db.execute(
+        "INSERT INTO chunks (key, chunks) VALUES (?, ?)", (key, b'[{"obsolete_field": 1}]')
+    )
+    parser._cache_db.commit()
+
+    chunks = parser.parse_file("greet.py", SOURCE, "python")
+
+    assert [chunk.name for chunk in chunks] == ['greet', 'Greeter', 'wave']
+    assert [chunk.name for chunk in parser._load_from_cache(key)] == ['greet', 'Greeter', 'wave']
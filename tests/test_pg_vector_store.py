@@ -0,0 +1,133 @@
+"""
+Tests for the PostgreSQL vector store's bulk-load encoding.
+
+The round-trip test needs TEST_DATABASE_URL pointing at a disposable
+database with pgvector; it is skipped otherwise.
+"""
+
+import uuid
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("pgvector")
+
+from codebase.core.pg_vector_store import _copy_field, _vector_literals
+
+
+def test_copy_field_escapes_text_format_specials():
+    """Backslashes, tabs and line breaks are escaped so a value stays one field of one row."""
+    assert _copy_field('a\tb\nc\rd\\e') == 'a\\tb\\nc\\rd\\\\e'
+    assert _copy_field('C:\\temp\\new') == 'C:\\\\temp\\\\new'
+    assert _copy_field('plain text') == 'plain text'
+
+
+def test_copy_field_null_and_non_strings():
+    """None is COPY's NULL marker; other values are written with str()."""
+    assert _copy_field(None) == '\\N'
+    # A literal backslash-N string must not read back as NULL
+    assert _copy_field('\\N') == '\\\\N'
+    assert _copy_field(42) == '42'
+    assert _copy_field('') == ''
+
+
+def parse_literal(literal):
+    return np.array([float(x) for x in literal.strip('[]').split(',')], dtype=np.float32)
+
+
+def test_vector_literals_are_unit_normalized():
+    """Each vector is scaled to unit length and written in pgvector's '[x,y,...]' form."""
+    assert _vector_literals([[3.0, 4.0], [0.0, -2.0]]) == ['[0.600000024,0.800000012]', '[0,-1]']
+
+
+def test_vector_literals_round_trip_float32():
+    """Nine significant digits reproduce every float32 component exactly."""
+    vectors = np.random.default_rng(0).standard_normal((4, 64)).astype(np.float32)
+    expected = vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + np.float32(1e-12))
+
+    for literal, row in zip(_vector_literals(vectors), expected):
+        assert np.array_equal(parse_literal(literal), row)
+
+
+def test_vector_literals_keep_missing_vectors():
+    """None entries stay None in place; an all-None batch needs no matrix."""
+    literals = _vector_literals([None, [1.0, 0.0], None])
+    assert literals == [None, '[1,0]', None]
+    assert _vector_literals([None, None]) == [None, None]
+    assert _vector_literals([]) == []
+
+
+def test_copy_records_round_trip(postgres):
+    """Text with COPY special characters reads back exactly after a COPY load."""
+    from database import SessionLocal
+    from codebase.models import CodeChunk
+    from codebase.core.pg_vector_store import PostgreSQLVectorStore, VectorRecord
+
+    store = PostgreSQLVectorStore()
+    store.initialize()
+    name = f"test-{uuid.uuid4().hex[:12]}"
+    store.create_codebase_table(name)
+    awkward = 'def f():\n\treturn "C:\\\\new\\tab" + "\\N"\r\n'
+    records = [
+        VectorRecord(
+            id=str(uuid.uuid4()), text=awkward, vector=[3.0, 4.0], chunk_type='function',
+            name='f', file_path='dir\\f.py', language='python', line_start=1, line_end=2,
+            description='tab\there', description_embedding=[0.0, 2.0], metadata={'note': 'a\nb'}
+        ),
+        VectorRecord(
+            id=str(uuid.uuid4()), text='', vector=[1.0, 0.0], chunk_type='module',
+            name='g', file_path='g.py', language='python', line_start=1, line_end=1
+        ),
+    ]
+
+    session = SessionLocal()
+    try:
+        codebase_id = store._codebase_id(session, name)
+        store._copy_records(session, codebase_id, records)
+        session.commit()
+
+        rows = {
+            row.name: row for row in
+            session.query(CodeChunk).filter(CodeChunk.codebase_id == codebase_id)
+        }
+        assert rows['f'].text == awkward
+        assert rows['f'].file_path == 'dir\\f.py'
+        assert rows['f'].description == 'tab\there'
+        assert rows['f'].meta_info == {'note': 'a\nb'}
+        assert list(rows['f'].embedding) == pytest.approx([0.6, 0.8])
+        assert list(rows['f'].description_embedding) == pytest.approx([0.0, 1.0])
+
+        assert rows['g'].text == ''
+        assert rows['g'].parent_name is None
+        assert rows['g'].description is None
+        assert rows['g'].description_embedding is None
+        assert rows['g'].meta_info is None
+    finally:
+        session.close()
+        store.delete_codebase(name)
+
+
+def test_insert_records_skips_malformed_rows(postgres):
+    """A record that breaks the COPY is skipped without losing the rest of its batch."""
+    from codebase.core.pg_vector_store import PostgreSQLVectorStore, VectorRecord
+
+    store = PostgreSQLVectorStore()
+    store.initialize()
+    name = f"test-{uuid.uuid4().hex[:12]}"
+    store.create_codebase_table(name)
+    records = [
+        VectorRecord(
+            id=record_id, text=f"def f{i}(): pass", vector=[1.0, float(i)], chunk_type='function',
+            name=f"f{i}", file_path='f.py', language='python', line_start=i, line_end=i
+        )
+        for i, record_id in enumerate([str(uuid.uuid4()), "not-a-uuid", str(uuid.uuid4())])
+    ]
+
+    try:
+        version = store.get_collection_version(name)
+        assert store.insert_records(name, records)
+        assert sorted(chunk['name'] for chunk in store.get_all_chunks(name)) == ['f0', 'f2']
+        assert store.get_collection_version(name) == (version[0], version[1] + 1)
+    finally:
+        store.delete_codebase(name)
@@ -0,0 +1,154 @@
+"""
+Tests for the in-memory query caches.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from codebase.core.query_cache import QueryCache, SemanticCache, make_query_key, normalize_query
+
+
+def test_query_keys_ignore_case_and_whitespace():
+    """Trivially different spellings of a query share a key; other parts don't."""
+    assert normalize_query("  Find   the Parser ") == "find the parser"
+    assert make_query_key("Find parser", "cb", 10) == make_query_key("find  PARSER", "cb", 10)
+    assert make_query_key("find parser", "cb", 10) != make_query_key("find parser", "cb", 5)
+    assert make_query_key("find parser", "cb", (1, 2)) != make_query_key("find parser", "cb", (1, 3))
+
+
+def test_query_cache_evicts_least_recently_used():
+    """Reads refresh an entry, so the least recently used one is evicted first."""
+    cache = QueryCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_query_cache_expires_entries():
+    """Entries older than the TTL are dropped on read."""
+    cache = QueryCache(maxsize=4, ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_query_cache_clear():
+    """clear() removes every entry."""
+    cache = QueryCache()
+    cache.set("a", 1)
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def unit(*components):
+    vector = np.asarray(components, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_semantic_cache_hits_similar_vectors():
+    """Vectors at or above the similarity threshold share an entry; others miss."""
+    cache = SemanticCache(maxsize=8, threshold=0.97)
+    cache.set("scope", unit(1, 0, 0), "x")
+
+    assert cache.get("scope", unit(1, 0.1, 0)) == "x"     # cosine ~0.995
+    assert cache.get("scope", unit(1, 0.5, 0)) is None    # cosine ~0.894
+    assert cache.get("scope", unit(0, 1, 0)) is None
+
+
+def test_semantic_cache_returns_most_similar_entry():
+    """With several close entries, the nearest one wins."""
+    cache = SemanticCache(maxsize=8, threshold=0.9)
+    cache.set("scope", unit(1, 0.2, 0), "near")
+    cache.set("scope", unit(1, -0.4, 0), "far")
+
+    assert cache.get("scope", unit(1, 0.15, 0)) == "near"
+
+
+def test_semantic_cache_isolates_scopes_and_dimensions():
+    """Entries are only visible to lookups with the same scope and dimensionality."""
+    cache = SemanticCache(maxsize=8)
+    cache.set(("cb", 1), unit(1, 0, 0), "v1")
+
+    assert cache.get(("cb", 2), unit(1, 0, 0)) is None
+    assert cache.get(("cb", 1), unit(1, 0, 0, 0)) is None
+    assert cache.get(("cb", 1), unit(1, 0, 0)) == "v1"
+
+
+def test_semantic_cache_evicts_least_recently_used():
+    """Eviction drops the least recently used entry and keeps the remaining rows aligned."""
+    cache = SemanticCache(maxsize=3)
+    basis = np.eye(4, dtype=np.float32)
+    for i in range(3):
+        cache.set("scope", basis[i], i)
+    assert cache.get("scope", basis[0]) == 0
+
+    # Entry 1 is the least recently used; its row is refilled from the end of the matrix
+    cache.set("scope", basis[3], 3)
+    assert len(cache) == 3
+    assert cache.get("scope", basis[1]) is None
+    assert [cache.get("scope", basis[i]) for i in (0, 2, 3)] == [0, 2, 3]
+
+    # A single scope can fill the whole cache and keep cycling
+    for i in range(10):
+        cache.set("scope", unit(1, i, 0, 0), f"v{i}")
+    assert len(cache) == 3
+    assert cache.get("scope", unit(1, 9, 0, 0)) == "v9"
+
+
+def test_semantic_cache_eviction_across_scopes():
+    """Evicting a scope's last entry removes the scope."""
+    cache = SemanticCache(maxsize=1)
+    cache.set("a", unit(1, 0), "a")
+    cache.set("b", unit(1, 0), "b")
+
+    assert cache.get("a", unit(1, 0)) is None
+    assert cache.get("b", unit(1, 0)) == "b"
+    assert list(cache._matrices) == [("b", 2)]
+
+
+def test_semantic_cache_expires_entries():
+    """Entries older than the TTL are dropped on read."""
+    cache = SemanticCache(maxsize=4, ttl=0.05)
+    cache.set("scope", unit(1, 0), "x")
+    assert cache.get("scope", unit(1, 0)) == "x"
+
+    time.sleep(0.1)
+    assert cache.get("scope", unit(1, 0)) is None
+    assert len(cache) == 0
+
+
+def test_semantic_cache_skips_expired_best_match():
+    """An expired closest entry doesn't hide a live one that also clears the threshold."""
+    cache = SemanticCache(maxsize=4, threshold=0.9, ttl=0.05)
+    cache.set("scope", unit(1, 0), "old")
+    time.sleep(0.1)
+    cache.ttl = 60
+    cache.set("scope", unit(1, 0.3), "live")
+
+    assert cache.get("scope", unit(1, 0)) == "live"
+    assert len(cache) == 1
+
+
+def test_semantic_cache_clear():
+    """clear() removes every entry and scope."""
+    cache = SemanticCache()
+    cache.set("scope", unit(1, 0), "x")
+    cache.clear()
+
+    assert cache.get("scope", unit(1, 0)) is None
+    assert len(cache) == 0
@@ -0,0 +1,150 @@
+"""
+Tests for relationship queries against PostgreSQL.
+
+Run with TEST_DATABASE_URL pointing at a disposable database; skipped otherwise.
+"""
+
+import uuid
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("pgvector")
+
+
+@pytest.fixture
+def codebase(postgres):
+    """A uniquely named codebase, deleted (with its chunks and relationships) afterwards."""
+    from database import SessionLocal
+    from codebase.models import Codebase
+
+    db = SessionLocal()
+    codebase = Codebase(name=f"test-{uuid.uuid4().hex[:12]}")
+    db.add(codebase)
+    db.commit()
+    try:
+        yield db, codebase
+    finally:
+        db.rollback()
+        db.delete(codebase)
+        db.commit()
+        db.close()
+
+
+def add_chunks(db, codebase, names):
+    """Create one chunk per name and return {name: chunk id}."""
+    from codebase.models import CodeChunk
+
+    ids = {}
+    for name in names:
+        chunk = CodeChunk(
+            codebase_id=codebase.id, text=f"def {name}(): pass", name=name,
+            chunk_type='function', file_path=f"{name}.py", language='python'
+        )
+        db.add(chunk)
+        db.flush()
+        ids[name] = chunk.id
+    db.commit()
+    return ids
+
+
+def relationship(source, target, ids, relationship_type='calls', line_number=1):
+    """Relationship dict in the form RelationshipStore.insert_relationships takes."""
+    return {
+        'source_chunk_id': ids[source], 'source_name': source, 'source_type': 'function',
+        'source_file': f"{source}.py", 'target_chunk_id': ids.get(target), 'target_name': target,
+        'target_type': 'function', 'relationship_type': relationship_type, 'line_number': line_number
+    }
+
+
+def test_find_dependencies_batch_matches_single_lookups(codebase):
+    """The batched lookup returns what one find_dependencies call per name would."""
+    from codebase.core.relationship_store import RelationshipStore
+
+    db, cb = codebase
+    ids = add_chunks(db, cb, ['main', 'helper', 'util'])
+    store = RelationshipStore()
+    assert store.insert_relationships(cb.name, [
+        relationship('main', 'helper', ids),
+        relationship('main', 'os', ids, relationship_type='imports'),
+        relationship('helper', 'util', ids),
+    ])
+
+    batch = store.find_dependencies_batch(['main', 'helper', 'util'], cb.name)
+
+    assert set(batch) == {'main', 'helper', 'util'}
+    for name in ('main', 'helper', 'util'):
+        assert batch[name] == store.find_dependencies(name, cb.name)
+    assert [dep['target_name'] for dep in batch['main']['calls']] == ['helper']
+    assert [dep['target_name'] for dep in batch['main']['imports']] == ['os']
+    assert all(not deps for deps in batch['util'].values())
+
+
+def test_find_dependencies_batch_unknown_codebase(postgres):
+    """An unknown codebase yields an empty mapping."""
+    from codebase.core.relationship_store import RelationshipStore
+
+    assert RelationshipStore().find_dependencies_batch(['main'], f"missing-{uuid.uuid4().hex}") == {}
+
+
+def test_impact_scope_walks_callers_once_per_component(codebase):
+    """Diamonds and cycles report each caller once, at its shortest distance."""
+    from codebase.core.relationship_store import RelationshipStore
+
+    db, cb = codebase
+    ids = add_chunks(db, cb, ['target', 'a', 'b', 'c', 'd', 'e'])
+    store = RelationshipStore()
+    assert store.insert_relationships(cb.name, [
+        # a calls target twice; a and b both call it; c reaches it through both (a diamond)
+        relationship('a', 'target', ids, line_number=1),
+        relationship('a', 'target', ids, line_number=5),
+        relationship('b', 'target', ids),
+        relationship('c', 'a', ids),
+        relationship('c', 'b', ids),
+        # c <-> d is a cycle, target -> a loops back to the start, e hangs off d
+        relationship('d', 'c', ids),
+        relationship('c', 'd', ids),
+        relationship('target', 'a', ids),
+        relationship('e', 'd', ids),
+    ])
+
+    def callers(max_depth):
+        impact = store.find_impact_scope(str(ids['target']), cb.name, max_depth)
+        return (
+            sorted(caller['source_name'] for caller in impact['direct_impact']),
+            sorted(caller['source_name'] for caller in impact['indirect_impact']),
+        )
+
+    assert callers(1) == (['a', 'b'], [])
+    assert callers(2) == (['a', 'b'], ['c'])
+    assert callers(3) == (['a', 'b'], ['c', 'd'])
+    assert callers(4) == (['a', 'b'], ['c', 'd', 'e'])
+    # Deeper requests are clamped to MAX_IMPACT_DEPTH and the cycle still terminates
+    assert callers(1000) == (['a', 'b'], ['c', 'd', 'e'])
+
+
+def test_impact_scope_stays_within_codebase(codebase):
+    """Callers recorded under another codebase are not followed."""
+    from codebase.models import Codebase
+    from codebase.core.relationship_store import RelationshipStore
+
+    db, cb = codebase
+    ids = add_chunks(db, cb, ['target', 'a'])
+    other = Codebase(name=f"test-{uuid.uuid4().hex[:12]}")
+    db.add(other)
+    db.commit()
+    try:
+        other_ids = add_chunks(db, other, ['outsider'])
+        store = RelationshipStore()
+        assert store.insert_relationships(cb.name, [relationship('a', 'target', ids)])
+        assert store.insert_relationships(other.name, [
+            relationship('outsider', 'a', {**ids, **other_ids})
+        ])
+
+        impact = store.find_impact_scope(str(ids['target']), cb.name, max_depth=3)
+        assert [caller['source_name'] for caller in impact['direct_impact']] == ['a']
+        assert impact['indirect_impact'] == []
+        assert impact['total_affected_files'] == 1
+    finally:
+        db.delete(other)
+        db.commit()